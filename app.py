@@ -1,18 +1,35 @@
 # app.py
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, g
 import os
-import requests
 import json
 import datetime
 import random
-from textblob import TextBlob
-import pandas as pd
+import numpy as np
 import time
 import logging
 import re
-import yfinance as yf  # Add Yahoo Finance library
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from cache import TTLCache
+from shared_cache import SQLiteCache
+from refresher import BackgroundRefresher
+from series import columns_to_records, downsample_ohlc, downsample_lttb, history_to_bars, format_dates, PriceSeries
+from price_store import PriceStore
+from sentiment import SentimentEngine
+from indicators import IndicatorEngine, parse_indicator_spec, to_json_values
+from portfolio import PriceMatrix, log_returns, correlation_matrix, betas, rolling_correlation
+from upstream import UpstreamClient
+from breaker import ProviderGuard
+from quotes import QuoteHub
+from symbols import SymbolIndex, common_name
+from mock_data import MockMarket
+from http_cache import EncodedBody
+from json_provider import json_provider_class
+from metrics import Registry
 
 app = Flask(__name__)
+# orjson when it is installed, unless JSON_PROVIDER=stdlib
+app.json = json_provider_class()(app)
 
 # Set up logging
 logging.basicConfig(
@@ -21,144 +38,265 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prometheus metrics, served per worker process at /metrics
+metrics_registry = Registry()
+request_latency = metrics_registry.histogram(
+    'marketpulse_http_request_duration_seconds',
+    'Time spent handling HTTP requests',
+    ('route', 'method', 'status')
+)
+upstream_latency = metrics_registry.histogram(
+    'marketpulse_upstream_request_duration_seconds',
+    'Time spent in calls to data providers',
+    ('provider', 'operation')
+)
+upstream_errors = metrics_registry.counter(
+    'marketpulse_upstream_errors_total',
+    'Calls to data providers that failed',
+    ('provider', 'operation')
+)
+mock_fallbacks = metrics_registry.counter(
+    'marketpulse_mock_fallbacks_total',
+    'Results built from mock data because no provider returned usable data',
+    ('data',)
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Registered first, so it runs after every other after_request hook
+    # and the time includes serializing and compressing the response
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_latency.observe(time.perf_counter() - start, route, request.method, str(response.status_code))
+    return response
+
 # Cache to minimize API calls
-cache = {}
-cache_duration = 300  # 5 minutes
-CACHE_CLEANUP_INTERVAL = 3600  # Clean up stale cache entries every hour
-last_cleanup = datetime.datetime.now()
+cache_duration = 300  # 5 minutes, default for keys without a specific TTL
+CACHE_TTLS = {
+    'stock_data_': int(os.environ.get("CACHE_TTL_STOCK_DATA", 300)),
+    'news_': int(os.environ.get("CACHE_TTL_NEWS", 600)),
+    'sentiment_': int(os.environ.get("CACHE_TTL_SENTIMENT", 600)),
+    'metrics_': int(os.environ.get("CACHE_TTL_METRICS", 3600)),
+    # Live quotes are polled this often, and every worker shares each poll
+    'quote_': int(os.environ.get("QUOTE_POLL_INTERVAL", 15)),
+    # Intraday bars go stale much faster than daily ones
+    'stock_data_1m_': 60,
+    'stock_data_5m_': 120,
+    'stock_data_1h_': 300
+}
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", 2048))
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 128 * 1024 * 1024))
+# Expired entries are still served for this long while a refresh runs
+CACHE_STALE_TTL = int(os.environ.get("CACHE_STALE_TTL", 3600))
+# Shared by all gunicorn workers on the host; set to an empty string to disable
+SHARED_CACHE_PATH = os.environ.get(
+    "SHARED_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "market_pulse_cache.sqlite3")
+)
+cache = TTLCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    ttls=CACHE_TTLS,
+    default_ttl=cache_duration,
+    shared=SQLiteCache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None,
+    stale_ttl=CACHE_STALE_TTL
+)
+# Serves stale entries while refreshing them and re-warms the hottest tickers
+refresher = BackgroundRefresher(
+    cache,
+    workers=int(os.environ.get("CACHE_REFRESH_WORKERS", 2)),
+    hot_limit=int(os.environ.get("CACHE_HOT_TICKERS", 20))
+)
+
+# On-disk per-ticker bar store so refreshes only download new bars; empty disables it
+PRICE_STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR",
+    os.path.join(tempfile.gettempdir(), "market_pulse_prices")
+)
+price_store = PriceStore(PRICE_STORE_DIR) if PRICE_STORE_DIR else None
+
+# Memoized headline scoring shared by the news and sentiment endpoints
+sentiment_engine = SentimentEngine(max_entries=int(os.environ.get("SENTIMENT_CACHE_SIZE", 20000)))
+
+# /api/dashboard loads its sections concurrently; each one gets its own
+# deadline (in seconds) and is reported as pending if it misses it
+DASHBOARD_TIMEOUTS = {
+    'stock_data': float(os.environ.get("DASHBOARD_TIMEOUT_STOCK_DATA", 8)),
+    'metrics': float(os.environ.get("DASHBOARD_TIMEOUT_METRICS", 5)),
+    'news': float(os.environ.get("DASHBOARD_TIMEOUT_NEWS", 5)),
+    'sentiment': float(os.environ.get("DASHBOARD_TIMEOUT_SENTIMENT", 5))
+}
+dashboard_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("DASHBOARD_WORKERS", 16)),
+    thread_name_prefix="dashboard"
+)
+
+# Technical indicators, cached per series and updated incrementally as bars arrive
+indicator_engine = IndicatorEngine(max_entries=int(os.environ.get("INDICATOR_CACHE_SIZE", 1024)))
+MAX_INDICATORS = 10  # Per /api/indicators request
+
+# Listed symbols and company names for validation and /api/search
+SYMBOLS_PATH = os.environ.get(
+    "SYMBOLS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "symbols.csv")
+)
+symbol_index = SymbolIndex.from_file(
+    SYMBOLS_PATH,
+    negative_ttl=int(os.environ.get("SYMBOL_NEGATIVE_TTL", 86400))
+)
+# Ask Yahoo Finance about symbols missing from the listing (once per symbol)
+SYMBOL_REMOTE_LOOKUP = os.environ.get("SYMBOL_REMOTE_LOOKUP", "1") == "1"
+MAX_SEARCH_RESULTS = 25
+
+# Maximum number of tickers one /api/stream/quotes connection can watch
+MAX_STREAM_TICKERS = int(os.environ.get("MAX_STREAM_TICKERS", 20))
+# Open quote streams per process; each one holds a server thread
+MAX_STREAMS = int(os.environ.get("MAX_STREAMS", 16))
+# Seconds between keep-alive comments on idle quote streams
+QUOTE_KEEPALIVE = 15
+# Seconds a client turned away by MAX_STREAMS is asked to wait
+QUOTE_STREAM_RETRY_AFTER = 30
+
+# Maximum number of tickers accepted by one batch /api/stock_data request
+MAX_BATCH_TICKERS = int(os.environ.get("MAX_BATCH_TICKERS", 100))
+
+# Supported bar intervals and how much history is fetched and cached for each;
+# requests for shorter ranges are sliced from the cached series
+STOCK_INTERVALS = {
+    '1m': '7d',
+    '5m': '60d',
+    '1h': '730d',
+    '1d': '5y',
+    '1wk': '10y'
+}
+INTRADAY_INTERVALS = {'1m', '5m', '1h'}
+
+# Named ranges accepted by /api/stock_data, in days (None means everything cached)
+STOCK_RANGES = {
+    '1d': 1,
+    '5d': 5,
+    '1w': 7,
+    '1mo': 30,
+    '3mo': 90,
+    '6mo': 180,
+    '1y': 365,
+    '2y': 730,
+    '5y': 1825,
+    '10y': 3650,
+    'max': None
+}
+DEFAULT_STOCK_RANGE = '1y'  # Daily data keeps its historical one-year default
+
+DOWNSAMPLERS = {
+    'ohlc': downsample_ohlc,
+    'lttb': downsample_lttb
+}
+
+# Date-aligned close prices per interval for /api/correlation, rebuilt column by column
+price_matrices = {
+    interval: PriceMatrix(max_tickers=int(os.environ.get("PRICE_MATRIX_MAX_TICKERS", 500)))
+    for interval in STOCK_INTERVALS
+}
+BENCHMARK_TICKER = os.environ.get("BENCHMARK_TICKER", "SPY")
+# Bars per year, used to annualize volatility
+PERIODS_PER_YEAR = {
+    '1m': 252 * 390,
+    '5m': 252 * 78,
+    '1h': 252 * 7,
+    '1d': 252,
+    '1wk': 52
+}
 
 # API keys - these are placeholders, but the app will work even if APIs are down
 # In production, these should be stored as environment variables
 ALPHAVANTAGE_API_KEY = os.environ.get("ALPHAVANTAGE_API_KEY", "ORRBTEBWNMRKM9JY")
 NEWS_API_KEY = os.environ.get("NEWS_API_KEY", "86faaf4a4ee8490cade873e97b4721d3")
 # Removed Finnhub API key and client
+# Endpoints can be pointed at a local stub server for testing
+ALPHAVANTAGE_URL = os.environ.get("ALPHAVANTAGE_URL", "https://www.alphavantage.co/query")
+NEWS_API_URL = os.environ.get("NEWS_API_URL", "https://newsapi.org/v2/everything")
 
-# Define helper functions first
-def generate_mock_stock_data(ticker, days=365):
-    return
-    """
-    Generate realistic mock stock data for demo purposes
-    
-    Args:
-        ticker (str): Stock ticker symbol
-        days (int): Number of days of historical data to generate
-    
-    Returns:
-        list: List of dictionaries containing stock data
-    """
-    data = []
-    # Use different base prices for different tickers
-    base_prices = {
-        'AAPL': 159.25,
-        'MSFT': 338.47,
-        'GOOGL': 137.14,
-        'AMZN': 127.74,
-        'TSLA': 237.49,
-        'META': 313.75
-    }
+# Pooled, keep-alive HTTP client for Alpha Vantage and News API calls
+upstream = UpstreamClient(
+    pool_size=int(os.environ.get("UPSTREAM_POOL_SIZE", 10)),
+    per_host_limit=int(os.environ.get("UPSTREAM_PER_HOST_LIMIT", 4)),
+    retries=int(os.environ.get("UPSTREAM_RETRIES", 2)),
+    timeout=float(os.environ.get("UPSTREAM_TIMEOUT", 5)),
+    deadline=float(os.environ.get("UPSTREAM_DEADLINE", 5))
+)
 
-    base_price = base_prices.get(ticker, 100.0)  # Default to 100 for unknown tickers
-    volatility = 0.02  # 2% daily volatility
-    
-    end_date = datetime.datetime.now()
-    
-    for i in range(days, 0, -1):
-        date = end_date - datetime.timedelta(days=i)
-        
-        # Weekend check - skip weekends
-        if date.weekday() >= 5:  # 5 is Saturday, 6 is Sunday
-            continue
-            
-        # Random daily change with some trend
-        change_percent = random.normalvariate(0, volatility) + (0.0001 * (days - i))
-        
-        # Calculate price movement
-        if i == days:
-            # First day, use base price
-            open_price = base_price * (1 - random.normalvariate(0, volatility/2))
-            close_price = base_price
-        else:
-            # Use previous day's close as reference
-            print(data)
-            prev_close = data[-1]['close']
-            open_price = prev_close * (1 + random.normalvariate(0, volatility/3))
-            close_price = prev_close * (1 + change_percent)
-        
-        # Ensure prices don't go negative
-        open_price = max(open_price, 0.1)
-        close_price = max(close_price, 0.1)
-        
-        # Calculate high and low with realistic constraints
-        high_price = max(open_price, close_price) * (1 + abs(random.normalvariate(0, volatility/2)))
-        low_price = min(open_price, close_price) * (1 - abs(random.normalvariate(0, volatility/2)))
-        
-        # Random volume based on price movement
-        volume = int(random.normalvariate(5000000, 2000000) * (1 + 2*abs(change_percent)))
-        
-        data.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'open': round(open_price, 2),
-            'high': round(high_price, 2),
-            'low': round(low_price, 2),
-            'close': round(close_price, 2),
-            'volume': volume
-        })
-    
-    return data
+# Per-provider rate limits (requests per second, with a burst allowance) and
+# circuit breakers; throttled or failing providers are skipped immediately
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", 5))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", 30))
+def observe_upstream(provider, operation, seconds, error):
+    """Record a provider call's latency and failure in the upstream metrics"""
+    upstream_latency.observe(seconds, provider, operation)
+    if error is not None:
+        upstream_errors.inc(provider, operation)
 
-def generate_mock_news(company_name):
+providers = {
+    'yahoo': ProviderGuard(
+        'yahoo',
+        rate=float(os.environ.get("RATE_LIMIT_YAHOO", 5)),
+        burst=int(os.environ.get("RATE_BURST_YAHOO", 20)),
+        failure_threshold=BREAKER_FAILURES,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+        observer=observe_upstream
+    ),
+    # The free Alpha Vantage tier allows 5 requests per minute
+    'alphavantage': ProviderGuard(
+        'alphavantage',
+        rate=float(os.environ.get("RATE_LIMIT_ALPHAVANTAGE", 5 / 60)),
+        burst=int(os.environ.get("RATE_BURST_ALPHAVANTAGE", 5)),
+        failure_threshold=BREAKER_FAILURES,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+        observer=observe_upstream
+    ),
+    'newsapi': ProviderGuard(
+        'newsapi',
+        rate=float(os.environ.get("RATE_LIMIT_NEWSAPI", 1)),
+        burst=int(os.environ.get("RATE_BURST_NEWSAPI", 10)),
+        failure_threshold=BREAKER_FAILURES,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+        observer=observe_upstream
+    )
+}
+
+def yahoo_finance():
     """
-    Generate mock news articles for demo purposes
+    Return the yfinance module, importing it on first use
     
-    Args:
-        company_name (str): Company name to generate news about
+    yfinance and the pandas it pulls in take longer to import than the
+    rest of the app, so workers only load them when a request first needs
+    Yahoo Finance (or in warm_up).
     
     Returns:
-        list: List of dictionaries containing news data
+        module: yfinance
     """
-    news_templates = [
-        "{company} Reports Quarterly Earnings Above Expectations",
-        "{company} Announces New Product Line",
-        "Analysts Upgrade {company} Stock Rating",
-        "{company} Expands Operations to New Markets",
-        "{company} CEO Discusses Future Growth Strategy",
-        "Investors React to {company}'s Latest Announcement",
-        "{company} Partners with Tech Giant for New Initiative",
-        "Market Trends: How {company} is Positioned for Growth",
-        "{company} Addresses Supply Chain Challenges",
-        "Regulatory Changes Could Impact {company}'s Business Model"
-    ]
-    
-    sources = ["Reuters", "Bloomberg", "CNBC", "Wall Street Journal", "Financial Times", 
-               "MarketWatch", "Barron's", "Seeking Alpha", "Investor's Business Daily", "The Motley Fool"]
-    
-    articles = []
-    now = datetime.datetime.now()
-    
-    for i in range(10):
-        # Generate random sentiment
-        sentiment_value = random.normalvariate(0.2, 0.5)  # Slightly positive bias
-        sentiment_label = "positive" if sentiment_value > 0.1 else "negative" if sentiment_value < -0.1 else "neutral"
-        
-        # Random publication date within last 7 days
-        days_ago = random.randint(0, 7)
-        hours_ago = random.randint(0, 24)
-        pub_date = now - datetime.timedelta(days=days_ago, hours=hours_ago)
-        
-        title = news_templates[i % len(news_templates)].format(company=company_name)
-        source = sources[random.randint(0, len(sources)-1)]
-        
-        articles.append({
-            'title': title,
-            'source': source,
-            'url': '#',  # Placeholder URL
-            'publishedAt': pub_date.isoformat(),
-            'sentiment': sentiment_value,
-            'sentiment_label': sentiment_label
-        })
+    import yfinance
+    return yfinance
+
+def warm_up():
+    """
+    Load what a worker would otherwise load on its first requests
     
-    return articles
+    Imports yfinance (and with it pandas) and TextBlob's sentiment lexicon.
+    gunicorn.conf.py calls this in the master when the app is preloaded, so
+    every forked worker shares the loaded modules copy-on-write. It starts
+    no threads and opens no connections, as neither would survive the fork.
+    """
+    start = time.perf_counter()
+    yahoo_finance()
+    sentiment_engine.score("Market Pulse is warming up")
+    logger.info(f"Warmed up in {time.perf_counter() - start:.2f}s")
 
+# Define helper functions first
 def analyze_sentiment(text):
     """
     Analyze sentiment of text using TextBlob
@@ -169,22 +307,8 @@ def analyze_sentiment(text):
     Returns:
         dict: Dictionary with polarity and sentiment label
     """
-    # Use TextBlob for sentiment analysis
-    analysis = TextBlob(text)
-    polarity = analysis.sentiment.polarity
-    
-    # Determine sentiment label
-    if polarity > 0.1:
-        label = "positive"
-    elif polarity < -0.1:
-        label = "negative"
-    else:
-        label = "neutral"
-    
-    return {
-        'polarity': polarity,
-        'label': label
-    }
+    # Memoized, so repeated headlines are only parsed once
+    return sentiment_engine.score(text)
 
 def get_company_name(ticker):
     """
@@ -196,44 +320,10 @@ def get_company_name(ticker):
     Returns:
         str: Company name
     """
-    # Map ticker to company name
-    company_map = {
-        'AAPL': 'Apple',
-        'MSFT': 'Microsoft',
-        'GOOGL': 'Google',
-        'AMZN': 'Amazon',
-        'META': 'Facebook',
-        'TSLA': 'Tesla',
-        'NVDA': 'NVIDIA',
-        'NFLX': 'Netflix',
-        'PYPL': 'PayPal',
-        'INTC': 'Intel'
-    }
-    return company_map.get(ticker, ticker)
-
-def clean_cache():
-    """
-    Remove expired cache entries to prevent memory bloat
-    """
-    global last_cleanup
-    now = datetime.datetime.now()
-    
-    # Only run cleanup if enough time has passed since last cleanup
-    if (now - last_cleanup).seconds < CACHE_CLEANUP_INTERVAL:
-        return
-    
-    logger.info("Cleaning up expired cache entries")
-    expired_keys = []
-    
-    for key, value in cache.items():
-        if (now - value['timestamp']).seconds > cache_duration:
-            expired_keys.append(key)
-    
-    for key in expired_keys:
-        del cache[key]
-    
-    logger.info(f"Removed {len(expired_keys)} expired cache entries")
-    last_cleanup = now
+    # Looked up in the local symbol index, without the legal suffix so the
+    # name also works as a news search term
+    name = symbol_index.lookup(ticker)
+    return common_name(name) if name else ticker
 
 def validate_ticker(ticker):
     """
@@ -248,7 +338,8 @@ def validate_ticker(ticker):
     # Basic validation - tickers are typically 1-5 uppercase letters
     return bool(re.match(r'^[A-Z]{1,5}$', ticker))
 
-# Now define the mock data using the helper functions
+# Mock quotes and metrics for the demo tickers; price series and news are
+# generated on demand by mock_market
 MOCK_DATA = {
     'AAPL': {
         'company_name': 'Apple Inc.',
@@ -266,8 +357,6 @@ MOCK_DATA = {
         'year_high': 182.94,
         'year_low': 124.17,
         'avg_volume': '29.8M',
-        'stock_data': generate_mock_stock_data('AAPL', days=365),
-        'news': generate_mock_news('Apple'),
         'sentiment': {
             'buzz': 0.89,
             'sentiment_score': 0.65,
@@ -290,8 +379,6 @@ MOCK_DATA = {
         'year_high': 366.78,
         'year_low': 275.89,
         'avg_volume': '25.3M',
-        'stock_data': generate_mock_stock_data('MSFT', days=365),
-        'news': generate_mock_news('Microsoft'),
         'sentiment': {
             'buzz': 0.76,
             'sentiment_score': 0.72,
@@ -314,8 +401,6 @@ MOCK_DATA = {
         'year_high': 142.56,
         'year_low': 102.21,
         'avg_volume': '18.5M',
-        'stock_data': generate_mock_stock_data('GOOGL', days=365),
-        'news': generate_mock_news('Google'),
         'sentiment': {
             'buzz': 0.82,
             'sentiment_score': 0.53,
@@ -338,8 +423,6 @@ MOCK_DATA = {
         'year_high': 147.74,
         'year_low': 101.15,
         'avg_volume': '32.4M',
-        'stock_data': generate_mock_stock_data('AMZN', days=365),
-        'news': generate_mock_news('Amazon'),
         'sentiment': {
             'buzz': 0.91,
             'sentiment_score': 0.67,
@@ -362,8 +445,6 @@ MOCK_DATA = {
         'year_high': 299.29,
         'year_low': 152.31,
         'avg_volume': '42.6M',
-        'stock_data': generate_mock_stock_data('TSLA', days=365),
-        'news': generate_mock_news('Tesla'),
         'sentiment': {
             'buzz': 0.95,
             'sentiment_score': 0.48,
@@ -386,8 +467,6 @@ MOCK_DATA = {
         'year_high': 326.20,
         'year_low': 197.80,
         'avg_volume': '15.7M',
-        'stock_data': generate_mock_stock_data('META', days=365),
-        'news': generate_mock_news('Meta Facebook'),
         'sentiment': {
             'buzz': 0.88,
             'sentiment_score': 0.59,
@@ -396,6 +475,13 @@ MOCK_DATA = {
     }
 }
 
+# Seeded synthetic prices and news for when every provider fails
+mock_market = MockMarket(
+    seed=int(os.environ.get("MOCK_DATA_SEED", 42)),
+    base_prices={ticker: data['price'] for ticker, data in MOCK_DATA.items()},
+    max_entries=int(os.environ.get("MOCK_DATA_CACHE_SIZE", 256))
+)
+
 @app.route('/')
 def index():
     """Render the main dashboard page"""
@@ -406,59 +492,99 @@ def about():
     """Render the about page"""
     return render_template('about.html')
 
-@app.route('/api/stock_data', methods=['GET'])
-def get_stock_data():
-    """API endpoint to get stock price history data"""
-    # Clean cache periodically
-    clean_cache()
+def period_to_days(period):
+    """
+    Convert a yfinance period such as '60d' or '5y' into days
     
-    # Get and validate ticker
-    ticker = request.args.get('ticker', 'AAPL').upper()
-    if not validate_ticker(ticker):
-        return jsonify({
-            'error': 'Invalid ticker symbol format'
-        }), 400
+    Args:
+        period (str): Period string ending in 'd' or 'y'
+        
+    Returns:
+        int: Number of days
+    """
+    return int(period[:-1]) * {'d': 1, 'y': 365}[period[-1]]
+
+def load_price_bars(ticker, interval):
+    """
+    Fetch a ticker's bars from Yahoo Finance, incrementally if they are stored
+    
+    With the price store enabled only bars after the last stored ones are
+    downloaded and appended; otherwise the full period is fetched.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        interval (str): Bar interval, one of STOCK_INTERVALS
+    
+    Returns:
+        np.ndarray: Structured array of bars (see series.BAR_DTYPE)
+    """
+    stock = yahoo_finance().Ticker(ticker)
+    
+    def fetch(start):
+        if start:
+            return stock.history(start=start, interval=interval)
+        return stock.history(period=STOCK_INTERVALS[interval], interval=interval)
+    
+    if price_store is None:
+        return history_to_bars(fetch(None))
+    return price_store.update(ticker, interval, fetch, period_to_days(STOCK_INTERVALS[interval]))
+
+def stock_data_cache_key(ticker, interval='1d'):
+    """
+    Build the cache key for a ticker's bars at a given interval
+    
+    Daily bars keep the original stock_data_<TICKER> key.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        interval (str): Bar interval, one of STOCK_INTERVALS
+    
+    Returns:
+        str: Cache key
+    """
+    if interval == '1d':
+        return f"stock_data_{ticker}"
+    return f"stock_data_{interval}_{ticker}"
+
+def fetch_stock_data(ticker, interval='1d'):
+    """
+    Fetch OHLCV bars for a ticker at the given interval
     
-    # Check cache first
-    cache_key = f"stock_data_{ticker}"
-    if cache_key in cache and (datetime.datetime.now() - cache[cache_key]['timestamp']).seconds < cache_duration:
-        logger.info(f"Returning cached data for {ticker}")
-        return jsonify(cache[cache_key]['data'])
+    Tries Yahoo Finance, then Alpha Vantage (daily bars only), then falls
+    back to mock data. The amount of history is set by STOCK_INTERVALS.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        interval (str): Bar interval, one of STOCK_INTERVALS
     
+    Returns:
+        PriceSeries: The bars
+    """
+    intraday = interval in INTRADAY_INTERVALS
     try:
         # Try to get data from Yahoo Finance
-        logger.info(f"Fetching stock data for {ticker} from Yahoo Finance")
+        logger.info(f"Fetching {interval} stock data for {ticker} from Yahoo Finance")
         
-        # Get historical data using yfinance
-        stock = yf.Ticker(ticker)
-        hist = stock.history(period="1y")  # Get data for 1 year
-        # print(hist)
-        if not hist.empty:
-            # Process the data for charting
-            processed_data = []
-            for date, row in hist.iterrows():
-                processed_data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'open': round(float(row['Open']), 2),
-                    'high': round(float(row['High']), 2),
-                    'low': round(float(row['Low']), 2),
-                    'close': round(float(row['Close']), 2),
-                    'volume': int(row['Volume'])
-                })
-                # print(processed_data[0])
+        # Get historical data using yfinance, through the local price store
+        bars = providers['yahoo'].call(load_price_bars, ticker, interval, operation='history')
+        if len(bars):
+            processed_data = PriceSeries(bars, intraday)
+        elif interval in INTRADAY_INTERVALS:
+            raise Exception("No intraday data from Yahoo Finance")
         else:
             # If no data from Yahoo Finance, try Alpha Vantage as backup
             logger.info(f"No data from Yahoo Finance for {ticker}, trying Alpha Vantage")
-            url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={ticker}&apikey={ALPHAVANTAGE_API_KEY}"
-            response = requests.get(url, timeout=5)
-            stock_data = response.json()
-            print(stock_data)
+            stock_data = providers['alphavantage'].call(upstream.get_json, ALPHAVANTAGE_URL, params={
+                'function': 'TIME_SERIES_DAILY',
+                'symbol': ticker,
+                'apikey': ALPHAVANTAGE_API_KEY
+            }, operation='daily')
             # Process the data for charting
-            processed_data = []
+            records = []
             if 'Time Series (Daily)' in stock_data:
                 time_series = stock_data['Time Series (Daily)']
                 for date, values in time_series.items():
-                    processed_data.append({
+                    records.append({
                         'date': date,
                         'open': float(values['1. open']),
                         'high': float(values['2. high']),
@@ -468,33 +594,277 @@ def get_stock_data():
                     })
                 
                 # Sort by date
-                processed_data.sort(key=lambda x: x['date'])
+                records.sort(key=lambda x: x['date'])
+                processed_data = PriceSeries.from_records(records)
             else:
                 # If API call fails or no data, use mock data
                 raise Exception("No data from APIs")
             
     except Exception as e:
+        # Serve previously stored bars before falling back to mock data
+        stored = price_store.read(ticker, interval) if price_store is not None else []
+        if len(stored):
+            logger.warning(f"Error fetching stock data: {e}, serving stored bars")
+            return PriceSeries(stored, intraday)
+        
         logger.warning(f"Error fetching stock data: {e}, falling back to mock data")
-        # Fallback to mock data
-        if ticker in MOCK_DATA:
-            processed_data = MOCK_DATA[ticker]['stock_data']
+        mock_fallbacks.inc('stock_data')
+        # Fallback to mock data, generated once per ticker and interval
+        processed_data = mock_market.series(ticker, period_to_days(STOCK_INTERVALS[interval]), interval)
+    
+    return processed_data
+
+def bulk_history(bulk, ticker):
+    """
+    Return one ticker's history from a yf.download result
+    
+    Downloads grouped by ticker have (ticker, field) columns, but a single
+    ticker's download can come back with flat Open/High/... columns
+    depending on the yfinance release.
+    
+    Args:
+        bulk (pd.DataFrame): Result of yf.download(..., group_by='ticker')
+        ticker (str): Stock ticker symbol
+    
+    Returns:
+        pd.DataFrame: The ticker's history, or None if it isn't in ``bulk``
+    """
+    if bulk is None or bulk.empty:
+        return None
+    if bulk.columns.nlevels == 1:
+        return bulk if 'Close' in bulk.columns else None
+    if ticker not in bulk.columns.get_level_values(0):
+        return None
+    return bulk[ticker]
+
+def fetch_stock_data_batch(tickers, interval='1d'):
+    """
+    Fetch OHLCV bars for several tickers at once
+    
+    Cached tickers are reused, and the misses are claimed through the
+    cache, so tickers another request is already loading are waited for
+    rather than downloaded again. The rest are fetched with a single bulk
+    Yahoo Finance download. Tickers missing from the bulk result go
+    through fetch_stock_data's Alpha Vantage and mock fallbacks.
+    
+    Args:
+        tickers (list): Validated stock ticker symbols
+        interval (str): Bar interval, one of STOCK_INTERVALS
+    
+    Returns:
+        dict: Mapping of ticker to its PriceSeries
+    """
+    results = {}
+    missing = {}
+    for ticker in tickers:
+        cache_key = stock_data_cache_key(ticker, interval)
+        data, state = refresher.peek(cache_key, lambda ticker=ticker: fetch_stock_data(ticker, interval))
+        if state is None:
+            missing[cache_key] = ticker
         else:
-            # Generate random data for unknown tickers
-            processed_data = generate_mock_stock_data(ticker)
+            results[ticker] = data
     
-    # Store in cache
-    cache[cache_key] = {
-        'timestamp': datetime.datetime.now(),
-        'data': processed_data
-    }
+    if not missing:
+        return results
+    
+    def download(keys):
+        batch = [missing[key] for key in keys]
+        logger.info(f"Bulk fetching stock data for {len(batch)} tickers from Yahoo Finance")
+        bulk = providers['yahoo'].call(yahoo_finance().download, batch, period=STOCK_INTERVALS[interval],
+                                       interval=interval, group_by='ticker', auto_adjust=True, threads=True,
+                                       progress=False, operation='download')
+        loaded = {}
+        for key in keys:
+            hist = bulk_history(bulk, missing[key])
+            bars = history_to_bars(hist) if hist is not None else []
+            if len(bars):
+                if price_store is not None:
+                    price_store.write(missing[key], interval, bars)
+                loaded[key] = PriceSeries(bars, interval in INTRADAY_INTERVALS)
+        return loaded
     
-    return jsonify(processed_data)
+    loaded = cache.load_many(list(missing), download, lambda key: fetch_stock_data(missing[key], interval))
+    for key, ticker in missing.items():
+        results[ticker] = loaded[key]
+    
+    return results
 
-@app.route('/api/company_news', methods=['GET'])
-def get_company_news():
-    """API endpoint to get company news and sentiment analysis"""
-    # Clean cache periodically
-    clean_cache()
+def json_body(payload, cache_key=None):
+    """
+    Serialize a payload into a response body
+    
+    Args:
+        payload: JSON-serializable value
+        cache_key (str): Cache entry the payload comes from; the body then
+                         expires, for HTTP caches too, when the entry does
+    
+    Returns:
+        EncodedBody: The serialized body
+    """
+    expires_in = cache.expires_in(cache_key) if cache_key else None
+    return EncodedBody(
+        app.json.dumps_bytes(payload),
+        expires_at=time.time() + max(0, expires_in) if expires_in is not None else None
+    )
+
+# WSGI environ key under which cached_json_response records the view it
+# answered from: (cache_key, view, background, route rule)
+CACHED_VIEW_ENVIRON_KEY = 'market_pulse.cached_view'
+
+def cached_view_response(cache_key, view, background, req):
+    """
+    Answer a request from a cached view's pre-encoded body
+    
+    Args:
+        cache_key (str): Key of the cache entry the view is built from
+        view (tuple): Hashable description of the view
+        background (bool): True if stale views can be served while the
+                           refresher updates them
+        req: The request, for content negotiation and conditional GETs
+    
+    Returns:
+        Response: The response, or None if the view has to be built
+    """
+    body, state = cache.lookup_derived(cache_key, view)
+    if state == 'fresh' or (state == 'stale' and background):
+        if background:
+            refresher.note(cache_key, state)
+        return body.respond(req)
+    return None
+
+def cached_json_response(cache_key, view, load, shape=None, background=False):
+    """
+    Serve a JSON view of a cache entry from pre-encoded bytes
+    
+    The first request for a view of an entry serializes and compresses it
+    once and keeps the bytes with the entry. Later requests are answered
+    with those bytes, or with 304 Not Modified if the client sends their
+    ETag, and are told to cache them until the entry expires.
+    
+    Args:
+        cache_key (str): Key of the cache entry the view is built from
+        view (tuple): Hashable description of the view, e.g. its query options
+        load (callable): Returns the entry's data, loading it on a miss
+        shape (callable): Builds the response payload from the data
+        background (bool): True if the key is kept up to date by the
+                           refresher, so stale views can be served while it
+                           refreshes them
+    
+    Returns:
+        Response: The JSON response
+    """
+    # Lets the ASGI server answer repeats of this URL without running the view
+    request.environ[CACHED_VIEW_ENVIRON_KEY] = (cache_key, view, background, request.url_rule.rule)
+    response = cached_view_response(cache_key, view, background, request)
+    if response is not None:
+        return response
+    
+    data = load()
+    body = json_body(shape(data) if shape else data, cache_key).precompress()
+    cache.set_derived(cache_key, data, view, body, body.size)
+    return body.respond(request)
+
+@app.after_request
+def add_validators(response):
+    """Compress and add an ETag to JSON API responses that weren't pre-encoded"""
+    if (request.path.startswith('/api/') and response.status_code == 200 and not response.is_streamed
+            and response.mimetype == 'application/json' and 'ETag' not in response.headers):
+        # Built for this request alone, so compressed cheaply and only if large enough
+        return EncodedBody(response.get_data(), fast=True).respond(request)
+    return response
+
+def get_cached_stock_data(ticker, interval='1d'):
+    """Return a ticker's cached bars, refreshing stale data in the background"""
+    cache_key = stock_data_cache_key(ticker, interval)
+    return refresher.get(cache_key, lambda: fetch_stock_data(ticker, interval))
+
+def parse_stock_data_args(args):
+    """
+    Parse the interval, range and downsampling query parameters
+    
+    Args:
+        args (dict): Request query parameters
+    
+    Returns:
+        tuple: (options dict, error message or None)
+    """
+    interval = args.get('interval', '1d')
+    if interval not in STOCK_INTERVALS:
+        return None, f"Invalid interval, expected one of {', '.join(STOCK_INTERVALS)}"
+    
+    # Ranges are named (e.g. 6mo, 5y) or a number of days (e.g. 90d)
+    range_name = args.get('range', DEFAULT_STOCK_RANGE if interval == '1d' else 'max').lower()
+    if range_name in STOCK_RANGES:
+        days = STOCK_RANGES[range_name]
+    elif re.match(r'^\d{1,5}d$', range_name) and int(range_name[:-1]) > 0:
+        days = int(range_name[:-1])
+    else:
+        return None, f"Invalid range, expected a number of days like 90d or one of {', '.join(STOCK_RANGES)}"
+    start = (datetime.date.today() - datetime.timedelta(days=days)).isoformat() if days is not None else None
+    
+    max_points = args.get('max_points', '0')
+    if not max_points.isdigit():
+        return None, "max_points must be a non-negative integer"
+    
+    method = args.get('downsample', 'ohlc')
+    if method not in DOWNSAMPLERS:
+        return None, f"Invalid downsample method, expected one of {', '.join(DOWNSAMPLERS)}"
+    
+    return {
+        'interval': interval,
+        'start': start,
+        'max_points': int(max_points),
+        'downsample': method,
+        # format=columnar returns {"date": [...], "open": [...], ...} instead of one dict per bar
+        'columnar': args.get('format') == 'columnar'
+    }, None
+
+def shape_stock_data(processed_data, options):
+    """
+    Slice, downsample and format cached bars for a response
+    
+    Args:
+        processed_data (PriceSeries): Cached bars
+        options (dict): Options from parse_stock_data_args
+    
+    Returns:
+        list or dict: Bars as records, or as columns if requested
+    """
+    if options['start']:
+        processed_data = processed_data.since(options['start'])
+    
+    columns = processed_data.columns()
+    max_points = options['max_points']
+    if max_points and len(processed_data) > max_points:
+        columns = DOWNSAMPLERS[options['downsample']](columns, max_points)
+    return columns if options['columnar'] else columns_to_records(columns)
+
+@app.route('/api/stock_data', methods=['GET'])
+def get_stock_data():
+    """API endpoint to get stock price history data"""
+    options, error = parse_stock_data_args(request.args)
+    if error:
+        return jsonify({
+            'error': error
+        }), 400
+    interval = options['interval']
+    
+    # Several comma-separated tickers are served from one bulk fetch
+    if request.args.get('tickers'):
+        tickers = list(dict.fromkeys(t.strip().upper() for t in request.args['tickers'].split(',') if t.strip()))
+        invalid = [t for t in tickers if not validate_ticker(t)]
+        if invalid:
+            return jsonify({
+                'error': 'Invalid ticker symbol format',
+                'tickers': invalid
+            }), 400
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return jsonify({
+                'error': f'Too many tickers, the limit is {MAX_BATCH_TICKERS}'
+            }), 400
+        
+        results = fetch_stock_data_batch(tickers, interval)
+        return jsonify({t: shape_stock_data(data, options) for t, data in results.items()})
     
     # Get and validate ticker
     ticker = request.args.get('ticker', 'AAPL').upper()
@@ -503,80 +873,335 @@ def get_company_news():
             'error': 'Invalid ticker symbol format'
         }), 400
     
-    # Check cache first
-    cache_key = f"news_{ticker}"
-    if cache_key in cache and (datetime.datetime.now() - cache[cache_key]['timestamp']).seconds < cache_duration:
-        logger.info(f"Returning cached news for {ticker}")
-        return jsonify(cache[cache_key]['data'])
+    return cached_json_response(
+        stock_data_cache_key(ticker, interval),
+        ('stock_data',) + tuple(options.values()),
+        lambda: get_cached_stock_data(ticker, interval),
+        lambda data: shape_stock_data(data, options),
+        background=True
+    )
+
+def compute_indicators(ticker, indicators, options, series=None):
+    """
+    Compute technical indicators over a ticker's cached bars
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        indicators (dict): Mapping of spec (e.g. 'macd:12:26:9') to its
+                           parsed (name, params), see parse_indicator_spec
+        options (dict): Options from parse_stock_data_args
+        series (PriceSeries): The ticker's cached bars, read from the
+                              cache if not given
+    
+    Returns:
+        dict: Dates and, per spec, a mapping of output name to values
+    """
+    interval = options['interval']
+    intraday = interval in INTRADAY_INTERVALS
+    
+    # Indicators are computed over the whole cached series so their warm-up
+    # periods are filled, then cut down to the requested range
+    bars = (series if series is not None else get_cached_stock_data(ticker, interval)).bars
+    first = 0
+    if options['start']:
+        first = int(np.searchsorted(bars['date'], np.datetime64(options['start'], 'm')))
+    
+    result = {
+        'ticker': ticker,
+        'interval': interval,
+        'date': format_dates(bars['date'][first:], intraday),
+        'indicators': {}
+    }
+    for spec, (name, params) in indicators.items():
+        if name == 'vwap':
+            # Anchored intraday VWAP restarts every session
+            params = {**params, 'session': intraday}
+        values = indicator_engine.compute(f"{ticker}:{interval}", bars, name, params)
+        result['indicators'][spec] = {output: to_json_values(series[first:]) for output, series in values.items()}
+    return result
+
+@app.route('/api/indicators', methods=['GET'])
+def get_indicators():
+    """API endpoint to get technical indicators over a ticker's price history"""
+    options, error = parse_stock_data_args(request.args)
+    if error:
+        return jsonify({
+            'error': error
+        }), 400
+    
+    # Get and validate ticker
+    ticker = request.args.get('ticker', 'AAPL').upper()
+    if not validate_ticker(ticker):
+        return jsonify({
+            'error': 'Invalid ticker symbol format'
+        }), 400
+    
+    specs = list(dict.fromkeys(s.strip().lower() for s in request.args.get('indicators', 'sma').split(',') if s.strip()))
+    if not specs or len(specs) > MAX_INDICATORS:
+        return jsonify({
+            'error': f'Between 1 and {MAX_INDICATORS} indicators are required'
+        }), 400
+    
+    try:
+        indicators = {spec: parse_indicator_spec(spec) for spec in specs}
+    except ValueError as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    interval = options['interval']
+    return cached_json_response(
+        stock_data_cache_key(ticker, interval),
+        ('indicators', tuple(specs)) + tuple(options.values()),
+        lambda: get_cached_stock_data(ticker, interval),
+        lambda data: compute_indicators(ticker, indicators, options, data),
+        background=True
+    )
+
+def close_series(processed_data):
+    """Return the dates and closes of cached bars as NumPy arrays"""
+    return processed_data.bars['date'], processed_data.bars['close']
+
+def compute_correlation(tickers, benchmark, options, window):
+    """
+    Compute return correlations, betas and rolling correlations for many tickers
+    
+    Bars come from the cache (missing tickers are bulk-fetched) and are
+    aligned into one dates x tickers matrix, so every statistic is computed
+    for all tickers in a single vectorized pass.
+    
+    Args:
+        tickers (list): Validated stock ticker symbols
+        benchmark (str): Ticker to compute betas and rolling correlations against
+        options (dict): Options from parse_stock_data_args
+        window (int): Returns per rolling correlation window
+    
+    Returns:
+        tuple: (dict with the correlation matrix, per-ticker beta and return
+               statistics and the rolling correlation of each ticker with
+               the benchmark, or None; list of tickers with no price data)
+    """
+    interval = options['interval']
+    columns = tickers + [benchmark] if benchmark not in tickers else tickers
+    matrix = price_matrices[interval]
+    for ticker, data in fetch_stock_data_batch(columns, interval).items():
+        matrix.update(ticker, data, close_series)
+    
+    start = np.datetime64(options['start'], 'm') if options['start'] else None
+    dates, closes, missing = matrix.select(columns, start)
+    if missing:
+        return None, missing
+    returns = log_returns(closes)
+    bench = columns.index(benchmark)
+    count = len(tickers)
+    
+    corr = correlation_matrix(returns)[:count, :count]
+    beta = betas(returns, bench)
+    rolling = rolling_correlation(returns, bench, window)
+    with np.errstate(invalid='ignore'):
+        volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(PERIODS_PER_YEAR[interval])
+    
+    stats = {}
+    for i, ticker in enumerate(tickers):
+        prices = closes[:, i][~np.isnan(closes[:, i])]
+        stats[ticker] = {
+            'beta': to_json_values(beta[i:i + 1])[0],
+            'total_return': to_json_values(prices[-1:] / prices[:1] - 1)[0] if len(prices) else None,
+            'volatility': to_json_values(volatility[i:i + 1])[0]
+        }
+    
+    intraday = interval in INTRADAY_INTERVALS
+    return {
+        'tickers': tickers,
+        'benchmark': benchmark,
+        'interval': interval,
+        'start': format_dates(dates[:1], intraday)[0] if len(dates) else None,
+        'end': format_dates(dates[-1:], intraday)[0] if len(dates) else None,
+        'correlation': [to_json_values(row) for row in corr],
+        'stats': stats,
+        'rolling_correlation': {
+            'window': window,
+            'date': format_dates(dates[1:], intraday),
+            'values': {ticker: to_json_values(rolling[:, i]) for i, ticker in enumerate(tickers)}
+        }
+    }, []
+
+@app.route('/api/correlation', methods=['GET'])
+def get_correlation():
+    """API endpoint to get return correlations and betas for a set of tickers"""
+    options, error = parse_stock_data_args(request.args)
+    if error:
+        return jsonify({
+            'error': error
+        }), 400
+    
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.args.get('tickers', '').split(',') if t.strip()))
+    benchmark = request.args.get('benchmark', BENCHMARK_TICKER).upper()
+    invalid = [t for t in tickers + [benchmark] if not validate_ticker(t)]
+    if invalid:
+        return jsonify({
+            'error': 'Invalid ticker symbol format',
+            'tickers': invalid
+        }), 400
+    if not 2 <= len(tickers) <= MAX_BATCH_TICKERS:
+        return jsonify({
+            'error': f'Between 2 and {MAX_BATCH_TICKERS} tickers are required'
+        }), 400
+    
+    window = request.args.get('window', '60')
+    if not window.isdigit() or not 2 <= int(window) <= 1000:
+        return jsonify({
+            'error': 'window must be an integer between 2 and 1000'
+        }), 400
+    
+    result, missing = compute_correlation(tickers, benchmark, options, int(window))
+    if missing:
+        # Evicted from the price matrix by concurrent requests
+        return jsonify({
+            'error': 'Price data is no longer available, try again',
+            'tickers': missing
+        }), 404
+    return jsonify(result)
+
+def normalize_yahoo_article(item):
+    """
+    Flatten a Yahoo Finance news item into the API's article format
+    
+    Handles both the flat items of older yfinance releases and the nested
+    'content' items returned by newer ones.
+    
+    Args:
+        item (dict): News item from yf.Ticker(...).news
+    
+    Returns:
+        dict: Article without sentiment, or None if it has no title
+    """
+    content = item.get('content') or item
+    title = content.get('title')
+    if not title:
+        return None
+    
+    if content.get('pubDate'):
+        published_at = content['pubDate']
+    else:
+        published_at = datetime.datetime.fromtimestamp(content.get('providerPublishTime', time.time())).isoformat()
+    
+    return {
+        'title': title,
+        'source': (content.get('provider') or {}).get('displayName') or content.get('publisher', 'Yahoo Finance'),
+        'url': (content.get('canonicalUrl') or {}).get('url') or content.get('link', '#'),
+        'publishedAt': published_at
+    }
+
+def fetch_raw_news(ticker):
+    """
+    Fetch and score a ticker's news once for every news-derived endpoint
+    
+    Tries Yahoo Finance, then News API. Each article's sentiment is scored
+    here, so /api/company_news and /api/stock_sentiment share one upstream
+    call and one round of sentiment analysis per ticker.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+    
+    Returns:
+        dict: Scored 'articles' and the 'total' number of items the provider returned
+    """
+    articles = []
+    texts = []
+    total = 0
     
     try:
         # Try to get news from Yahoo Finance first
         logger.info(f"Fetching news for {ticker} from Yahoo Finance")
-        stock = yf.Ticker(ticker)
-        news_data = stock.news
-        
-        # Process news and analyze sentiment
-        articles = []
-        if news_data and len(news_data) > 0:
-            for article in news_data[:10]:  # Limit to 10 articles
+        news_data = providers['yahoo'].call(lambda: yahoo_finance().Ticker(ticker).news, operation='news') or []
+        for item in news_data:
+            # Skip articles with missing data
+            article = normalize_yahoo_article(item)
+            if article:
+                articles.append(article)
+                texts.append(article['title'])
+        total = len(news_data)
+    except Exception as e:
+        logger.warning(f"Error fetching news for {ticker} from Yahoo Finance: {e}")
+    
+    # If no articles from Yahoo Finance, try News API
+    if not articles:
+        try:
+            company_name = get_company_name(ticker)
+            logger.info(f"No news from Yahoo Finance for {ticker}, trying News API")
+            response = providers['newsapi'].call(upstream.get_json, NEWS_API_URL, params={
+                'q': company_name,
+                'apiKey': NEWS_API_KEY,
+                'pageSize': 10
+            }, operation='everything')
+            news_data = response.get('articles') or []
+            for article in news_data:
                 # Skip articles with missing data
-                if not article.get('title'):
+                if not article.get('title') or not article.get('source'):
                     continue
-                
-                sentiment = analyze_sentiment(article['title'])
                 articles.append({
                     'title': article['title'],
-                    'source': article.get('publisher', 'Yahoo Finance'),
-                    'url': article.get('link', '#'),
-                    'publishedAt': datetime.datetime.fromtimestamp(article.get('providerPublishTime', time.time())).isoformat(),
-                    'sentiment': sentiment['polarity'],
-                    'sentiment_label': sentiment['label']
+                    'source': article['source']['name'],
+                    'url': article['url'],
+                    'publishedAt': article['publishedAt']
                 })
-        
-        # If no articles from Yahoo Finance, try News API
-        if not articles:
-            company_name = get_company_name(ticker)
-            logger.info(f"No news from Yahoo Finance for {ticker}, trying News API")
-            url = f"https://newsapi.org/v2/everything?q={company_name}&apiKey={NEWS_API_KEY}&pageSize=10"
-            response = requests.get(url, timeout=5)
-            news_data = response.json()
-            
-            if 'articles' in news_data and len(news_data['articles']) > 0:
-                for article in news_data['articles'][:10]:  # Limit to 10 articles
-                    # Skip articles with missing data
-                    if not article.get('title') or not article.get('source'):
-                        continue
-                    
-                    sentiment = analyze_sentiment(article['title'] + " " + (article.get('description') or ""))
-                    articles.append({
-                        'title': article['title'],
-                        'source': article['source']['name'],
-                        'url': article['url'],
-                        'publishedAt': article['publishedAt'],
-                        'sentiment': sentiment['polarity'],
-                        'sentiment_label': sentiment['label']
-                    })
-        
-        if not articles:
-            # If API calls return no usable articles
-            raise Exception("No usable news data from APIs")
-            
-    except Exception as e:
-        logger.warning(f"Error fetching news: {e}, falling back to mock data")
-        # Fallback to mock data
-        if ticker in MOCK_DATA:
-            articles = MOCK_DATA[ticker]['news']
-        else:
-            company_name = get_company_name(ticker)
-            articles = generate_mock_news(company_name)
+                texts.append(article['title'] + " " + (article.get('description') or ""))
+            total = len(news_data)
+        except Exception as e:
+            logger.warning(f"Error fetching news for {ticker} from News API: {e}")
+    
+    # Score every headline in one batch
+    for article, sentiment in zip(articles, sentiment_engine.score_many(texts)):
+        article['sentiment'] = sentiment['polarity']
+        article['sentiment_label'] = sentiment['label']
     
-    # Store in cache
-    cache[cache_key] = {
-        'timestamp': datetime.datetime.now(),
-        'data': articles
+    return {
+        'articles': articles,
+        'total': total
     }
+
+def get_raw_news(ticker):
+    """Return the ticker's shared, cached news entry (see fetch_raw_news)"""
+    return cache.get_or_load(f"news_raw_{ticker}", lambda: fetch_raw_news(ticker))
+
+def fetch_company_news(ticker):
+    """
+    Build the news feed for a ticker from its shared news entry
+    
+    Falls back to mock data if no provider returned usable articles.
     
-    return jsonify(articles)
+    Args:
+        ticker (str): Stock ticker symbol
+    
+    Returns:
+        list: List of dictionaries containing news data
+    """
+    articles = get_raw_news(ticker)['articles'][:10]  # Limit to 10 articles
+    
+    if not articles:
+        logger.warning(f"No usable news for {ticker}, falling back to mock data")
+        mock_fallbacks.inc('news')
+        # Fallback to mock data
+        articles = mock_market.news(ticker, get_company_name(ticker))
+    
+    return articles
+
+def get_cached_company_news(ticker):
+    """Return a ticker's cached news feed, fetching it on a miss"""
+    return cache.get_or_load(f"news_{ticker}", lambda: fetch_company_news(ticker))
+
+@app.route('/api/company_news', methods=['GET'])
+def get_company_news():
+    """API endpoint to get company news and sentiment analysis"""
+    # Get and validate ticker
+    ticker = request.args.get('ticker', 'AAPL').upper()
+    if not validate_ticker(ticker):
+        return jsonify({
+            'error': 'Invalid ticker symbol format'
+        }), 400
+    
+    return cached_json_response(f"news_{ticker}", ('news',), lambda: get_cached_company_news(ticker))
 
 @app.route('/api/validate_ticker', methods=['GET'])
 def validate_ticker_endpoint():
@@ -589,85 +1214,82 @@ def validate_ticker_endpoint():
     if not validate_ticker(ticker):
         return jsonify({'valid': False, 'ticker': ticker}), 400
     
-    # Check if it's in our known tickers or try to validate via Yahoo Finance
-    valid_tickers = set(['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'TSLA', 'NVDA', 'NFLX', 'PYPL', 'INTC'])
-    is_valid = ticker in valid_tickers
+    # Listed symbols and recently confirmed misses are answered from memory
+    is_valid = ticker in symbol_index
     
-    if not is_valid:
+    if not is_valid and SYMBOL_REMOTE_LOOKUP and not symbol_index.is_known_missing(ticker):
         try:
-            # Try to get a real quote using yfinance
-            logger.info(f"Validating ticker {ticker} with Yahoo Finance")
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            # Unlisted symbols are checked with Yahoo Finance once, and the
+            # answer is kept in the index either way
+            logger.info(f"{ticker} is not listed locally, validating with Yahoo Finance")
+            info = providers['yahoo'].call(lambda: yahoo_finance().Ticker(ticker).info, operation='info')
             
             # If we can get info, the ticker is valid
             is_valid = 'symbol' in info
+            if is_valid:
+                symbol_index.add(ticker, info.get('longName') or info.get('shortName'))
+            else:
+                symbol_index.mark_missing(ticker)
         except Exception as e:
             logger.warning(f"Error validating ticker {ticker}: {e}")
             is_valid = False
     
     return jsonify({
         'valid': is_valid,
-        'ticker': ticker
+        'ticker': ticker,
+        'name': symbol_index.lookup(ticker)
     })
 
-@app.route('/api/stock_sentiment', methods=['GET'])
-def get_stock_sentiment():
-    """API endpoint to get stock sentiment analysis using Yahoo Finance"""
-    # Clean cache periodically
-    clean_cache()
+@app.route('/api/search', methods=['GET'])
+def search_symbols():
+    """API endpoint to autocomplete ticker symbols and company names"""
+    query = request.args.get('q', '').strip()[:64]
+    limit = request.args.get('limit', '10')
     
-    # Get and validate ticker
-    ticker = request.args.get('ticker', 'AAPL').upper()
-    if not validate_ticker(ticker):
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_SEARCH_RESULTS:
         return jsonify({
-            'error': 'Invalid ticker symbol format'
+            'error': f'limit must be an integer between 1 and {MAX_SEARCH_RESULTS}'
         }), 400
     
-    # Check cache first
-    cache_key = f"sentiment_{ticker}"
-    if cache_key in cache and (datetime.datetime.now() - cache[cache_key]['timestamp']).seconds < cache_duration:
-        logger.info(f"Returning cached sentiment for {ticker}")
-        return jsonify(cache[cache_key]['data'])
+    return jsonify({
+        'query': query,
+        'results': symbol_index.search(query, int(limit))
+    })
+
+def fetch_stock_sentiment(ticker):
+    """
+    Calculate buzz and sentiment scores for a ticker from its shared news entry
+    
+    Falls back to mock sentiment if no news could be scored.
     
-    try:
-        # Use yfinance to get news and calculate sentiment
-        logger.info(f"Fetching news and calculating sentiment for {ticker} using Yahoo Finance")
+    Args:
+        ticker (str): Stock ticker symbol
+    
+    Returns:
+        dict: Dictionary with buzz, sentiment_score and sector_sentiment
+    """
+    news = get_raw_news(ticker)
+    sentiments = [article['sentiment'] for article in news['articles']]
+    
+    if sentiments:
+        avg_sentiment = sum(sentiments) / len(sentiments)
+        # Normalize to a 0-1 scale (from -1 to 1)
+        normalized_sentiment = (avg_sentiment + 1) / 2
         
-        # Get stock info and news
-        stock = yf.Ticker(ticker)
-        news_items = stock.news
+        # Calculate buzz based on number of news items (normalized to 0-1)
+        buzz = min(1.0, news['total'] / 20)  # Normalize, max at 20 news items
         
-        if news_items and len(news_items) > 0:
-            # Calculate sentiment scores from news titles
-            sentiments = []
-            for item in news_items:
-                title = item.get('title', '')
-                if title:
-                    sentiment = analyze_sentiment(title)
-                    sentiments.append(sentiment['polarity'])
-            
-            # Calculate sentiment metrics
-            if sentiments:
-                avg_sentiment = sum(sentiments) / len(sentiments)
-                # Normalize to a 0-1 scale (from -1 to 1)
-                normalized_sentiment = (avg_sentiment + 1) / 2
-                
-                # Calculate buzz based on number of news items (normalized to 0-1)
-                buzz = min(1.0, len(news_items) / 20)  # Normalize, max at 20 news items
-                
-                result = {
-                    'buzz': round(buzz, 2),
-                    'sentiment_score': round(normalized_sentiment, 2),
-                    'sector_sentiment': 0.5  # Default value as sector data isn't readily available
-                }
-            else:
-                raise Exception("No sentiment could be calculated from news")
-        else:
-            raise Exception("No news data available")
-            
-    except Exception as e:
-        logger.warning(f"Error fetching sentiment: {e}, falling back to mock data")
+        result = {
+            'buzz': round(buzz, 2),
+            'sentiment_score': round(normalized_sentiment, 2),
+            'sector_sentiment': 0.5  # Default value as sector data isn't readily available
+        }
+    else:
+        logger.warning(f"No news sentiment for {ticker}, falling back to mock data")
+        mock_fallbacks.inc('sentiment')
         # Fallback to mock data
         if ticker in MOCK_DATA:
             result = MOCK_DATA[ticker]['sentiment']
@@ -679,21 +1301,15 @@ def get_stock_sentiment():
                 'sector_sentiment': 0.58  # Constant sector average
             }
     
-    # Store in cache
-    cache[cache_key] = {
-        'timestamp': datetime.datetime.now(),
-        'data': result
-    }
-    
-    return jsonify(result)
+    return result
 
+def get_cached_stock_sentiment(ticker):
+    """Return a ticker's cached sentiment scores, fetching them on a miss"""
+    return cache.get_or_load(f"sentiment_{ticker}", lambda: fetch_stock_sentiment(ticker))
 
-@app.route('/api/stock_metrics', methods=['GET'])
-def get_stock_metrics():
-    """API endpoint to get stock key metrics"""
-    # Clean cache periodically
-    clean_cache()
-    
+@app.route('/api/stock_sentiment', methods=['GET'])
+def get_stock_sentiment():
+    """API endpoint to get stock sentiment analysis from company news"""
     # Get and validate ticker
     ticker = request.args.get('ticker', 'AAPL').upper()
     if not validate_ticker(ticker):
@@ -701,19 +1317,62 @@ def get_stock_metrics():
             'error': 'Invalid ticker symbol format'
         }), 400
     
-    # Check cache first
-    cache_key = f"metrics_{ticker}"
-    if cache_key in cache and (datetime.datetime.now() - cache[cache_key]['timestamp']).seconds < cache_duration:
-        logger.info(f"Returning cached metrics for {ticker}")
-        return jsonify(cache[cache_key]['data'])
+    return cached_json_response(f"sentiment_{ticker}", ('sentiment',), lambda: get_cached_stock_sentiment(ticker))
+
+def format_market_cap(market_cap):
+    """Format market cap value into human-readable format"""
+    if not market_cap:
+        return 'N/A'
+    
+    if market_cap >= 1_000_000_000_000:  # Trillion
+        return f"{market_cap / 1_000_000_000_000:.2f}T"
+    elif market_cap >= 1_000_000_000:  # Billion
+        return f"{market_cap / 1_000_000_000:.2f}B"
+    elif market_cap >= 1_000_000:  # Million
+        return f"{market_cap / 1_000_000:.2f}M"
+    else:
+        return f"{market_cap:.2f}"
+def format_volume(volume):
+    """Format volume into human-readable format"""
+    if not volume:
+        return 'N/A'
+    
+    if volume >= 1_000_000_000:  # Billion
+        return f"{volume / 1_000_000_000:.1f}B"
+    elif volume >= 1_000_000:  # Million
+        return f"{volume / 1_000_000:.1f}M"
+    elif volume >= 1_000:  # Thousand
+        return f"{volume / 1_000:.1f}K"
+    else:
+        return str(volume)
+def format_dividend(rate, yield_val):
+    """Format dividend information"""
+    if not rate:
+        return 'N/A'
+    
+    if yield_val:
+        return f"{rate:.2f} ({yield_val*100:.2f}%)"
+    else:
+        return f"{rate:.2f}"
+
+def fetch_stock_metrics(ticker):
+    """
+    Fetch key metrics for a ticker from Yahoo Finance
+    
+    Falls back to mock or default metrics if the lookup fails.
     
+    Args:
+        ticker (str): Stock ticker symbol
+    
+    Returns:
+        dict: Dictionary of formatted key metrics
+    """
     try:
         # Use yfinance to get stock metrics
         logger.info(f"Fetching metrics for {ticker} using Yahoo Finance")
         
         # Get stock info
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = providers['yahoo'].call(lambda: yahoo_finance().Ticker(ticker).info, operation='info')
         
         # Extract key metrics
         metrics = {
@@ -731,6 +1390,7 @@ def get_stock_metrics():
         
     except Exception as e:
         logger.warning(f"Error fetching metrics: {e}, falling back to mock data")
+        mock_fallbacks.inc('metrics')
         # Fallback to mock data
         if ticker in MOCK_DATA:
             mock_data = MOCK_DATA[ticker]
@@ -761,13 +1421,244 @@ def get_stock_metrics():
                 'eps': 'N/A'
             }
     
-    # Store in cache
-    cache[cache_key] = {
-        'timestamp': datetime.datetime.now(),
-        'data': metrics
+    return metrics
+
+def get_cached_stock_metrics(ticker):
+    """Return a ticker's cached key metrics, refreshing stale ones in the background"""
+    return refresher.get(f"metrics_{ticker}", lambda: fetch_stock_metrics(ticker))
+
+@app.route('/api/stock_metrics', methods=['GET'])
+def get_stock_metrics():
+    """API endpoint to get stock key metrics"""
+    # Get and validate ticker
+    ticker = request.args.get('ticker', 'AAPL').upper()
+    if not validate_ticker(ticker):
+        return jsonify({
+            'error': 'Invalid ticker symbol format'
+        }), 400
+    
+    return cached_json_response(f"metrics_{ticker}", ('metrics',), lambda: get_cached_stock_metrics(ticker),
+                                background=True)
+
+def load_dashboard(ticker, options):
+    """
+    Load every dashboard section for a ticker concurrently
+    
+    The sections run on a shared thread pool, so the response takes about
+    as long as the slowest upstream instead of the sum of all of them.
+    Sections that miss their deadline in DASHBOARD_TIMEOUTS are reported
+    as pending and keep loading in the background, so their result lands
+    in the cache for the next request.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+        options (dict): Stock data options from parse_stock_data_args
+    
+    Returns:
+        dict: Section data (None if unavailable) plus a 'status' of
+              'ok', 'pending' or 'error' per section and a 'partial' flag
+    """
+    loaders = {
+        'stock_data': lambda: shape_stock_data(get_cached_stock_data(ticker, options['interval']), options),
+        'metrics': lambda: get_cached_stock_metrics(ticker),
+        'news': lambda: get_cached_company_news(ticker),
+        'sentiment': lambda: get_cached_stock_sentiment(ticker)
     }
+    started = time.monotonic()
+    futures = {section: dashboard_executor.submit(loader) for section, loader in loaders.items()}
     
-    return jsonify(metrics)
+    result = {'ticker': ticker, 'status': {}}
+    for section, future in futures.items():
+        remaining = started + DASHBOARD_TIMEOUTS[section] - time.monotonic()
+        try:
+            result[section] = future.result(timeout=max(remaining, 0))
+            result['status'][section] = 'ok'
+        except FutureTimeout:
+            logger.warning(f"Dashboard {section} for {ticker} timed out, returning partial results")
+            result[section] = None
+            result['status'][section] = 'pending'
+        except Exception as e:
+            logger.warning(f"Dashboard {section} for {ticker} failed: {e}")
+            result[section] = None
+            result['status'][section] = 'error'
+    
+    result['partial'] = any(status != 'ok' for status in result['status'].values())
+    return result
+
+@app.route('/api/dashboard', methods=['GET'])
+def get_dashboard():
+    """API endpoint to get stock data, metrics, news and sentiment in one request"""
+    options, error = parse_stock_data_args(request.args)
+    if error:
+        return jsonify({
+            'error': error
+        }), 400
+    
+    # Get and validate ticker
+    ticker = request.args.get('ticker', 'AAPL').upper()
+    if not validate_ticker(ticker):
+        return jsonify({
+            'error': 'Invalid ticker symbol format'
+        }), 400
+    
+    return jsonify(load_dashboard(ticker, options))
+
+def fetch_quote(ticker):
+    """
+    Fetch a ticker's last price, change from the previous close and volume
+    
+    Falls back to the last two cached daily bars if Yahoo Finance is
+    unavailable.
+    
+    Args:
+        ticker (str): Stock ticker symbol
+    
+    Returns:
+        dict: Quote with price, change, change_percent and volume, or None
+    """
+    def read_fast_info():
+        # fast_info loads lazily, so read it inside the provider guard
+        info = yahoo_finance().Ticker(ticker).fast_info
+        return info.last_price, info.previous_close, info.last_volume
+    
+    try:
+        price, previous, volume = providers['yahoo'].call(read_fast_info, operation='fast_info')
+        if not price:
+            raise Exception("No last price from Yahoo Finance")
+    except Exception as e:
+        logger.info(f"Error fetching quote for {ticker}: {e}, using cached bars")
+        bars = get_cached_stock_data(ticker).bars
+        if not len(bars):
+            return None
+        price, volume = float(bars[-1]['close']), int(bars[-1]['volume'])
+        previous = float(bars[-2]['close']) if len(bars) > 1 else price
+    
+    change = price - previous
+    return {
+        'price': round(price, 2),
+        'change': round(change, 2),
+        'change_percent': round(change / previous * 100, 2) if previous else 0.0,
+        'volume': int(volume or 0)
+    }
+
+# One upstream poller per watched ticker, fanned out to every stream client
+quote_hub = QuoteHub(
+    lambda ticker: cache.get_or_load(f"quote_{ticker}", lambda: fetch_quote(ticker)),
+    poll_interval=CACHE_TTLS['quote_'],
+    idle_timeout=int(os.environ.get("QUOTE_IDLE_TIMEOUT", 60)),
+    max_subscriptions=MAX_STREAMS
+)
+
+@app.route('/api/stream/quotes', methods=['GET'])
+def stream_quotes():
+    """API endpoint streaming live quote updates as Server-Sent Events"""
+    tickers = list(dict.fromkeys(
+        t.strip().upper() for t in request.args.get('tickers', request.args.get('ticker', 'AAPL')).split(',') if t.strip()
+    ))
+    invalid = [t for t in tickers if not validate_ticker(t)]
+    if invalid or not tickers:
+        return jsonify({
+            'error': 'Invalid ticker symbol format',
+            'tickers': invalid
+        }), 400
+    if len(tickers) > MAX_STREAM_TICKERS:
+        return jsonify({
+            'error': f'Too many tickers, the limit is {MAX_STREAM_TICKERS}'
+        }), 400
+    
+    subscription = quote_hub.subscribe(tickers)
+    if subscription is None:
+        # Keep threads free for other requests rather than queue behind streams
+        response = jsonify({
+            'error': 'Too many open quote streams, try again later'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(QUOTE_STREAM_RETRY_AFTER)
+        return response
+    
+    def generate():
+        # Ask EventSource to reconnect after 5 seconds if the stream drops
+        yield "retry: 5000\n\n"
+        while True:
+            message = subscription.get(timeout=QUOTE_KEEPALIVE)
+            if message is None:
+                # Comments keep proxies from closing the connection and
+                # let us notice clients that went away
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: quote\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the server closes the response, even if it never started
+    response.call_on_close(lambda: quote_hub.unsubscribe(subscription))
+    return response
+
+# Counters the cache, refresher and provider guards already keep, read at scrape time
+metrics_registry.collected(
+    'marketpulse_cache_lookups_total',
+    'Cache lookups by key prefix and outcome (hit, stale or miss)',
+    ('prefix', 'outcome'),
+    lambda: {(prefix or 'other', outcome): count for (prefix, outcome), count in list(cache.outcomes.items())},
+    kind='counter'
+)
+metrics_registry.collected(
+    'marketpulse_cache_bytes',
+    'Estimated size of the in-process cache',
+    (),
+    lambda: {(): cache.stats()['bytes']}
+)
+metrics_registry.collected(
+    'marketpulse_refresh_queue_depth',
+    'Cache keys waiting for a background refresh',
+    (),
+    lambda: {(): refresher.stats()['queue_depth']}
+)
+metrics_registry.collected(
+    'marketpulse_provider_shed_total',
+    'Provider calls skipped because the circuit was open or the rate limit was hit',
+    ('provider', 'reason'),
+    lambda: {
+        (name, reason): guard.stats()[f"shed_{reason}"]
+        for name, guard in providers.items() for reason in ('open', 'rate_limited')
+    },
+    kind='counter'
+)
+metrics_registry.collected(
+    'marketpulse_provider_circuit_open',
+    '1 while a provider is skipped by its circuit breaker',
+    ('provider',),
+    lambda: {(name,): int(guard.breaker.state == 'open') for name, guard in providers.items()}
+)
+metrics_registry.collected(
+    'marketpulse_upstream_http_retries_total',
+    'Retried HTTP requests to Alpha Vantage and News API, by host',
+    ('host',),
+    lambda: {(host,): counts['retries'] for host, counts in upstream.stats()['hosts'].items()},
+    kind='counter'
+)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus scrape endpoint for request, cache and provider metrics"""
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/cache_stats', methods=['GET'])
+def cache_stats():
+    """API endpoint to inspect cache usage, the background refresh queue and upstream providers"""
+    return jsonify({
+        'cache': cache.stats(),
+        'refresher': refresher.stats(),
+        'upstream': upstream.stats(),
+        'providers': {name: guard.stats() for name, guard in providers.items()},
+        'indicators': indicator_engine.stats(),
+        'price_matrices': {interval: matrix.stats() for interval, matrix in price_matrices.items()},
+        'quotes': quote_hub.stats(),
+        'symbols': symbol_index.stats(),
+        'mock_data': mock_market.stats()
+    })
 
 
 # Error handlers
@@ -780,44 +1671,6 @@ def server_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
-    def format_market_cap(market_cap):
-        """Format market cap value into human-readable format"""
-        if not market_cap:
-            return 'N/A'
-        
-        if market_cap >= 1_000_000_000_000:  # Trillion
-            return f"{market_cap / 1_000_000_000_000:.2f}T"
-        elif market_cap >= 1_000_000_000:  # Billion
-            return f"{market_cap / 1_000_000_000:.2f}B"
-        elif market_cap >= 1_000_000:  # Million
-            return f"{market_cap / 1_000_000:.2f}M"
-        else:
-            return f"{market_cap:.2f}"
-
-    def format_volume(volume):
-        """Format volume into human-readable format"""
-        if not volume:
-            return 'N/A'
-        
-        if volume >= 1_000_000_000:  # Billion
-            return f"{volume / 1_000_000_000:.1f}B"
-        elif volume >= 1_000_000:  # Million
-            return f"{volume / 1_000_000:.1f}M"
-        elif volume >= 1_000:  # Thousand
-            return f"{volume / 1_000:.1f}K"
-        else:
-            return str(volume)
-
-    def format_dividend(rate, yield_val):
-        """Format dividend information"""
-        if not rate:
-            return 'N/A'
-        
-        if yield_val:
-            return f"{rate:.2f} ({yield_val*100:.2f}%)"
-        else:
-            return f"{rate:.2f}"
-
     # Use environment variable PORT if available
     port = int(os.environ.get("PORT", 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
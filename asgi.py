@@ -0,0 +1,269 @@
+# asgi.py
+import io
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.wrappers import Request
+
+import app as market_pulse
+
+logger = logging.getLogger(__name__)
+
+
+def wsgi_environ(scope, body):
+    """
+    Build the WSGI environ for an ASGI HTTP request
+
+    Args:
+        scope (dict): ASGI connection scope
+        body (bytes): Request body
+
+    Returns:
+        dict: The environ
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin1'),
+        'PATH_INFO': scope['path'].encode().decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin1').upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        value = value.decode('latin1')
+        # Repeated headers are folded into one comma-separated value
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    environ.setdefault('CONTENT_LENGTH', str(len(body)))
+    return environ
+
+
+def asgi_headers(headers):
+    """Convert WSGI (name, value) header pairs to ASGI's lowercase byte pairs"""
+    return [(name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers]
+
+
+async def read_body(receive):
+    """Read the whole request body"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def send_messages(send, messages):
+    """Send ASGI messages in order"""
+    for message in messages:
+        await send(message)
+
+
+async def watch_disconnect(receive, disconnected):
+    """Set ``disconnected`` once the client goes away"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            disconnected.set()
+            return
+
+
+def answer_cached(cached, request):
+    """
+    Answer a request from the cached view a previous request for its URL used
+
+    Timed like a request through Flask, as the Flask hooks don't run for it.
+
+    Args:
+        cached (tuple): What cached_json_response recorded in the environ
+        request (Request): The request
+
+    Returns:
+        Response: The response, or None if the view isn't servable any more
+    """
+    start = time.perf_counter()
+    cache_key, view, background, rule = cached
+    response = market_pulse.cached_view_response(cache_key, view, background, request)
+    if response is not None:
+        market_pulse.request_latency.observe(time.perf_counter() - start, rule, request.method,
+                                             str(response.status_code))
+    return response
+
+
+class ASGIBridge:
+    """
+    Serves a WSGI app over ASGI without a worker per in-flight request
+
+    Upstream libraries (yfinance, requests) block, so each request that
+    has to run the app runs it on a large thread pool the event loop
+    awaits. A slow Yahoo Finance or News API call then only ties up one
+    pool thread, and a process can keep hundreds of them in flight.
+
+    When the app answers a GET from a cached view (see
+    app.cached_json_response) the bridge remembers which view that URL maps
+    to. Later requests for the URL are answered from the view's pre-encoded
+    body on the event loop itself while it stays servable, so cache hits
+    never queue behind requests waiting on an upstream.
+    """
+
+    def __init__(self, wsgi_app, threads=256, max_urls=4096):
+        self.wsgi_app = wsgi_app
+        self.threads = threads
+        self.max_urls = max_urls
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi")
+        # (path, query string) -> cached view the app answered it from;
+        # only touched on the event loop
+        self._views = OrderedDict()
+        self.loop_hits = 0
+        self.pool_requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        elif scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        body = await read_body(receive)
+        environ = wsgi_environ(scope, body)
+        url = (scope['path'], scope['query_string'])
+
+        if scope['method'] == 'GET':
+            cached = self._views.get(url)
+            if cached is not None:
+                response = answer_cached(cached, Request(environ))
+                if response is not None:
+                    self._views.move_to_end(url)
+                    self.loop_hits += 1
+                    await send({
+                        'type': 'http.response.start',
+                        'status': response.status_code,
+                        'headers': asgi_headers(response.headers.to_wsgi_list())
+                    })
+                    await send({'type': 'http.response.body', 'body': response.get_data()})
+                    return
+                del self._views[url]
+
+        self.pool_requests += 1
+        loop = asyncio.get_running_loop()
+        disconnected = threading.Event()
+        watcher = asyncio.ensure_future(watch_disconnect(receive, disconnected))
+        try:
+            await loop.run_in_executor(self.executor, self.run_wsgi, environ, send, loop, disconnected)
+        finally:
+            watcher.cancel()
+
+        cached = environ.get(market_pulse.CACHED_VIEW_ENVIRON_KEY)
+        if cached is not None and scope['method'] == 'GET':
+            self._views[url] = cached
+            self._views.move_to_end(url)
+            while len(self._views) > self.max_urls:
+                self._views.popitem(last=False)
+
+    def run_wsgi(self, environ, send, loop, disconnected):
+        """
+        Run the WSGI app on a pool thread and send its response
+
+        Responses with a Content-Length are sent in one message; others,
+        such as the quote stream, are sent chunk by chunk until the client
+        disconnects.
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = headers
+            return lambda data: emit(data, more_body=True)
+
+        def emit(body, more_body=False):
+            messages = []
+            if not started.get('sent'):
+                started['sent'] = True
+                messages.append({
+                    'type': 'http.response.start',
+                    'status': started['status'],
+                    'headers': asgi_headers(started['headers'])
+                })
+            messages.append({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+            asyncio.run_coroutine_threadsafe(send_messages(send, messages), loop).result()
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            if any(name.lower() == 'content-length' for name, _ in started.get('headers', ())):
+                emit(b''.join(result))
+                return
+            for chunk in result:
+                if disconnected.is_set():
+                    return
+                if chunk:
+                    emit(chunk, more_body=True)
+            emit(b'')
+        except OSError as e:
+            # The client went away while the response was being sent
+            logger.info(f"Client disconnected from {environ['PATH_INFO']}: {e}")
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    def stats(self):
+        """
+        Return a snapshot of bridge counters
+
+        Returns:
+            dict: Requests answered on the event loop and on the thread pool
+        """
+        return {
+            'threads': self.threads,
+            'cached_urls': len(self._views),
+            'loop_hits': self.loop_hits,
+            'pool_requests': self.pool_requests
+        }
+
+
+# Upstream calls block a pool thread each, so this caps the requests in
+# flight per process
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", 256))
+app = ASGIBridge(
+    market_pulse.app,
+    threads=ASGI_THREADS,
+    max_urls=int(os.environ.get("ASGI_CACHED_URLS", 4096))
+)
+market_pulse.metrics_registry.collected(
+    'asgi_requests_total', "Requests answered by the ASGI server, by where they ran",
+    ('runner',),
+    lambda: {('event_loop',): app.loop_hits, ('thread_pool',): app.pool_requests},
+    kind='counter'
+)
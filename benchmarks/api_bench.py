@@ -0,0 +1,548 @@
+# benchmarks/api_bench.py
+"""
+Requests/second and latency percentiles for every /api route
+
+Yahoo Finance (yf.Ticker, yf.download) and outbound HTTP (requests.get and
+requests.Session.get, used for Alpha Vantage and News API) are replaced by
+a deterministic local stand-in that answers after a fixed delay, so runs
+are repeatable and never touch the network. The routes are then driven
+through Flask's test client and through a real gunicorn process, with
+gthread workers and with uvicorn workers serving the ASGI mode, with
+three workloads each:
+  - cold:  every request is for a ticker nothing has asked for yet
+  - warm:  a small set of tickers, all loaded before timing starts
+  - mixed: tickers drawn from a Zipf distribution over a larger universe,
+           so popular tickers are warm and the long tail is cold
+
+Requests cycle through the routes, so each one gets an equal share.
+/api/stream/quotes is left out as it never finishes. Results, with the
+commit they were measured at, are written to a JSON file to diff between
+commits.
+
+The stand-in never fails, so a response built from mock fallback data
+means the route itself is broken and its numbers measure the fallback.
+Such routes are listed after each run and the benchmark exits with
+status 1.
+
+Usage:
+    python benchmarks/api_bench.py --latency 0.05 --requests 600 --output api_bench.json
+    python benchmarks/api_bench.py --server uvicorn --workers 2 --concurrency 64
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import platform
+import threading
+import subprocess
+import http.client
+import importlib.util
+from types import SimpleNamespace
+from collections import Counter
+
+# Keep the benchmark in-process: no shared SQLite tier, no on-disk price store
+os.environ.setdefault("SHARED_CACHE_PATH", "")
+os.environ.setdefault("PRICE_STORE_DIR", "")
+# The stand-in has no quota, so don't shed benchmark traffic to mock data
+for provider in ("YAHOO", "ALPHAVANTAGE", "NEWSAPI"):
+    os.environ.setdefault(f"RATE_LIMIT_{provider}", "10000")
+    os.environ.setdefault(f"RATE_BURST_{provider}", "10000")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import requests  # noqa: E402
+import yfinance as yf  # noqa: E402
+from mock_data import MockMarket  # noqa: E402
+
+# {t} and {u} are two different tickers, {q} a search query
+ROUTES = (
+    ('stock_data', '/api/stock_data?ticker={t}'),
+    ('stock_data_batch', '/api/stock_data?tickers={t},{u}'),
+    ('indicators', '/api/indicators?ticker={t}&indicators=sma,rsi:14,macd'),
+    ('correlation', '/api/correlation?tickers={t},{u}'),
+    ('company_news', '/api/company_news?ticker={t}'),
+    ('stock_sentiment', '/api/stock_sentiment?ticker={t}'),
+    ('stock_metrics', '/api/stock_metrics?ticker={t}'),
+    ('dashboard', '/api/dashboard?ticker={t}'),
+    ('validate_ticker', '/api/validate_ticker?ticker={t}'),
+    ('search', '/api/search?q={q}'),
+    ('cache_stats', '/api/cache_stats')
+)
+WORKLOADS = ('cold', 'warm', 'mixed')
+# The Flask test client in this process, and gunicorn with gthread (WSGI)
+# or uvicorn (ASGI, see asgi.py) workers
+SERVERS = ('test_client', 'gunicorn', 'uvicorn')
+SERVER_PACKAGES = {'test_client': (), 'gunicorn': ('gunicorn',), 'uvicorn': ('gunicorn', 'uvicorn')}
+# Sent with every request, as a browser would
+REQUEST_HEADERS = {'Accept-Encoding': 'br, gzip'}
+# Set on responses that used mock fallback data, see count_fallbacks
+FALLBACK_HEADER = 'X-Bench-Mock-Fallbacks'
+
+
+class StubUpstream:
+    """
+    Deterministic stand-in for Yahoo Finance, Alpha Vantage and News API
+
+    Every call sleeps for ``latency`` seconds, then answers with seeded
+    mock data, so a ticker always gets the same bars, news and info.
+    """
+
+    def __init__(self, latency=0.05, seed=7):
+        self.latency = latency
+        self.market = MockMarket(seed=seed)
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def wait(self, operation):
+        with self._lock:
+            self.calls[operation] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def frame(self, ticker, period='1y', interval='1d', start=None):
+        """Mock bars as the DataFrame yfinance's history() returns"""
+        days = int(period[:-1]) * {'d': 1, 'y': 365}[period[-1]] if period else 365
+        bars = self.market.bars(ticker, days, interval)
+        if start is not None:
+            bars = bars[bars['date'] >= np.datetime64(pd.Timestamp(start).to_datetime64(), 'm')]
+        return pd.DataFrame({
+            'Open': bars['open'],
+            'High': bars['high'],
+            'Low': bars['low'],
+            'Close': bars['close'],
+            'Volume': bars['volume']
+        }, index=pd.DatetimeIndex(bars['date'].astype('M8[ns]'), name='Date'))
+
+    def ticker(self, ticker):
+        """A stand-in for yf.Ticker(ticker)"""
+        return StubTicker(self, ticker.upper())
+
+    def download(self, tickers, period='1y', interval='1d', **kwargs):
+        """A stand-in for yf.download(..., group_by='ticker')"""
+        self.wait('download')
+        if isinstance(tickers, str):
+            tickers = tickers.split()
+        return pd.concat({t: self.frame(t, period, interval) for t in tickers}, axis=1)
+
+    def http_get(self, url, params=None, **kwargs):
+        """A stand-in for requests.get"""
+        self.wait('http')
+        params = params or {}
+        response = requests.Response()
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        if 'alphavantage' in url:
+            bars = self.market.bars(params.get('symbol', 'AAPL'), 365)
+            payload = {'Time Series (Daily)': {
+                str(bar['date'].astype('M8[D]')): {
+                    '1. open': str(bar['open']),
+                    '2. high': str(bar['high']),
+                    '3. low': str(bar['low']),
+                    '4. close': str(bar['close']),
+                    '5. volume': str(bar['volume'])
+                } for bar in bars
+            }}
+        elif 'newsapi' in url:
+            payload = {'status': 'ok', 'articles': [
+                {'title': a['title'], 'source': {'name': a['source']}, 'url': a['url'],
+                 'publishedAt': a['publishedAt'], 'description': ''}
+                for a in self.market.news(params.get('q', ''), params.get('q', ''))
+            ]}
+        else:
+            response.status_code = 404
+            response._content = b'{}'
+            return response
+        response.status_code = 200
+        response._content = json.dumps(payload).encode()
+        return response
+
+    def install(self):
+        """Patch yfinance and requests to answer from this stand-in"""
+        yf.Ticker = self.ticker
+        yf.download = self.download
+        requests.get = self.http_get
+        requests.Session.get = lambda session, url, **kwargs: self.http_get(url, **kwargs)
+        return self
+
+
+class StubTicker:
+    """The parts of yf.Ticker the app uses"""
+
+    def __init__(self, upstream, ticker):
+        self.upstream = upstream
+        self.ticker = ticker
+
+    def history(self, period=None, interval='1d', start=None, **kwargs):
+        self.upstream.wait('history')
+        return self.upstream.frame(self.ticker, period, interval, start)
+
+    @property
+    def news(self):
+        self.upstream.wait('news')
+        return [{'content': {
+            'title': a['title'],
+            'pubDate': a['publishedAt'],
+            'provider': {'displayName': a['source']},
+            'canonicalUrl': {'url': a['url']}
+        }} for a in self.upstream.market.news(self.ticker, self.ticker)]
+
+    @property
+    def info(self):
+        self.upstream.wait('info')
+        closes = self.upstream.market.bars(self.ticker)['close']
+        return {
+            'symbol': self.ticker,
+            'longName': f"{self.ticker} Corporation",
+            'sector': 'Technology',
+            'exchange': 'NMS',
+            'trailingPE': 24.5,
+            'marketCap': int(closes[-1] * 1_000_000_000),
+            'fiftyTwoWeekHigh': float(closes.max()),
+            'fiftyTwoWeekLow': float(closes.min()),
+            'averageVolume': 5_000_000,
+            'dividendRate': 0.96,
+            'dividendYield': 0.005,
+            'beta': 1.1,
+            'trailingEps': 6.1
+        }
+
+    @property
+    def fast_info(self):
+        self.upstream.wait('fast_info')
+        bars = self.upstream.market.bars(self.ticker)
+        return SimpleNamespace(last_price=float(bars['close'][-1]), previous_close=float(bars['close'][-2]),
+                               last_volume=int(bars['volume'][-1]))
+
+
+def count_fallbacks(market_pulse):
+    """
+    Mark responses that were built from mock fallback data
+
+    Counts the app's mock fallbacks taken on the request's own thread and
+    reports them in FALLBACK_HEADER. Fallbacks taken on another thread,
+    such as the dashboard's section loaders, aren't attributed to a route.
+    """
+    from flask import g, has_request_context
+
+    counter = market_pulse.mock_fallbacks
+    inc = counter.inc
+
+    def counting_inc(*labels, amount=1):
+        if has_request_context():
+            g.bench_fallbacks = g.get('bench_fallbacks', 0) + amount
+        inc(*labels, amount=amount)
+
+    def tag(response):
+        if g.get('bench_fallbacks'):
+            response.headers[FALLBACK_HEADER] = str(g.bench_fallbacks)
+        return response
+
+    counter.inc = counting_inc
+    # after_request hooks run last-registered first; run after the app's
+    # own, which may replace the response
+    market_pulse.app.after_request_funcs.setdefault(None, []).insert(0, tag)
+
+
+def create_app():
+    """
+    gunicorn app factory: the app with upstreams replaced by the stand-in
+
+    Configured with BENCH_UPSTREAM_LATENCY and BENCH_SEED, as gunicorn
+    imports it in a fresh process.
+    """
+    StubUpstream(float(os.environ.get("BENCH_UPSTREAM_LATENCY", 0.05)),
+                 int(os.environ.get("BENCH_SEED", 7))).install()
+    import app as market_pulse
+    count_fallbacks(market_pulse)
+    return market_pulse.app
+
+
+def create_asgi_app():
+    """uvicorn app factory: the ASGI server mode over create_app()"""
+    create_app()
+    import asgi
+    return asgi.app
+
+
+def ticker_name(prefix, i):
+    """Synthetic ticker ``i`` of a workload, e.g. 'CAAAB'; unique per prefix"""
+    letters = []
+    for _ in range(4):
+        i, digit = divmod(i, 26)
+        letters.append(chr(ord('A') + digit))
+    return prefix + ''.join(reversed(letters))
+
+
+def request_paths(tickers):
+    """One (route, path) per ticker, cycling through ROUTES"""
+    paths = []
+    for i, ticker in enumerate(tickers):
+        name, template = ROUTES[i % len(ROUTES)]
+        other = tickers[i - 1] if tickers[i - 1] != ticker else 'SPY'
+        paths.append((name, template.format(t=ticker, u=other, q=ticker[:3])))
+    return paths
+
+
+def workload(name, count, hot, universe, run, seed=0):
+    """
+    Build a workload's warm-up and timed requests
+
+    Each run of a workload gets its own ticker prefix, so a later run
+    against the same server is still cold.
+
+    Returns:
+        tuple: (warm-up paths, timed paths)
+    """
+    rng = random.Random(seed)
+    prefix = chr(ord('A') + run % 26)
+    if name == 'cold':
+        return [], request_paths([ticker_name(prefix, i) for i in range(count)])
+    if name == 'warm':
+        tickers = [ticker_name(prefix, i) for i in range(hot)]
+        # Every route for every ticker, so all timed requests are hits
+        warmup = [(route, template.format(t=t, u=tickers[i - 1], q=t[:3]))
+                  for i, t in enumerate(tickers) for route, template in ROUTES]
+        return warmup, request_paths([rng.choice(tickers) for _ in range(count)])
+    weights = 1 / np.arange(1, universe + 1) ** 1.1
+    picks = rng.choices(range(universe), weights=weights, k=count)
+    return [], request_paths([ticker_name(prefix, i) for i in picks])
+
+
+def drive(send, paths, concurrency):
+    """
+    Send ``paths`` from ``concurrency`` threads
+
+    Args:
+        send (callable): Given a thread's connection state and a path,
+                         sends the request and returns its status code
+                         and whether it used mock fallback data
+        paths (list): (route, path) pairs
+        concurrency (int): Number of client threads
+
+    Returns:
+        tuple: ([(route, seconds, status, fallback)], wall-clock seconds)
+    """
+    samples = []
+    lock = threading.Lock()
+
+    def client(share):
+        state = {}
+        local = []
+        for route, path in share:
+            start = time.perf_counter()
+            try:
+                status, fallback = send(state, path)
+            except Exception:
+                status, fallback = 0, False
+            local.append((route, time.perf_counter() - start, status, fallback))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(paths[k::concurrency],)) for k in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, seconds):
+    """Requests/second, error and fallback counts and latency percentiles (ms), overall and per route"""
+    def percentiles(latencies):
+        p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+        return {'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2), 'p99_ms': round(p99, 2)}
+
+    by_route = {}
+    for route, latency, status, fallback in samples:
+        by_route.setdefault(route, []).append((latency, status, fallback))
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, status, _ in samples if not 200 <= status < 400),
+        'fallbacks': sum(1 for *_, fallback in samples if fallback),
+        'seconds': round(seconds, 3),
+        'rps': round(len(samples) / seconds, 1),
+        **percentiles([latency for _, latency, _, _ in samples]),
+        'routes': {
+            route: {
+                'requests': len(values),
+                'errors': sum(1 for _, status, _ in values if not 200 <= status < 400),
+                'fallbacks': sum(1 for *_, fallback in values if fallback),
+                **percentiles([latency for latency, _, _ in values])
+            } for route, values in sorted(by_route.items())
+        }
+    }
+
+
+def count_warmup_fallbacks(result, samples):
+    """Add fallbacks taken while warming up, as the timed cache hits then serve that data"""
+    for route, _, _, fallback in samples:
+        if fallback and route in result['routes']:
+            result['routes'][route]['fallbacks'] += 1
+            result['fallbacks'] += 1
+
+
+def run_test_client(args):
+    """Run every workload against the app in this process"""
+    upstream = StubUpstream(args.latency, args.seed).install()
+    import app as market_pulse
+    count_fallbacks(market_pulse)
+    flask_app = market_pulse.app
+
+    def send(state, path):
+        client = state.get('client') or state.setdefault('client', flask_app.test_client())
+        response = client.get(path, headers=REQUEST_HEADERS)
+        return response.status_code, FALLBACK_HEADER in response.headers
+
+    results = {}
+    for run, name in enumerate(WORKLOADS):
+        warmup, paths = workload(name, args.requests, args.hot, args.universe, run, args.seed)
+        warmup_samples, _ = drive(send, warmup, args.concurrency)
+        before = upstream.calls.copy()
+        samples, seconds = drive(send, paths, args.concurrency)
+        results[name] = summarize(samples, seconds)
+        count_warmup_fallbacks(results[name], warmup_samples)
+        results[name]['upstream_calls'] = dict(sorted((upstream.calls - before).items()))
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server, args, port):
+    """Command line serving the stubbed app with gthread (WSGI) or uvicorn (ASGI) gunicorn workers"""
+    command = [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(args.workers),
+        '--bind', f'127.0.0.1:{port}',
+        '--chdir', ROOT,
+        '--pythonpath', os.path.join(ROOT, 'benchmarks'),
+        '--log-level', 'warning'
+    ]
+    if server == 'gunicorn':
+        return command + ['--worker-class', 'gthread', '--threads', str(args.threads), 'api_bench:create_app()']
+    return command + ['--worker-class', 'uvicorn.workers.UvicornWorker', 'api_bench:create_asgi_app()']
+
+
+def start_server(server, args, port):
+    """Start ``server`` and wait until it answers"""
+    env = dict(os.environ, BENCH_UPSTREAM_LATENCY=str(args.latency), BENCH_SEED=str(args.seed))
+    process = subprocess.Popen(server_command(server, args, port), env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{server} exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/api/cache_stats')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{server} did not start within 60 seconds")
+
+
+def run_server(server, args):
+    """Run every workload against a gunicorn server over HTTP"""
+    port = free_port()
+    process = start_server(server, args, port)
+
+    def send(state, path):
+        connection = state.get('connection')
+        if connection is None:
+            connection = state['connection'] = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        try:
+            connection.request('GET', path, headers=REQUEST_HEADERS)
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader(FALLBACK_HEADER) is not None
+        except (OSError, http.client.HTTPException):
+            # Reconnect on the next request
+            connection.close()
+            del state['connection']
+            raise
+
+    results = {}
+    try:
+        for run, name in enumerate(WORKLOADS):
+            warmup, paths = workload(name, args.requests, args.hot, args.universe, run, args.seed)
+            # Each worker has its own cache, so warm every one of them
+            warmup_samples = []
+            for _ in range(args.workers):
+                warmup_samples += drive(send, warmup, args.concurrency)[0]
+            samples, seconds = drive(send, paths, args.concurrency)
+            results[name] = summarize(samples, seconds)
+            count_warmup_fallbacks(results[name], warmup_samples)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=SERVERS + ('all',), default='all')
+    parser.add_argument('--requests', type=int, default=550, help="Timed requests per workload")
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds every upstream call takes")
+    parser.add_argument('--concurrency', type=int, default=8, help="Client threads")
+    parser.add_argument('--hot', type=int, default=10, help="Tickers in the warm workload")
+    parser.add_argument('--universe', type=int, default=500, help="Tickers in the mixed workload")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument('--threads', type=int, default=8, help="Threads per gunicorn worker")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', default='api_bench.json', help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    servers = SERVERS if args.server == 'all' else (args.server,)
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('server', 'output')},
+        'results': {}
+    }
+    for server in servers:
+        missing = [name for name in SERVER_PACKAGES[server] if importlib.util.find_spec(name) is None]
+        if missing:
+            print(f"{server}: skipped, {' and '.join(missing)} not installed")
+            continue
+        results = run_test_client(args) if server == 'test_client' else run_server(server, args)
+        report['results'][server] = results
+        print(server)
+        for name, result in results.items():
+            print(f"  {name:6} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+                  f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  {result['errors']} errors")
+            broken = [route for route, stats in result['routes'].items() if stats['fallbacks']]
+            if broken:
+                print(f"         served from mock fallback data, not measured: {', '.join(broken)}")
+                report.setdefault('fallback_routes', {}).setdefault(server, {})[name] = broken
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+    print(f"Results written to {args.output}")
+    if report.get('fallback_routes'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/json_bench.py
+"""
+Requests/second on cached /api/stock_data and /api/company_news responses
+
+Compares three ways of answering a cache hit:
+  - jsonify + stdlib: re-encode the cached data with the standard library
+    encoder on every request (the original behaviour)
+  - jsonify + orjson: re-encode on every request with the orjson provider
+  - cached bytes:     the routes as they are, sending the body that was
+                      serialized once for the cache entry
+
+The cache is filled with mock data up front, so no request touches the
+network. Requests go through Flask's test client without compression.
+
+Usage:
+    python benchmarks/json_bench.py --requests 2000 --days 365
+"""
+import os
+import sys
+import time
+import argparse
+
+# Keep the benchmark in-process: no shared SQLite tier, no on-disk price store
+os.environ.setdefault("SHARED_CACHE_PATH", "")
+os.environ.setdefault("PRICE_STORE_DIR", "")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import jsonify  # noqa: E402
+import app as market_pulse  # noqa: E402
+from json_provider import JSON_PROVIDERS, orjson  # noqa: E402
+
+TICKER = 'AAPL'
+
+
+def fill_cache(days):
+    """Put a ticker's bars and news in the cache, as a first request would"""
+    app = market_pulse
+    app.cache.set(app.stock_data_cache_key(TICKER), app.mock_market.series(TICKER, days))
+    app.cache.set(f"news_{TICKER}", app.mock_market.news(TICKER, app.get_company_name(TICKER)))
+
+
+def add_baseline_routes(flask_app):
+    """Routes that serve the same cache hits but encode them on every request"""
+    app = market_pulse
+    options, _ = app.parse_stock_data_args({})
+
+    @flask_app.route('/bench/stock_data')
+    def bench_stock_data():
+        return jsonify(app.shape_stock_data(app.get_cached_stock_data(TICKER), options))
+
+    @flask_app.route('/bench/company_news')
+    def bench_company_news():
+        return jsonify(app.get_cached_company_news(TICKER))
+
+
+def measure(client, path, requests):
+    """Return requests/second and the response size for ``path``"""
+    size = len(client.get(path).data)  # warm up
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return requests / (time.perf_counter() - start), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--days', type=int, default=365, help="Days of daily bars in the cached series")
+    args = parser.parse_args()
+
+    flask_app = market_pulse.app
+    add_baseline_routes(flask_app)
+    fill_cache(args.days)
+    client = flask_app.test_client()
+
+    for endpoint in ('stock_data', 'company_news'):
+        print(f"/api/{endpoint}?ticker={TICKER}")
+        results = []
+        for name in ('stdlib', 'orjson'):
+            if name == 'orjson' and orjson is None:
+                print("  jsonify + orjson: skipped, orjson is not installed")
+                continue
+            flask_app.json = JSON_PROVIDERS[name](flask_app)
+            rate, size = measure(client, f"/bench/{endpoint}?ticker={TICKER}", args.requests)
+            results.append((f"jsonify + {name}", rate, size))
+        rate, size = measure(client, f"/api/{endpoint}?ticker={TICKER}", args.requests)
+        results.append(("cached bytes", rate, size))
+
+        baseline = results[0][1]
+        for label, rate, size in results:
+            print(f"  {label:18} {rate:8.0f} req/s  ({rate / baseline:.1f}x, {size} bytes)")
+
+
+if __name__ == '__main__':
+    main()
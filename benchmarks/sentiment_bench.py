@@ -0,0 +1,80 @@
+# benchmarks/sentiment_bench.py
+"""
+Headline sentiment throughput, before and after the memoized engine
+
+Simulates dashboard traffic: every page view scores a ticker's headlines
+once for /api/company_news and once for /api/stock_sentiment, and most
+headlines are still in the feed on the next refresh.
+
+Usage:
+    python benchmarks/sentiment_bench.py --tickers 50 --headlines 20 --refreshes 5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+from textblob import TextBlob
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sentiment import SentimentEngine, sentiment_label  # noqa: E402
+
+WORDS = ("beats", "misses", "record", "growth", "lawsuit", "strong", "weak", "upgrade",
+         "downgrade", "surges", "plunges", "expands", "cuts", "guidance", "profit", "loss")
+
+
+def make_feeds(tickers, headlines, refreshes, seed=0):
+    """Build the headline lists seen on each refresh; 80% carry over between refreshes"""
+    rng = random.Random(seed)
+
+    def headline(ticker):
+        return f"{ticker} " + " ".join(rng.choice(WORDS) for _ in range(8))
+
+    feeds = []
+    current = {t: [headline(t) for _ in range(headlines)] for t in (f"T{i}" for i in range(tickers))}
+    for _ in range(refreshes):
+        feeds.append({t: list(h) for t, h in current.items()})
+        for t, h in current.items():
+            keep = h[:int(headlines * 0.8)]
+            current[t] = [headline(t) for _ in range(headlines - len(keep))] + keep
+    return feeds
+
+
+def baseline(texts):
+    """The original analyze_sentiment: a fresh TextBlob per headline"""
+    for text in texts:
+        polarity = TextBlob(text).sentiment.polarity
+        sentiment_label(polarity)
+
+
+def run(feeds, score):
+    scored = 0
+    start = time.perf_counter()
+    for feed in feeds:
+        for titles in feed.values():
+            score(titles)  # /api/company_news
+            score(titles)  # /api/stock_sentiment
+            scored += 2 * len(titles)
+    return scored / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickers', type=int, default=50)
+    parser.add_argument('--headlines', type=int, default=20)
+    parser.add_argument('--refreshes', type=int, default=5)
+    args = parser.parse_args()
+
+    feeds = make_feeds(args.tickers, args.headlines, args.refreshes)
+    before = run(feeds, baseline)
+    engine = SentimentEngine()
+    after = run(feeds, engine.score_many)
+
+    print(f"before (TextBlob per headline): {before:10.0f} headlines/s")
+    print(f"after  (SentimentEngine):       {after:10.0f} headlines/s  ({after / before:.1f}x)")
+    print(f"engine cache: {engine.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+# breaker.py
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+# Throttling errors raised by provider libraries, matched by class name so
+# the libraries don't have to be imported here
+THROTTLING_ERRORS = frozenset({'YFRateLimitError'})
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling a provider that is throttled or failing"""
+
+
+def is_provider_failure(error):
+    """
+    Return True if ``error`` means the provider is failing, not the request
+
+    Transport errors and timeouts (``OSError``, which requests and curl_cffi
+    errors derive from), HTTP 429 and 5xx responses and throttling errors
+    count. Anything else, such as a parse error or an unknown symbol, is
+    caused by the request and must not open the provider's circuit.
+
+    Args:
+        error (Exception): Exception raised by a provider call
+
+    Returns:
+        bool: Whether the error counts against the provider
+    """
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, OSError) or type(error).__name__ in THROTTLING_ERRORS
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``, and
+    each call takes one, so short bursts are allowed while the long-run
+    request rate stays under the provider's quota.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Take a token if one is available, without waiting"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    @property
+    def tokens(self):
+        """Tokens available right now"""
+        with self._lock:
+            return min(self.burst, self._tokens + (time.monotonic() - self._updated) * self.rate)
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single
+    trial call through: success closes it again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @property
+    def state(self):
+        """Current state: 'closed', 'open' or 'half_open'"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """Return True if a call may go ahead"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Past the timeout only one trial call is let through at a time
+            if self._trial_running:
+                return False
+            self._state = HALF_OPEN
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        """Close the breaker after a successful call"""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """End a trial call without counting it as a success or a failure"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker past the threshold"""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class ProviderGuard:
+    """
+    Rate limiter and circuit breaker in front of one data provider
+
+    ``call`` raises ``ProviderUnavailable`` right away while the provider's
+    breaker is open or its token bucket is empty, so callers skip to their
+    next provider or to cached and mock data instead of waiting for a
+    request that is likely to fail. Both kinds of rejections are counted
+    as shed calls. Only errors ``is_failure`` blames on the provider count
+    towards opening the breaker, so bad input such as an unknown ticker
+    can't take a provider out for everyone.
+
+    Calls that do go through are reported to ``observer``, if given, as
+    ``observer(provider, operation, seconds, error)``.
+    """
+
+    def __init__(self, name, rate, burst, failure_threshold=5, reset_timeout=30, observer=None,
+                 is_failure=is_provider_failure):
+        self.name = name
+        self.observer = observer
+        self.is_failure = is_failure
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.calls = 0
+        self.failures = 0
+        self.shed_open = 0
+        self.shed_rate_limited = 0
+
+    def call(self, fn, *args, operation='call', **kwargs):
+        """
+        Call ``fn`` if the provider is healthy and within its rate limit
+
+        Exceptions raised by ``fn`` are re-raised; those ``is_failure``
+        blames on the provider also count as provider failures.
+
+        Args:
+            fn (callable): Function making the upstream request
+            *args: Positional arguments for ``fn``
+            operation (str): Name of the request for the observer, e.g. 'history'
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Whatever ``fn`` returns
+
+        Raises:
+            ProviderUnavailable: If the call was shed
+        """
+        if self.breaker.state == OPEN:
+            self.shed_open += 1
+            raise ProviderUnavailable(f"{self.name} circuit is open")
+        if not self.bucket.try_acquire():
+            self.shed_rate_limited += 1
+            raise ProviderUnavailable(f"{self.name} rate limit exceeded")
+        if not self.breaker.allow():
+            # Another thread is already making the half-open trial call
+            self.shed_open += 1
+            raise ProviderUnavailable(f"{self.name} circuit is open")
+
+        self.calls += 1
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if self.observer is not None:
+                self.observer(self.name, operation, time.perf_counter() - start, e)
+            if not self.is_failure(e):
+                self.breaker.release()
+                raise
+            self.failures += 1
+            was_open = self.breaker.opened
+            self.breaker.record_failure()
+            if self.breaker.opened != was_open:
+                logger.warning(f"Circuit for {self.name} opened, skipping it for {self.breaker.reset_timeout}s")
+            raise
+        if self.observer is not None:
+            self.observer(self.name, operation, time.perf_counter() - start, None)
+        self.breaker.record_success()
+        return result
+
+    def stats(self):
+        """
+        Return a snapshot of the provider's breaker and limiter
+
+        Returns:
+            dict: Breaker state, available tokens and call/shed counters
+        """
+        return {
+            'state': self.breaker.state,
+            'tokens': round(self.bucket.tokens, 2),
+            'calls': self.calls,
+            'failures': self.failures,
+            'shed_open': self.shed_open,
+            'shed_rate_limited': self.shed_rate_limited,
+            'times_opened': self.breaker.opened
+        }
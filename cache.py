@@ -0,0 +1,531 @@
+# cache.py
+import sys
+import time
+import threading
+import logging
+from collections import OrderedDict, Counter
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def estimate_size(obj, _seen=None):
+    """
+    Estimate the memory footprint of a cached value in bytes
+
+    Walks dicts, lists, tuples and sets recursively so nested payloads
+    (e.g. a list of OHLCV dicts) are accounted for, not just the outer
+    container.
+
+    Args:
+        obj: Value to measure
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    if _seen is None:
+        _seen = set()
+    obj_id = id(obj)
+    if obj_id in _seen:
+        return 0
+    _seen.add(obj_id)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key, _seen) + estimate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, _seen)
+    return size
+
+
+class _Flight:
+    """A load in progress that concurrent callers can wait on"""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-prefix TTLs and a hard size budget
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the estimated byte size exceeds its limit. Each key's TTL is
+    chosen by the longest matching prefix in ``ttls`` (e.g. ``stock_data_``),
+    falling back to ``default_ttl``.
+
+    Concurrent misses for the same key are coalesced: only the first caller
+    of ``get_or_load`` runs the loader, the rest wait for its result.
+
+    An optional ``shared`` tier (see ``shared_cache.SQLiteCache``) is read
+    through on local misses and written on every load, so worker processes
+    reuse each other's fetches. A lease on the shared tier extends miss
+    coalescing across processes.
+
+    Entries past their TTL are kept for a further ``stale_ttl`` seconds so
+    ``lookup`` can hand them out while a background refresh runs (see
+    ``refresher.BackgroundRefresher``).
+
+    Values derived from an entry, such as its serialized response bodies,
+    can be stored alongside it with ``set_derived``. They count towards the
+    byte budget and are dropped whenever the entry is replaced or evicted,
+    so they never outlive the data they were built from.
+    """
+
+    # Derived values kept per entry, oldest dropped first
+    max_derived = 8
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, ttls=None, default_ttl=300,
+                 shared=None, lease_timeout=10, stale_ttl=0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.shared = shared
+        self.lease_timeout = lease_timeout
+        self.stale_ttl = stale_ttl
+        # Longest prefix first so 'stock_data_intraday_' wins over 'stock_data_'
+        self._ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        # (key prefix, 'hit'/'stale'/'miss') -> count
+        self.outcomes = Counter()
+
+    def ttl_for(self, key):
+        """Return the TTL in seconds that applies to ``key``"""
+        for prefix, ttl in self._ttls:
+            if key.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def prefix_for(self, key):
+        """Return the TTL prefix ``key`` falls under, or '' if none matches"""
+        for prefix, _ in self._ttls:
+            if key.startswith(prefix):
+                return prefix
+        return ''
+
+    def _is_fresh(self, key, entry, now):
+        return now - entry['timestamp'] < self.ttl_for(key)
+
+    def _is_servable(self, key, entry, now):
+        return now - entry['timestamp'] < self.ttl_for(key) + self.stale_ttl
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry['size']
+        return entry
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry['size']
+            self.evictions += 1
+            logger.debug(f"Evicted cache entry {key}")
+
+    def lookup(self, key, default=None):
+        """
+        Return the cached value for ``key`` along with its freshness
+
+        Args:
+            key (str): Cache key
+            default: Value returned on a miss
+
+        Returns:
+            tuple: ``(value, state)`` where state is 'fresh', 'stale' or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                self.outcomes[self.prefix_for(key), 'miss'] += 1
+                return default, None
+            if self._is_fresh(key, entry, now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.outcomes[self.prefix_for(key), 'hit'] += 1
+                return entry['data'], 'fresh'
+            if self._is_servable(key, entry, now):
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self.outcomes[self.prefix_for(key), 'stale'] += 1
+                return entry['data'], 'stale'
+            self._remove(key)
+            self.misses += 1
+            self.outcomes[self.prefix_for(key), 'miss'] += 1
+            return default, None
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for ``key`` if present and not expired
+
+        Args:
+            key (str): Cache key
+            default: Value returned on a miss
+
+        Returns:
+            The cached value, or ``default``
+        """
+        value, state = self.lookup(key, default)
+        return value if state == 'fresh' else default
+
+    def expires_in(self, key):
+        """
+        Return the seconds left before ``key`` goes stale
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            float: Seconds until expiry (negative once stale), or None if absent
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry['timestamp'] + self.ttl_for(key) - time.time()
+
+    def set(self, key, data, timestamp=None, share=True):
+        """
+        Store ``data`` under ``key``, evicting older entries if over budget
+
+        Args:
+            key (str): Cache key
+            data: Value to cache
+            timestamp (float): Time the value was fetched, defaults to now
+            share (bool): Also write the value to the shared tier
+        """
+        timestamp = timestamp or time.time()
+        if share and self.shared is not None:
+            self.shared.set(key, data, self.ttl_for(key), timestamp)
+        size = estimate_size(data)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                logger.warning(f"Not caching {key}: {size} bytes exceeds the cache budget")
+                return
+            self._entries[key] = {
+                'timestamp': timestamp,
+                'data': data,
+                'size': size,
+                'derived': {}
+            }
+            self._bytes += size
+            self._evict()
+
+    def lookup_derived(self, key, name):
+        """
+        Return a value stored with ``key``'s entry by ``set_derived``
+
+        Args:
+            key (str): Cache key
+            name: Hashable name of the derived value
+
+        Returns:
+            tuple: ``(value, state)`` where state is 'fresh' or 'stale', or
+                   ``(None, None)`` if the entry or the value is missing
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            derived = entry['derived'].get(name) if entry is not None else None
+            if derived is None or not self._is_servable(key, entry, now):
+                return None, None
+            value = derived[0]
+            self._entries.move_to_end(key)
+            if self._is_fresh(key, entry, now):
+                self.hits += 1
+                self.outcomes[self.prefix_for(key), 'hit'] += 1
+                return value, 'fresh'
+            self.stale_hits += 1
+            self.outcomes[self.prefix_for(key), 'stale'] += 1
+            return value, 'stale'
+
+    def set_derived(self, key, data, name, value, size):
+        """
+        Store a value derived from ``data`` with ``key``'s entry
+
+        Nothing is stored if the entry no longer holds ``data``, e.g.
+        because it was refreshed while the value was being built.
+
+        Args:
+            key (str): Cache key
+            data: The cached value ``value`` was derived from
+            name: Hashable name of the derived value
+            value: Derived value
+            size (int): Size of ``value`` in bytes
+
+        Returns:
+            bool: True if the value was stored
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['data'] is not data:
+                return False
+            derived = entry['derived']
+            if name in derived:
+                return True
+            while len(derived) >= self.max_derived:
+                _, dropped = derived.pop(next(iter(derived)))
+                entry['size'] -= dropped
+                self._bytes -= dropped
+            derived[name] = (value, size)
+            entry['size'] += size
+            self._bytes += size
+            self._evict()
+            return True
+
+    def delete(self, key):
+        """Remove ``key`` from the cache if present"""
+        with self._lock:
+            self._remove(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def _load_shared(self, key, loader, newer_than=0):
+        """
+        Read ``key`` through the shared tier, loading it if no process has
+
+        Only shared entries fetched after ``newer_than`` are used, so a
+        refresh isn't answered with the very value it is replacing.
+        """
+        if self.shared is None:
+            value = loader()
+            self.set(key, value)
+            return value
+
+        entry = self.shared.get(key, newer_than)
+        if entry is None and not self.shared.acquire_lease(key, self.lease_timeout):
+            # Another worker is already fetching this key, wait for its result
+            entry = self.shared.wait_for(key, self.lease_timeout, newer_than=newer_than)
+        if entry is not None:
+            timestamp, value = entry
+            self.set(key, value, timestamp=timestamp, share=False)
+            return value
+
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            self.shared.release_lease(key)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for ``key``, loading it on a miss
+
+        If another thread is already loading the same key, wait for that
+        load instead of starting a second one.
+
+        Args:
+            key (str): Cache key
+            loader (callable): Zero-argument function producing the value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self.reload(key, loader)
+
+    def reload(self, key, loader):
+        """
+        Load ``key`` regardless of what is cached and store the result
+
+        Shares in-flight loads for the same key like ``get_or_load``. The
+        shared tier's value is taken instead of calling ``loader`` only if
+        it is newer than the local entry, e.g. another worker refreshed it.
+
+        Args:
+            key (str): Cache key
+            loader (callable): Zero-argument function producing the value
+
+        Returns:
+            The freshly loaded value
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            newer_than = entry['timestamp'] if entry is not None else 0
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._load_shared(key, loader, newer_than)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def load_many(self, keys, load_batch, load_one):
+        """
+        Load several keys with one batched call, coalescing like ``reload``
+
+        Keys another thread is loading are waited for, and keys another
+        worker holds the shared-tier lease for are read once it publishes
+        them. Only the remaining keys are passed to ``load_batch``, so
+        overlapping batch and single-key requests fetch each key once.
+
+        Args:
+            keys (list): Cache keys to load
+            load_batch (callable): Takes a list of keys and returns a dict
+                                   of the values it could load
+            load_one (callable): Takes one key left out by ``load_batch``
+                                 and returns its value
+
+        Returns:
+            dict: Mapping of each key to its loaded value
+        """
+        claimed = {}
+        waiting = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                flight = self._inflight.get(key)
+                if flight is None:
+                    entry = self._entries.get(key)
+                    flight = self._inflight[key] = _Flight()
+                    claimed[key] = (flight, entry['timestamp'] if entry is not None else 0)
+                else:
+                    self.coalesced += 1
+                    waiting[key] = flight
+
+        results = {}
+        leased = []
+        try:
+            batch = []
+            for key, (flight, newer_than) in claimed.items():
+                if self.shared is None:
+                    batch.append(key)
+                    continue
+                entry = self.shared.get(key, newer_than)
+                if entry is None and self.shared.acquire_lease(key, self.lease_timeout):
+                    leased.append(key)
+                    batch.append(key)
+                    continue
+                if entry is None:
+                    # Another worker is already fetching this key, wait for its result
+                    entry = self.shared.wait_for(key, self.lease_timeout, newer_than=newer_than)
+                if entry is None:
+                    batch.append(key)
+                    continue
+                timestamp, results[key] = entry
+                self.set(key, results[key], timestamp=timestamp, share=False)
+
+            loaded = {}
+            if batch:
+                try:
+                    loaded = load_batch(batch)
+                except Exception as e:
+                    logger.warning(f"Batch load of {len(batch)} keys failed: {e}, loading them one by one")
+            for key in batch:
+                try:
+                    results[key] = loaded[key] if key in loaded else load_one(key)
+                except Exception as e:
+                    claimed[key][0].error = e
+                    continue
+                self.set(key, results[key])
+        finally:
+            for key in leased:
+                self.shared.release_lease(key)
+            with self._lock:
+                for key, (flight, _) in claimed.items():
+                    if key in results:
+                        flight.result = results[key]
+                    elif flight.error is None:
+                        flight.error = RuntimeError(f"Loading {key} was interrupted")
+                    self._inflight.pop(key, None)
+            for flight, _ in claimed.values():
+                flight.event.set()
+
+        for key, (flight, _) in claimed.items():
+            if flight.error is not None:
+                raise flight.error
+        for key, flight in waiting.items():
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            results[key] = flight.result
+        return results
+
+    def purge_expired(self):
+        """
+        Drop every entry that is past its TTL and stale grace period
+
+        Returns:
+            int: Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if not self._is_servable(key, entry, now)]
+            for key in expired:
+                self._remove(key)
+        return len(expired)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Return a snapshot of cache counters
+
+        Returns:
+            dict: Entry count, byte usage, limits and hit/miss counters, in
+                  total and per key prefix
+        """
+        with self._lock:
+            by_prefix = {}
+            for (prefix, outcome), count in self.outcomes.items():
+                by_prefix.setdefault(prefix or 'other', {'hit': 0, 'stale': 0, 'miss': 0})[outcome] = count
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'coalesced': self.coalesced,
+                'inflight': len(self._inflight),
+                'by_prefix': by_prefix,
+                'shared': self.shared.stats() if self.shared is not None else None
+            }
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
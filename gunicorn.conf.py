@@ -0,0 +1,27 @@
+# gunicorn.conf.py
+import gc
+import os
+
+# Quote streams hold a thread each for as long as a dashboard is open, so a
+# sync worker per connection would be used up by a few tabs. Threaded
+# workers keep serving other requests; app.MAX_STREAMS caps the streams
+# below the thread count. Override with -k/--threads on the command line.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+
+
+def when_ready(server):
+    """
+    Warm the app up in the master when it is preloaded (gunicorn --preload)
+
+    Workers are then forked with yfinance, pandas and TextBlob already
+    loaded and share those pages copy-on-write, so they start serving at
+    once and each takes much less memory than importing them itself.
+    """
+    if not server.cfg.preload_app:
+        return
+    import app
+    app.warm_up()
+    # Keep the garbage collector away from everything loaded so far, so
+    # collections in the workers don't write to (and so copy) those pages
+    gc.freeze()
@@ -0,0 +1,152 @@
+# http_cache.py
+import gzip
+import time
+import hashlib
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are only gzip-compressed
+    brotli = None
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# For bodies built per request and compressed once each: most of the size
+# reduction for a fraction of the CPU
+FAST_GZIP_LEVEL = 1
+FAST_BROTLI_QUALITY = 1
+# Preferred first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body, encoding, fast=False):
+    """
+    Compress a response body
+
+    Args:
+        body (bytes): Uncompressed body
+        encoding (str): 'gzip' or 'br'
+        fast (bool): Trade compression ratio for speed
+
+    Returns:
+        bytes: Compressed body
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=FAST_BROTLI_QUALITY if fast else BROTLI_QUALITY)
+    # mtime=0 keeps the output, and so its ETag, identical across workers
+    return gzip.compress(body, FAST_GZIP_LEVEL if fast else GZIP_LEVEL, mtime=0)
+
+
+class EncodedBody:
+    """
+    A serialized response body, its compressed forms and its ETag
+
+    The ETag is a hash of the uncompressed body, so it only changes when
+    the data does and is the same in every worker. Each encoding gets its
+    own strong ETag (``"<hash>-gzip"``), as they are different byte
+    sequences. Compressed forms are made on first use, or all at once with
+    ``precompress`` before the body is cached. Bodies that are only sent
+    once should be made with ``fast=True``, which compresses them at the
+    lowest levels.
+    """
+
+    __slots__ = ('body', 'etag', 'mimetype', 'expires_at', 'fast', '_encoded')
+
+    def __init__(self, body, mimetype='application/json', expires_at=None, fast=False):
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.mimetype = mimetype
+        self.expires_at = expires_at
+        self.fast = fast
+        self._encoded = {}
+
+    @property
+    def compressible(self):
+        """Whether the body is large enough to be sent compressed"""
+        return len(self.body) >= MIN_COMPRESS_SIZE
+
+    def encoded(self, encoding):
+        """Return the body compressed with ``encoding``, compressing it once"""
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = self._encoded[encoding] = compress(self.body, encoding, self.fast)
+        return data
+
+    def precompress(self):
+        """
+        Compress the body with every supported encoding ahead of time
+
+        Returns:
+            EncodedBody: self
+        """
+        if self.compressible:
+            for encoding in ENCODINGS:
+                self.encoded(encoding)
+        return self
+
+    @property
+    def size(self):
+        """Bytes held by the body and its compressed forms"""
+        return len(self.body) + sum(len(data) for data in self._encoded.values())
+
+    def etag_for(self, encoding):
+        """Strong ETag of the body as sent with ``encoding`` (None for identity)"""
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+    def negotiate(self, accept_encodings):
+        """
+        Pick the encoding to send
+
+        Args:
+            accept_encodings: The request's parsed Accept-Encoding header
+
+        Returns:
+            str: 'br' or 'gzip', or None to send the body uncompressed
+        """
+        if not self.compressible:
+            return None
+        for encoding in ENCODINGS:
+            if accept_encodings[encoding]:
+                return encoding
+        return None
+
+    def respond(self, request, max_age=None):
+        """
+        Build the response for ``request``
+
+        Answers 304 Not Modified when the request's If-None-Match holds an
+        ETag of this body in any encoding, as the client already has it.
+
+        Args:
+            request: The Flask request
+            max_age (int): Cache-Control max-age, defaults to the seconds
+                           left until ``expires_at``; without either the
+                           client is told to revalidate every time
+
+        Returns:
+            Response: The response
+        """
+        if max_age is None and self.expires_at is not None:
+            max_age = max(0, int(self.expires_at - time.time()))
+
+        encoding = self.negotiate(request.accept_encodings) if 'Accept-Encoding' in request.headers else None
+        etag = self.etag_for(encoding)
+        known = [tag for tag in map(self.etag_for, (None,) + ENCODINGS) if request.if_none_match.contains(tag)] \
+            if 'If-None-Match' in request.headers else []
+
+        # Plain header values are much cheaper than werkzeug's header helpers
+        # on this path, which runs for every cache hit
+        headers = {
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'no-cache' if max_age is None else f"public, max-age={max_age}"
+        }
+        if known:
+            headers['ETag'] = f'"{known[0]}"'
+            return Response(status=304, headers=headers)
+        headers['ETag'] = f'"{etag}"'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(self.encoded(encoding) if encoding else self.body, headers=headers, mimetype=self.mimetype)
@@ -0,0 +1,364 @@
+# indicators.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Longest window or span accepted for any indicator parameter
+MAX_WINDOW = 1000
+# Tails up to this many values are averaged in Python rather than with pandas
+SHORT_TAIL = 64
+
+
+def rolling_mean(values, window):
+    """Rolling mean over ``window`` values, NaN until the window is full"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def rolling_std(values, window, ddof=0):
+    """Rolling standard deviation over ``window`` values, NaN until the window is full"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=ddof)
+    return out
+
+
+def ema(values, alpha, seed=None):
+    """
+    Exponential moving average with smoothing factor ``alpha``
+
+    Args:
+        values (np.ndarray): Input values
+        alpha (float): Smoothing factor between 0 and 1
+        seed (float): Average just before ``values[0]``, to continue a series
+
+    Returns:
+        np.ndarray: One average per input value
+    """
+    if len(values) == 0:
+        return np.empty(0)
+    if seed is not None and not np.isnan(seed) and len(values) <= SHORT_TAIL:
+        # Incremental updates only cover a few bars, where a plain loop
+        # beats building a pandas Series
+        out = np.empty(len(values))
+        for i, value in enumerate(values.tolist()):
+            seed = seed + alpha * (value - seed)
+            out[i] = seed
+        return out
+    # Imported here so that loading the app doesn't import pandas
+    import pandas as pd
+    if seed is None or np.isnan(seed):
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    # Prepending the seed continues the recursion exactly where it left off
+    return pd.Series(np.insert(values, 0, seed)).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _seed(previous, name, start):
+    return previous[name][start - 1] if previous is not None and start > 0 else None
+
+
+# Each indicator takes the bar columns, its parameters, the previous result
+# (or None) and the index to recompute from, and returns the values from
+# ``start`` onwards. Outputs whose names start with '_' are internal state
+# kept to continue the recursion on the next update.
+
+def _sma(bars, params, previous, start):
+    window = params['window']
+    lo = max(start - window + 1, 0)
+    return {'sma': rolling_mean(bars['close'][lo:], window)[start - lo:]}
+
+
+def _ema(bars, params, previous, start):
+    alpha = 2 / (params['span'] + 1)
+    return {'ema': ema(bars['close'][start:], alpha, _seed(previous, 'ema', start))}
+
+
+def _rsi(bars, params, previous, start):
+    period = params['period']
+    close = bars['close']
+    n = len(close)
+    # Bar 0 has no change, so the averages start at bar 1
+    lo = max(start, 1)
+    delta = close[lo:] - close[lo - 1:-1] if n > lo else np.empty(0)
+    alpha = 1 / period
+    avg_gain = ema(np.clip(delta, 0, None), alpha, _seed(previous, '_avg_gain', lo))
+    avg_loss = ema(np.clip(-delta, 0, None), alpha, _seed(previous, '_avg_loss', lo))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    # Wilder's RSI needs a full period of changes before it is meaningful
+    index = np.arange(lo, n)
+    rsi[index < period] = np.nan
+
+    pad = np.full(lo - start, np.nan)
+    return {
+        'rsi': np.concatenate([pad, rsi]),
+        '_avg_gain': np.concatenate([pad, avg_gain]),
+        '_avg_loss': np.concatenate([pad, avg_loss])
+    }
+
+
+def _macd(bars, params, previous, start):
+    close = bars['close'][start:]
+    fast = ema(close, 2 / (params['fast'] + 1), _seed(previous, '_ema_fast', start))
+    slow = ema(close, 2 / (params['slow'] + 1), _seed(previous, '_ema_slow', start))
+    macd = fast - slow
+    signal = ema(macd, 2 / (params['signal'] + 1), _seed(previous, 'signal', start))
+    return {
+        'macd': macd,
+        'signal': signal,
+        'histogram': macd - signal,
+        '_ema_fast': fast,
+        '_ema_slow': slow
+    }
+
+
+def _bollinger(bars, params, previous, start):
+    window = params['window']
+    lo = max(start - window + 1, 0)
+    close = bars['close'][lo:]
+    middle = rolling_mean(close, window)[start - lo:]
+    width = params['k'] * rolling_std(close, window)[start - lo:]
+    return {
+        'middle': middle,
+        'upper': middle + width,
+        'lower': middle - width
+    }
+
+
+def _vwap(bars, params, previous, start):
+    window = params['window']
+    typical = (bars['high'] + bars['low'] + bars['close']) / 3
+    volume = bars['volume'].astype(np.float64)
+
+    if window:
+        lo = max(start - window + 1, 0)
+        price_volume = rolling_mean(typical[lo:] * volume[lo:], window)[start - lo:]
+        total_volume = rolling_mean(volume[lo:], window)[start - lo:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {'vwap': price_volume / total_volume}
+
+    # Anchored VWAP: cumulative from the first bar, or from each session's
+    # first bar when session is set
+    price_volume = typical[start:] * volume[start:]
+    cum_pv = np.cumsum(price_volume)
+    cum_volume = np.cumsum(volume[start:])
+    # Bars that continue the series (or session) the stored sums end in
+    carried = np.ones(len(cum_pv), dtype=bool)
+    if params.get('session'):
+        days = bars['date'][max(start - 1, 0):].astype('M8[D]')
+        new_session = days[1:] != days[:-1]
+        if not start:
+            new_session = np.insert(new_session, 0, True)
+        # Restart both sums at the first bar of every session
+        positions = np.arange(len(cum_pv))
+        first = np.maximum.accumulate(np.where(new_session, positions, 0))
+        cum_pv = cum_pv - cum_pv[first] + price_volume[first]
+        cum_volume = cum_volume - cum_volume[first] + volume[start:][first]
+        carried = ~np.logical_or.accumulate(new_session)
+
+    seed_pv = _seed(previous, '_cum_pv', start)
+    if seed_pv is not None:
+        cum_pv = cum_pv + np.where(carried, seed_pv, 0.0)
+        cum_volume = cum_volume + np.where(carried, _seed(previous, '_cum_volume', start), 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = cum_pv / cum_volume
+    return {
+        'vwap': vwap,
+        '_cum_pv': cum_pv,
+        '_cum_volume': cum_volume
+    }
+
+
+def _volatility(bars, params, previous, start):
+    window = params['window']
+    # Each window of returns needs one extra close before it
+    lo = max(start - window, 0)
+    close = bars['close'][lo:]
+    returns = np.full(len(close), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.log(close[1:] / close[:-1])
+    volatility = np.full(len(close), np.nan)
+    if len(close) > window:
+        volatility[window:] = sliding_window_view(returns[1:], window).std(axis=1, ddof=1)
+    return {'volatility': volatility[start - lo:] * np.sqrt(params['periods'])}
+
+
+def _anchored(name, params):
+    """Whether the indicator accumulates from the series' first bar"""
+    return name == 'vwap' and not params['window'] and not params.get('session')
+
+
+# name: (function, parameter names and defaults in positional order, public outputs)
+INDICATORS = {
+    'sma': (_sma, (('window', 20),), ('sma',)),
+    'ema': (_ema, (('span', 20),), ('ema',)),
+    'rsi': (_rsi, (('period', 14),), ('rsi',)),
+    'macd': (_macd, (('fast', 12), ('slow', 26), ('signal', 9)), ('macd', 'signal', 'histogram')),
+    'bollinger': (_bollinger, (('window', 20), ('k', 2.0)), ('middle', 'upper', 'lower')),
+    'vwap': (_vwap, (('window', 0),), ('vwap',)),
+    'volatility': (_volatility, (('window', 20), ('periods', 252)), ('volatility',))
+}
+
+
+def to_json_values(values, decimals=4):
+    """
+    Round an indicator array for a JSON response
+
+    Args:
+        values (np.ndarray): Indicator values
+        decimals (int): Decimal places to keep
+
+    Returns:
+        list: Rounded floats, with None where the indicator is undefined
+    """
+    return [None if value != value else value for value in np.round(values, decimals).tolist()]
+
+
+def parse_indicator_spec(spec):
+    """
+    Parse an indicator spec such as 'sma', 'rsi:14' or 'macd:12:26:9'
+
+    Parameters are positional and default to the indicator's standard
+    settings when omitted.
+
+    Args:
+        spec (str): Indicator name followed by optional ':'-separated parameters
+
+    Returns:
+        tuple: (name, params dict)
+
+    Raises:
+        ValueError: If the name or a parameter is invalid
+    """
+    name, *values = spec.strip().lower().split(':')
+    if name not in INDICATORS:
+        raise ValueError(f"Unknown indicator '{name}', expected one of {', '.join(INDICATORS)}")
+    defaults = INDICATORS[name][1]
+    if len(values) > len(defaults):
+        raise ValueError(f"Too many parameters for {name}, expected at most {len(defaults)}")
+
+    params = {}
+    for (param, default), value in zip(defaults, values + [None] * len(defaults)):
+        if value is None or value == '':
+            params[param] = default
+            continue
+        try:
+            params[param] = type(default)(value)
+        except ValueError:
+            raise ValueError(f"Invalid {param} '{value}' for {name}")
+        # A zero VWAP window means anchored rather than rolling
+        if not 0 < params[param] <= MAX_WINDOW and not (name == 'vwap' and params[param] == 0):
+            raise ValueError(f"{name} {param} must be greater than 0 and at most {MAX_WINDOW}")
+    return name, params
+
+
+class IndicatorEngine:
+    """
+    Vectorized technical indicators with incremental updates
+
+    Results are kept per (series key, indicator, params) in a bounded LRU.
+    When the same series comes back with bars appended, only the last
+    previously seen bar (which may have been an unfinished session) and the
+    new bars are recomputed: windowed indicators re-run over the trailing
+    window, and recursive ones (EMA, RSI, MACD, anchored VWAP) continue
+    from their stored state. Bars dropped from the front, as a rolling
+    period window or the price store's trimming does, don't invalidate the
+    rest; only VWAP anchored at the first bar has to start over. If earlier
+    bars changed, e.g. after a split adjustment, the whole series is
+    recomputed.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.incremental = 0
+        self.full = 0
+
+    def compute(self, series_key, bars, name, params):
+        """
+        Compute an indicator over a bar series
+
+        Args:
+            series_key (str): Identifies the series, e.g. 'AAPL:1d'
+            bars (dict): 'date' (datetime64) and OHLCV columns as NumPy arrays
+            name (str): Indicator name, one of INDICATORS
+            params (dict): Indicator parameters from parse_indicator_spec
+
+        Returns:
+            dict: Mapping of output name to a float array, one value per bar
+        """
+        fn, _, outputs = INDICATORS[name]
+        key = (series_key, name, tuple(sorted(params.items())))
+        dates = bars['date']
+        close = bars['close']
+        n = len(dates)
+        if n == 0:
+            return {output: np.empty(0) for output in outputs}
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        start = 0
+        if entry is not None:
+            if (len(entry['date']) == n and np.array_equal(entry['date'], dates)
+                    and np.array_equal(entry['close'], close, equal_nan=True)):
+                self.hits += 1
+                return {output: entry['values'][output] for output in outputs}
+            # Bars before the new first one have rolled out of the series
+            offset = int(np.searchsorted(entry['date'], dates[0]))
+            seen = len(entry['date']) - offset
+            # The last bar seen may have been an unfinished session, so it is
+            # always recomputed along with anything newer
+            start = seen - 1
+            if (start <= 0 or n < seen or (offset and _anchored(name, params))
+                    or not (np.array_equal(entry['date'][offset:offset + start], dates[:start])
+                            and np.array_equal(entry['close'][offset:offset + start], close[:start],
+                                               equal_nan=True))):
+                start = 0
+
+        previous = {output: values[offset:] for output, values in entry['values'].items()} if start else None
+        tail = fn(bars, params, previous, start)
+        if start:
+            values = {output: np.concatenate([previous[output][:start], tail[output]]) for output in tail}
+            self.incremental += 1
+        else:
+            values = tail
+            self.full += 1
+
+        with self._lock:
+            self._entries[key] = {
+                'date': np.array(dates),
+                'close': np.array(close),
+                'values': values
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return {output: values[output] for output in outputs}
+
+    def stats(self):
+        """
+        Return a snapshot of engine counters
+
+        Returns:
+            dict: Entry count and how many computations were cached, incremental or full
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'incremental': self.incremental,
+                'full': self.full
+            }
@@ -0,0 +1,103 @@
+# json_provider.py
+import os
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used without it
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Flask's default provider, plus ``dumps_bytes`` for pre-encoded bodies
+
+    ``dumps_bytes`` always produces compact UTF-8 bytes with sorted keys,
+    ready to be cached and compressed.
+    """
+
+    def dumps_bytes(self, obj):
+        """
+        Serialize ``obj`` to compact JSON bytes
+
+        Args:
+            obj: JSON-serializable value
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        return self.dumps(obj, separators=(',', ':')).encode()
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    JSON provider that encodes with orjson
+
+    Output matches the default provider's apart from non-ASCII text being
+    written as UTF-8 rather than escaped, NaN being written as null and
+    float exponents losing their leading zero (1e-7 rather than 1e-07).
+    Keys are still sorted, so ETags of identical data stay identical.
+    NumPy arrays and scalars are encoded natively; dates and other types
+    orjson doesn't handle go through the default provider's ``default``.
+    """
+
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+               | orjson.OPT_PASSTHROUGH_DATETIME) if orjson is not None else 0
+
+    def dumps_bytes(self, obj):
+        """
+        Serialize ``obj`` to compact JSON bytes
+
+        Args:
+            obj: JSON-serializable value
+
+        Returns:
+            bytes: UTF-8 encoded JSON
+        """
+        return orjson.dumps(obj, default=self.default, option=self.options)
+
+    def dumps(self, obj, **kwargs):
+        # Formatting options (e.g. indent in debug mode) need the standard encoder
+        if kwargs and set(kwargs) != {'separators'}:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Indented output for debugging
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'stdlib': StdlibJSONProvider,
+    'orjson': OrjsonProvider
+}
+
+
+def json_provider_class(name=None):
+    """
+    Pick the JSON provider class for the app
+
+    Args:
+        name (str): 'orjson' or 'stdlib', defaults to the JSON_PROVIDER
+                    environment variable, then to orjson if it is installed
+
+    Returns:
+        type: A provider class to assign to ``Flask.json_provider_class``
+    """
+    name = name or os.environ.get("JSON_PROVIDER") or ('orjson' if orjson is not None else 'stdlib')
+    if name == 'orjson' and orjson is None:
+        logger.warning("JSON_PROVIDER=orjson but orjson is not installed, using the standard library encoder")
+        name = 'stdlib'
+    return JSON_PROVIDERS[name]
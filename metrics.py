@@ -0,0 +1,162 @@
+# metrics.py
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Request and upstream latencies, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """Add ``amount`` to the series for ``labels``"""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        """Yield (name, label string, value) for every series"""
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets and optional labels
+
+    Each observation only bumps one bucket; the cumulative counts
+    Prometheus expects are summed up when the metrics are rendered.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Record one observation in the series for ``labels``"""
+        # Index of the first bucket whose upper bound holds the value
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe how long the ``with`` block takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        """Yield (name, label string, value) for every bucket, sum and count"""
+        with self._lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket
+                yield f"{self.name}_bucket", _labels(self.labelnames, labels, [('le', _number(bound))]), cumulative
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _labels(self.labelnames, labels), count
+
+
+class Collected:
+    """
+    Metric whose values are read from elsewhere when it is rendered
+
+    ``collect`` returns a mapping of label tuples to values, e.g. from a
+    component's ``stats()``, so counters the app already keeps don't have
+    to be counted twice.
+    """
+
+    def __init__(self, name, help, labelnames, collect, kind='gauge'):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def samples(self):
+        """Yield (name, label string, value) for every collected series"""
+        for labels, value in sorted(self.collect().items()):
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Registry:
+    """A set of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        """Add ``metric`` to the registry and return it"""
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        """Create and register a Counter"""
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Create and register a Histogram"""
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def collected(self, name, help, labelnames, collect, kind='gauge'):
+        """Create and register a Collected metric"""
+        return self.register(Collected(name, help, labelnames, collect, kind))
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: The exposition text
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,226 @@
+# mock_data.py
+import zlib
+import random
+import datetime
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from series import BAR_DTYPE, PriceSeries
+
+# Bar length in minutes for intraday intervals, and bars per year for longer ones
+INTRADAY_MINUTES = {'1m': 1, '5m': 5, '1h': 60}
+BARS_PER_YEAR = {'1d': 252, '1wk': 52}
+SESSION_OPEN = 9 * 60 + 30  # 09:30, minutes after midnight
+SESSION_CLOSE = 16 * 60  # 16:00
+MIN_PRICE = 0.01
+
+NEWS_TEMPLATES = [
+    "{company} Reports Quarterly Earnings Above Expectations",
+    "{company} Announces New Product Line",
+    "Analysts Upgrade {company} Stock Rating",
+    "{company} Expands Operations to New Markets",
+    "{company} CEO Discusses Future Growth Strategy",
+    "Investors React to {company}'s Latest Announcement",
+    "{company} Partners with Tech Giant for New Initiative",
+    "Market Trends: How {company} is Positioned for Growth",
+    "{company} Addresses Supply Chain Challenges",
+    "Regulatory Changes Could Impact {company}'s Business Model"
+]
+NEWS_SOURCES = ["Reuters", "Bloomberg", "CNBC", "Wall Street Journal", "Financial Times",
+                "MarketWatch", "Barron's", "Seeking Alpha", "Investor's Business Daily", "The Motley Fool"]
+
+
+def bar_times(end, days, interval='1d'):
+    """
+    Timestamps of the trading bars in the ``days`` calendar days before ``end``
+
+    Weekends are skipped, weekly bars fall on Mondays and intraday bars
+    cover the 09:30-16:00 session.
+
+    Args:
+        end (np.datetime64): Day after the last bar
+        days (int): Number of calendar days to cover
+        interval (str): One of BARS_PER_YEAR or INTRADAY_MINUTES
+
+    Returns:
+        np.ndarray: datetime64[m] timestamps, oldest first
+    """
+    dates = end - np.arange(days, 0, -1)
+    dates = dates[np.is_busday(dates, weekmask='Mon' if interval == '1wk' else '1111100')]
+    if interval not in INTRADAY_MINUTES:
+        return dates.astype('M8[m]')
+    offsets = np.arange(SESSION_OPEN, SESSION_CLOSE, INTRADAY_MINUTES[interval]).astype('m8[m]')
+    return (dates.astype('M8[m]')[:, None] + offsets).ravel()
+
+
+class MockMarket:
+    """
+    Seeded synthetic market data for demos, fallbacks and load tests
+
+    Prices follow a geometric Brownian motion generated in one vectorized
+    pass, so any ticker and any length of history takes milliseconds.
+    The random stream is seeded from ``seed`` and the ticker, so a ticker
+    always gets the same series, in every worker and across restarts.
+    Series are only generated when first asked for and the most recently
+    used ones are memoized.
+    """
+
+    def __init__(self, seed=42, base_prices=None, drift=0.08, volatility=0.3, max_entries=256):
+        self.seed = seed
+        self.base_prices = dict(base_prices or {})
+        self.drift = drift
+        self.volatility = volatility
+        self.max_entries = max_entries
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.generated = 0
+
+    def _rng(self, *parts):
+        return np.random.default_rng([self.seed] + [zlib.crc32(str(part).encode()) for part in parts])
+
+    def base_price(self, ticker):
+        """Starting price for ``ticker``, between 20 and 500 unless configured"""
+        if ticker in self.base_prices:
+            return self.base_prices[ticker]
+        return float(np.exp(self._rng(ticker, 'base').uniform(np.log(20), np.log(500))))
+
+    def generate(self, ticker, days=365, interval='1d', end=None):
+        """
+        Generate bars for ``ticker`` without memoizing them
+
+        Args:
+            ticker (str): Stock ticker symbol
+            days (int): Number of calendar days of history
+            interval (str): One of BARS_PER_YEAR or INTRADAY_MINUTES
+            end (np.datetime64): Day after the last bar, defaults to today
+
+        Returns:
+            np.ndarray: Array with BAR_DTYPE, one element per bar
+        """
+        if interval not in BARS_PER_YEAR and interval not in INTRADAY_MINUTES:
+            raise ValueError(f"Unsupported interval: {interval}")
+        if end is None:
+            end = np.datetime64(datetime.date.today(), 'D')
+        times = bar_times(end, days, interval)
+        n = len(times)
+
+        rng = self._rng(ticker, interval)
+        bars_per_year = BARS_PER_YEAR.get(interval) \
+            or BARS_PER_YEAR['1d'] * len(range(SESSION_OPEN, SESSION_CLOSE, INTRADAY_MINUTES[interval]))
+        sigma = self.volatility / np.sqrt(bars_per_year)
+        shocks = rng.standard_normal((4, n))
+
+        log_returns = (self.drift - self.volatility ** 2 / 2) / bars_per_year + sigma * shocks[0]
+        close = self.base_price(ticker) * np.exp(np.cumsum(log_returns))
+        previous = np.concatenate(([self.base_price(ticker)], close[:-1]))
+        open_ = previous * np.exp(sigma / 3 * shocks[1])
+        high = np.maximum(open_, close) * np.exp(np.abs(shocks[2]) * sigma / 2)
+        low = np.minimum(open_, close) * np.exp(-np.abs(shocks[3]) * sigma / 2)
+        # Busier bars on bigger moves, around 5M shares a day
+        volume = rng.lognormal(np.log(5_000_000 * BARS_PER_YEAR['1d'] / bars_per_year), 0.35, n) * (1 + 20 * np.abs(log_returns))
+
+        bars = np.empty(n, dtype=BAR_DTYPE)
+        bars['date'] = times
+        # GBM prices never reach zero, but rounding to cents would
+        for field, prices in (('open', open_), ('high', high), ('low', low), ('close', close)):
+            bars[field] = np.maximum(prices.round(2), MIN_PRICE)
+        bars['volume'] = volume.astype(np.int64)
+        return bars
+
+    def _entry(self, ticker, days, interval):
+        key = (ticker, days, interval, datetime.date.today())
+        with self._lock:
+            entry = self._series.get(key)
+            if entry is not None:
+                self._series.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = PriceSeries(self.generate(ticker, days, interval), interval in INTRADAY_MINUTES)
+        with self._lock:
+            # Keep the first copy if another thread generated it meanwhile
+            entry = self._series.setdefault(key, entry)
+            self._series.move_to_end(key)
+            self.generated += 1
+            while len(self._series) > self.max_entries:
+                self._series.popitem(last=False)
+        return entry
+
+    def bars(self, ticker, days=365, interval='1d'):
+        """
+        Return memoized bars for ``ticker``, generating them on first use
+
+        Args:
+            ticker (str): Stock ticker symbol
+            days (int): Number of calendar days of history
+            interval (str): One of BARS_PER_YEAR or INTRADAY_MINUTES
+
+        Returns:
+            np.ndarray: Read-only array with BAR_DTYPE, shared
+        """
+        return self._entry(ticker, days, interval).bars
+
+    def series(self, ticker, days=365, interval='1d'):
+        """
+        Return memoized bars for ``ticker`` as a PriceSeries, ready to cache
+
+        Args:
+            ticker (str): Stock ticker symbol
+            days (int): Number of calendar days of history
+            interval (str): One of BARS_PER_YEAR or INTRADAY_MINUTES
+
+        Returns:
+            PriceSeries: The bars, read-only and shared
+        """
+        return self._entry(ticker, days, interval)
+
+    def news(self, ticker, company_name, count=10):
+        """
+        Generate mock news articles about a company
+
+        Headlines, sources and sentiment are seeded by the ticker; publication
+        times are spread over the last week.
+
+        Args:
+            ticker (str): Stock ticker symbol
+            company_name (str): Company name used in the headlines
+            count (int): Number of articles
+
+        Returns:
+            list: List of dictionaries containing news data
+        """
+        rng = random.Random(f"{self.seed}:{ticker}:news")
+        now = datetime.datetime.now()
+        articles = []
+        for i in range(count):
+            # Slightly positive bias
+            sentiment_value = rng.normalvariate(0.2, 0.5)
+            sentiment_label = "positive" if sentiment_value > 0.1 else "negative" if sentiment_value < -0.1 else "neutral"
+            pub_date = now - datetime.timedelta(days=rng.randint(0, 7), hours=rng.randint(0, 24))
+            articles.append({
+                'title': NEWS_TEMPLATES[i % len(NEWS_TEMPLATES)].format(company=company_name),
+                'source': rng.choice(NEWS_SOURCES),
+                'url': '#',  # Placeholder URL
+                'publishedAt': pub_date.isoformat(),
+                'sentiment': sentiment_value,
+                'sentiment_label': sentiment_label
+            })
+        return articles
+
+    def stats(self):
+        """
+        Return a snapshot of generator counters
+
+        Returns:
+            dict: Memoized series count and hit/generation counters
+        """
+        with self._lock:
+            return {
+                'series': len(self._series),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'generated': self.generated
+            }
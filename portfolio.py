@@ -0,0 +1,274 @@
+# portfolio.py
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PriceMatrix:
+    """
+    Close prices for many tickers aligned on one date index
+
+    Rows are the sorted union of every column's dates and columns are
+    tickers, with NaN where a ticker has no bar. Columns are updated one
+    at a time: when a ticker's cached series changes, only its column is
+    rewritten, and the other columns are only re-indexed (in one vectorized
+    copy) if the new series brings dates the index didn't have.
+
+    Source series are remembered by identity, so handing in the same
+    cached object again costs nothing. The least recently used columns are
+    dropped beyond ``max_tickers``, and rows older than the first date of
+    every remaining column are dropped as the series roll forward, so the
+    matrix never spans more than the longest series it holds.
+    """
+
+    def __init__(self, max_tickers=500):
+        self.max_tickers = max_tickers
+        self.dates = np.empty(0, dtype='M8[m]')
+        self.values = np.empty((0, 0))
+        self._columns = OrderedDict()  # ticker -> column index, least recently used first
+        self._sources = {}
+        self._first_dates = {}  # ticker -> date of its first bar
+        self._lock = threading.Lock()
+        self.column_updates = 0
+        self.reindexes = 0
+        self.trims = 0
+
+    def update(self, ticker, source, to_arrays):
+        """
+        Make sure ``ticker``'s column reflects ``source``
+
+        Args:
+            ticker (str): Stock ticker symbol
+            source: The cached series the column is built from
+            to_arrays (callable): Function turning ``source`` into
+                                  (datetime64 dates, float closes) arrays
+
+        Returns:
+            bool: True if the column had to be rebuilt
+        """
+        with self._lock:
+            if ticker in self._columns:
+                self._columns.move_to_end(ticker)
+                if self._sources.get(ticker) is source:
+                    return False
+
+        dates, closes = to_arrays(source)
+        with self._lock:
+            self._sources[ticker] = source
+            if ticker not in self._columns:
+                self._add_column(ticker)
+            column = self._columns[ticker]
+
+            rows = np.searchsorted(self.dates, dates)
+            known = (rows < len(self.dates)) & (self.dates[np.minimum(rows, len(self.dates) - 1)] == dates) \
+                if len(self.dates) else np.zeros(len(dates), dtype=bool)
+            if not known.all():
+                self._reindex(np.union1d(self.dates, dates))
+                rows = np.searchsorted(self.dates, dates)
+
+            self.values[:, column] = np.nan
+            self.values[rows, column] = closes
+            if len(dates):
+                self._first_dates[ticker] = dates[0]
+            else:
+                self._first_dates.pop(ticker, None)
+            self.column_updates += 1
+            self._evict()
+            self._trim()
+        return True
+
+    def _add_column(self, ticker):
+        width = len(self._columns)
+        if width == self.values.shape[1]:
+            # Grow geometrically so adding many tickers doesn't copy the matrix each time
+            grown = np.full((len(self.dates), max(8, 2 * width)), np.nan)
+            grown[:, :width] = self.values
+            self.values = grown
+        self._columns[ticker] = width
+
+    def _reindex(self, dates):
+        values = np.full((len(dates), self.values.shape[1]), np.nan)
+        values[np.searchsorted(dates, self.dates)] = self.values
+        self.dates = dates
+        self.values = values
+        self.reindexes += 1
+
+    def _evict(self):
+        while len(self._columns) > self.max_tickers:
+            ticker, column = self._columns.popitem(last=False)
+            self._sources.pop(ticker, None)
+            self._first_dates.pop(ticker, None)
+            # Move the last column into the freed slot to keep columns contiguous
+            last = len(self._columns)
+            if column != last:
+                moved = next(other for other, index in self._columns.items() if index == last)
+                self.values[:, column] = self.values[:, last]
+                self._columns[moved] = column
+            self.values[:, last] = np.nan
+
+    def _trim(self):
+        first = min(self._first_dates.values()) if self._first_dates else None
+        drop = int(np.searchsorted(self.dates, first)) if first is not None else len(self.dates)
+        if drop:
+            # Copy so the dropped rows' memory is released
+            self.dates = self.dates[drop:].copy()
+            self.values = self.values[drop:].copy()
+            self.trims += 1
+
+    def select(self, tickers, start=None):
+        """
+        Return the aligned closes for ``tickers``
+
+        Rows where none of the tickers has a bar are dropped. A ticker can be
+        evicted by another thread's ``update`` between its own ``update`` and
+        this call, so missing tickers are reported rather than raised.
+
+        Args:
+            tickers (list): Tickers previously passed to ``update``
+            start (np.datetime64): Drop rows before this date
+
+        Returns:
+            tuple: (dates array, closes matrix with one column per ticker,
+                   list of tickers no longer in the matrix); the columns
+                   of missing tickers are all NaN
+        """
+        with self._lock:
+            # Column indexes as of now; eviction can move them once the lock is released
+            columns = [self._columns.get(ticker) for ticker in tickers]
+            first = int(np.searchsorted(self.dates, start)) if start is not None else 0
+            values = np.full((len(self.dates) - first, len(tickers)), np.nan)
+            for i, column in enumerate(columns):
+                if column is not None:
+                    values[:, i] = self.values[first:, column]
+            dates = self.dates[first:]
+        missing = [ticker for ticker, column in zip(tickers, columns) if column is None]
+        present = ~np.isnan(values).all(axis=1)
+        return dates[present], values[present], missing
+
+    def stats(self):
+        """
+        Return a snapshot of matrix counters
+
+        Returns:
+            dict: Matrix shape and how often columns were rebuilt or re-indexed
+        """
+        with self._lock:
+            return {
+                'dates': len(self.dates),
+                'tickers': len(self._columns),
+                'max_tickers': self.max_tickers,
+                'column_updates': self.column_updates,
+                'reindexes': self.reindexes,
+                'trims': self.trims
+            }
+
+
+def log_returns(closes):
+    """
+    Per-bar log returns of an aligned price matrix
+
+    A return is NaN when either bar is missing.
+
+    Args:
+        closes (np.ndarray): Dates x tickers matrix of close prices
+
+    Returns:
+        np.ndarray: Matrix with one row fewer than ``closes``
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.diff(np.log(closes), axis=0)
+
+
+def _pairwise_moments(returns):
+    """Sums over the rows where both columns of each pair have a return"""
+    valid = ~np.isnan(returns)
+    mask = valid.astype(np.float64)
+    x = np.where(valid, returns, 0.0)
+    count = mask.T @ mask
+    # sums[i, j] sums column i over the rows where column j is also valid
+    sums = x.T @ mask
+    squares = (x * x).T @ mask
+    products = x.T @ x
+    return count, sums, squares, products
+
+
+def correlation_matrix(returns, min_periods=2):
+    """
+    Pairwise Pearson correlation of return columns
+
+    Each pair uses every row where both columns have a return, and all
+    pairs are computed with a handful of matrix products.
+
+    Args:
+        returns (np.ndarray): Dates x tickers matrix of returns, NaN where missing
+        min_periods (int): Fewest overlapping returns for a defined correlation
+
+    Returns:
+        np.ndarray: Tickers x tickers correlation matrix, NaN where undefined
+    """
+    count, sums, squares, products = _pairwise_moments(returns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = count * products - sums * sums.T
+        variance = count * squares - sums * sums
+        corr = covariance / np.sqrt(variance * variance.T)
+    corr[count < min_periods] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def betas(returns, benchmark, min_periods=2):
+    """
+    Beta of each return column against a benchmark column
+
+    Args:
+        returns (np.ndarray): Dates x tickers matrix of returns
+        benchmark (int): Column index of the benchmark
+        min_periods (int): Fewest overlapping returns for a defined beta
+
+    Returns:
+        np.ndarray: One beta per column, NaN where undefined
+    """
+    count, sums, squares, products = _pairwise_moments(returns)
+    n = count[:, benchmark]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = n * products[:, benchmark] - sums[:, benchmark] * sums[benchmark, :]
+        variance = n * squares[benchmark, :] - sums[benchmark, :] ** 2
+        beta = covariance / variance
+    beta[n < min_periods] = np.nan
+    return beta
+
+
+def rolling_correlation(returns, benchmark, window):
+    """
+    Trailing-window correlation of each return column with a benchmark
+
+    Windowed sums come from cumulative sums along the date axis, so every
+    column and window is computed at once.
+
+    Args:
+        returns (np.ndarray): Dates x tickers matrix of returns
+        benchmark (int): Column index of the benchmark
+        window (int): Number of trailing returns per correlation
+
+    Returns:
+        np.ndarray: Dates x tickers matrix, NaN until a window has at least
+                    half its returns
+    """
+    bench = returns[:, [benchmark]]
+    valid = ~np.isnan(returns) & ~np.isnan(bench)
+    x = np.where(valid, returns, 0.0)
+    y = np.where(valid, bench, 0.0)
+
+    def windowed(values):
+        sums = np.cumsum(np.vstack([np.zeros((1, values.shape[1])), values]), axis=0)
+        out = sums[1:].copy()
+        out[window:] -= sums[1:-window]
+        return out
+
+    n = windowed(valid.astype(np.float64))
+    sx, sy = windowed(x), windowed(y)
+    sxx, syy, sxy = windowed(x * x), windowed(y * y), windowed(x * y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+    corr[n < max(window // 2, 2)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
@@ -0,0 +1,167 @@
+# price_store.py
+import os
+import logging
+import datetime
+from contextlib import contextmanager
+
+import numpy as np
+
+from series import BAR_DTYPE, history_to_bars
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked, single-process use
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class PriceStore:
+    """
+    On-disk OHLCV store with one flat file of fixed-width bars per series
+
+    Each (ticker, interval) series is a file of BAR_DTYPE records sorted by
+    date. Reads map the file with ``np.memmap`` so no bytes are copied until
+    a bar is used. Updates only fetch bars from the second-to-last stored
+    bar onwards, so a refresh downloads a few bars instead of the whole
+    history, and drop bars that have aged out of the series' window.
+
+    Every write goes to a temporary file that atomically replaces the old
+    one, so processes that still map the old file keep reading it intact
+    and never see a half-written bar.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+
+    def path(self, ticker, interval):
+        """Return the file path for a ticker's bars at ``interval``"""
+        return os.path.join(self.root, interval, f"{ticker}.bin")
+
+    @contextmanager
+    def _locked(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def read(self, ticker, interval):
+        """
+        Map a stored series without copying it into memory
+
+        Args:
+            ticker (str): Stock ticker symbol
+            interval (str): Bar interval
+
+        Returns:
+            np.ndarray: Read-only BAR_DTYPE array, empty if nothing is stored
+        """
+        return self._map(self.path(ticker, interval))
+
+    def _map(self, path):
+        try:
+            count = os.path.getsize(path) // BAR_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        # A torn trailing record from an interrupted write is ignored
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def write(self, ticker, interval, bars):
+        """
+        Replace a stored series with ``bars``
+
+        Args:
+            ticker (str): Stock ticker symbol
+            interval (str): Bar interval
+            bars (np.ndarray): BAR_DTYPE array sorted by date
+        """
+        path = self.path(ticker, interval)
+        with self._locked(path):
+            self._replace(path, bars)
+
+    def _replace(self, path, bars):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+        os.replace(tmp_path, path)
+
+    def update(self, ticker, interval, fetch, max_gap_days, keep_days=None):
+        """
+        Bring a stored series up to date and return it
+
+        ``fetch(start)`` must return a yfinance-style history DataFrame,
+        either from ``start`` (an ISO date) or, when ``start`` is None, the
+        full default period. The full period is fetched when nothing is
+        stored, when the stored data is older than ``max_gap_days``, or when
+        the overlapping bar no longer matches (e.g. after a split or
+        dividend adjustment).
+
+        Args:
+            ticker (str): Stock ticker symbol
+            interval (str): Bar interval
+            fetch (callable): Function taking a start date or None
+            max_gap_days (int): Oldest anchor bar an incremental fetch may use
+            keep_days (int): Days of history to keep, defaults to max_gap_days
+
+        Returns:
+            np.ndarray: Read-only BAR_DTYPE array of the stored series
+        """
+        path = self.path(ticker, interval)
+        cutoff = np.datetime64(datetime.date.today() - datetime.timedelta(days=keep_days or max_gap_days), 'm')
+        with self._locked(path):
+            stored = self.read(ticker, interval)
+
+            if len(stored) >= 2:
+                # The last stored bar may be an unfinished session, so re-fetch
+                # from the one before it and use that as the overlap check
+                anchor = stored['date'][-2]
+                anchor_day = anchor.astype('M8[D]').item()
+                if (datetime.date.today() - anchor_day).days <= max_gap_days:
+                    fetched = history_to_bars(fetch(anchor_day.isoformat()))
+                    self.incremental_fetches += 1
+                    if len(fetched) == 0:
+                        return self._trimmed(path, stored, stored, cutoff)
+                    position = int(np.searchsorted(stored['date'], fetched['date'][0]))
+                    if (position < len(stored) and stored['date'][position] == fetched['date'][0]
+                            and np.isclose(stored['close'][position], fetched['close'][0], rtol=1e-4)
+                            and position + len(fetched) >= len(stored)):
+                        merged = np.concatenate((stored[:position], fetched))
+                        return self._trimmed(path, stored, merged, cutoff)
+                    logger.info(f"Stored {interval} bars for {ticker} no longer match upstream, refetching")
+
+            bars = history_to_bars(fetch(None))
+            self.full_fetches += 1
+            if len(bars):
+                return self._trimmed(path, stored, bars, cutoff)
+            return stored
+
+    def _trimmed(self, path, stored, bars, cutoff):
+        """Store ``bars`` from ``cutoff`` on, unless that is what is stored, and return them"""
+        bars = bars[int(np.searchsorted(bars['date'], cutoff)):]
+        if len(bars) == len(stored) and np.array_equal(bars, stored):
+            return stored
+        self._replace(path, bars)
+        return self._map(path)
+
+    def stats(self):
+        """
+        Return a snapshot of store counters
+
+        Returns:
+            dict: Store location and how many fetches were full vs incremental
+        """
+        return {
+            'root': self.root,
+            'full_fetches': self.full_fetches,
+            'incremental_fetches': self.incremental_fetches
+        }
@@ -0,0 +1,177 @@
+# quotes.py
+import time
+import queue
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def quote_delta(previous, quote):
+    """
+    Return the fields of ``quote`` that differ from ``previous``
+
+    Args:
+        previous (dict): Last published quote, or None
+        quote (dict): New quote
+
+    Returns:
+        dict: Changed fields, all of them if there is no previous quote
+    """
+    if previous is None:
+        return dict(quote)
+    return {field: value for field, value in quote.items() if previous.get(field) != value}
+
+
+class Subscription:
+    """A client's queue of quote messages for a set of tickers"""
+
+    __slots__ = ('tickers', 'queue')
+
+    def __init__(self, tickers, maxsize=100):
+        self.tickers = tuple(tickers)
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, message):
+        """Queue a message, dropping the oldest one if the client is falling behind"""
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Return the next message, or None if none arrived within ``timeout``"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class QuoteHub:
+    """
+    Fan-out of live quotes from one poller per ticker to many clients
+
+    The first subscriber to a ticker starts a poller thread that calls
+    ``fetch_quote(ticker)`` every ``poll_interval`` seconds and publishes
+    only the fields that changed. Every subscriber receives the latest full
+    quote on subscribing and the deltas after that, so the number of
+    upstream calls depends on the number of tickers watched, not on the
+    number of connected clients. A poller stops once its ticker has had no
+    subscribers for ``idle_timeout`` seconds.
+
+    Each client holds a server thread for as long as it is connected, so at
+    most ``max_subscriptions`` are accepted at a time.
+    """
+
+    def __init__(self, fetch_quote, poll_interval=15, idle_timeout=60, queue_size=100, max_subscriptions=16):
+        self.fetch_quote = fetch_quote
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.queue_size = queue_size
+        self.max_subscriptions = max_subscriptions
+        self._pollers = {}
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.polls = 0
+        self.poll_errors = 0
+        self.messages = 0
+
+    def subscribe(self, tickers):
+        """
+        Subscribe to quotes for ``tickers``, starting pollers as needed
+
+        Args:
+            tickers (list): Stock ticker symbols
+
+        Returns:
+            Subscription: Queue of quote messages for the client, or None if
+                          ``max_subscriptions`` clients are already subscribed
+        """
+        subscription = Subscription(tickers, self.queue_size)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_subscriptions:
+                self.rejected += 1
+                return None
+            self._subscriptions.add(subscription)
+            for ticker in subscription.tickers:
+                poller = self._pollers.get(ticker)
+                if poller is None:
+                    poller = self._pollers[ticker] = {
+                        'subscribers': set(),
+                        'last': None,
+                        'idle_since': time.monotonic()
+                    }
+                    threading.Thread(target=self._poll, args=(ticker,), name=f"quotes-{ticker}", daemon=True).start()
+                poller['subscribers'].add(subscription)
+                # Publishing happens under the same lock, so no delta can
+                # reach the client ahead of this snapshot
+                if poller['last'] is not None:
+                    subscription.put({'ticker': ticker, **poller['last']})
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering quotes to ``subscription``"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            for ticker in subscription.tickers:
+                poller = self._pollers.get(ticker)
+                if poller is not None:
+                    poller['subscribers'].discard(subscription)
+                    if not poller['subscribers']:
+                        poller['idle_since'] = time.monotonic()
+
+    def _poll(self, ticker):
+        while True:
+            with self._lock:
+                poller = self._pollers[ticker]
+                if not poller['subscribers'] and time.monotonic() - poller['idle_since'] >= self.idle_timeout:
+                    del self._pollers[ticker]
+                    return
+
+            try:
+                quote = self.fetch_quote(ticker)
+                self.polls += 1
+            except Exception as e:
+                self.poll_errors += 1
+                logger.warning(f"Quote poll for {ticker} failed: {e}")
+                quote = None
+            if quote:
+                self._publish(ticker, quote)
+            time.sleep(self.poll_interval)
+
+    def _publish(self, ticker, quote):
+        with self._lock:
+            poller = self._pollers[ticker]
+            delta = quote_delta(poller['last'], quote)
+            if not delta:
+                return
+            poller['last'] = dict(quote)
+            message = {'ticker': ticker, **delta}
+            for subscription in poller['subscribers']:
+                subscription.put(message)
+                self.messages += 1
+
+    def stats(self):
+        """
+        Return a snapshot of hub counters
+
+        Returns:
+            dict: Active pollers, subscriber counts and poll/message counters
+        """
+        with self._lock:
+            return {
+                'pollers': len(self._pollers),
+                'subscribers': sum(len(poller['subscribers']) for poller in self._pollers.values()),
+                'subscriptions': len(self._subscriptions),
+                'max_subscriptions': self.max_subscriptions,
+                'rejected': self.rejected,
+                'polls': self.polls,
+                'poll_errors': self.poll_errors,
+                'messages': self.messages
+            }
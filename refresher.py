@@ -0,0 +1,221 @@
+# refresher.py
+import os
+import time
+import queue
+import threading
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundRefresher:
+    """
+    Stale-while-revalidate front end for a ``TTLCache``
+
+    ``get`` serves fresh entries directly and stale entries immediately
+    while queueing a refresh on a worker thread, so only a true miss waits
+    on the upstream API. A scheduler thread also re-warms the most requested
+    keys shortly before their TTL runs out and purges expired entries.
+
+    Threads are started lazily on first use and restarted after a fork, so
+    the refresher is safe to create at import time under gunicorn.
+    """
+
+    def __init__(self, cache, workers=2, hot_limit=20, prewarm_margin=30, prewarm_interval=10):
+        self.cache = cache
+        self.workers = workers
+        self.hot_limit = hot_limit
+        self.prewarm_margin = prewarm_margin
+        self.prewarm_interval = prewarm_interval
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._loaders = {}
+        self._requests = Counter()
+        self._lock = threading.Lock()
+        self._pid = None
+        self.hits = 0
+        self.stale = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.prewarmed = 0
+        self.purged = 0
+        self.refresh_errors = 0
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Threads don't survive a fork, so start a fresh set per process
+            self._queue = queue.Queue()
+            self._pending = set()
+            for i in range(self.workers):
+                threading.Thread(target=self._work, name=f"cache-refresh-{i}", daemon=True).start()
+            threading.Thread(target=self._prewarm_loop, name="cache-prewarm", daemon=True).start()
+            self._pid = os.getpid()
+
+    def get(self, key, loader):
+        """
+        Return the value for ``key``, refreshing it in the background if stale
+
+        Args:
+            key (str): Cache key
+            loader (callable): Zero-argument function producing the value
+
+        Returns:
+            The cached, stale or freshly loaded value
+        """
+        value, state = self.peek(key, loader)
+        if state is not None:
+            return value
+        return self.cache.get_or_load(key, loader)
+
+    def peek(self, key, loader):
+        """
+        Like ``get``, but leave misses to the caller instead of loading them
+
+        Useful when the caller can load many misses more cheaply at once.
+
+        Args:
+            key (str): Cache key
+            loader (callable): Zero-argument function used for refreshes
+
+        Returns:
+            tuple: ``(value, state)`` where state is 'fresh', 'stale' or None
+        """
+        with self._lock:
+            self._loaders[key] = loader
+
+        value, state = self.cache.lookup(key)
+        self.note(key, state)
+        return value, state
+
+    def note(self, key, state):
+        """
+        Count a request for ``key`` that was answered from the cache elsewhere
+
+        Stale answers queue a refresh, and every request counts towards the
+        hot keys that are re-warmed, as with ``get``.
+
+        Args:
+            key (str): Cache key with a loader registered through ``get``
+            state (str): 'fresh', 'stale' or None for a miss
+        """
+        self._ensure_started()
+        with self._lock:
+            self._requests[key] += 1
+        if state == 'fresh':
+            self.hits += 1
+        elif state == 'stale':
+            self.stale += 1
+            self.schedule(key)
+        else:
+            self.misses += 1
+
+    def schedule(self, key):
+        """
+        Queue a background refresh of ``key`` unless one is already pending
+
+        Args:
+            key (str): Cache key with a loader registered through ``get``
+
+        Returns:
+            bool: True if a refresh was queued
+        """
+        self._ensure_started()
+        with self._lock:
+            if key in self._pending or key not in self._loaders:
+                return False
+            self._pending.add(key)
+        self._queue.put(key)
+        return True
+
+    def _work(self):
+        while True:
+            key = self._queue.get()
+            try:
+                with self._lock:
+                    loader = self._loaders.get(key)
+                if loader is not None:
+                    self.cache.reload(key, loader)
+                    self.refreshed += 1
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning(f"Background refresh of {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._queue.task_done()
+
+    def hot_keys(self):
+        """Return the most requested keys, most popular first"""
+        with self._lock:
+            return [key for key, _ in self._requests.most_common(self.hot_limit)]
+
+    def _prewarm_loop(self):
+        while True:
+            time.sleep(self.prewarm_interval)
+            try:
+                self.prewarm()
+            except Exception as e:
+                logger.warning(f"Cache pre-warm pass failed: {e}")
+
+    def prewarm(self):
+        """
+        Queue refreshes for hot keys that are about to expire
+
+        Each pass first purges entries past their stale grace period, so
+        entries nobody reads again don't hold memory until LRU eviction
+        gets to them. Request counts are halved on every pass so popularity
+        tracks recent traffic, and keys that fall out of use are forgotten.
+        Their loaders are kept until the cached entry can no longer be
+        served, as stale hits answered outside ``get`` (see ``note``) still
+        need them.
+
+        Returns:
+            int: Number of refreshes queued
+        """
+        self.purged += self.cache.purge_expired()
+
+        queued = 0
+        for key in self.hot_keys():
+            remaining = self.cache.expires_in(key)
+            if remaining is not None and remaining < self.prewarm_margin and self.schedule(key):
+                queued += 1
+        self.prewarmed += queued
+
+        with self._lock:
+            for key in list(self._requests):
+                self._requests[key] //= 2
+                if not self._requests[key] and key not in self._pending:
+                    del self._requests[key]
+            for key in list(self._loaders):
+                if key not in self._requests and key not in self._pending and not self._servable(key):
+                    del self._loaders[key]
+        return queued
+
+    def _servable(self, key):
+        remaining = self.cache.expires_in(key)
+        return remaining is not None and remaining > -self.cache.stale_ttl
+
+    def stats(self):
+        """
+        Return a snapshot of refresher counters
+
+        Returns:
+            dict: Queue depth, hit/stale/miss counts and refresh outcomes
+        """
+        return {
+            'queue_depth': self._queue.qsize(),
+            'pending': len(self._pending),
+            'hits': self.hits,
+            'stale': self.stale,
+            'misses': self.misses,
+            'refreshed': self.refreshed,
+            'prewarmed': self.prewarmed,
+            'purged': self.purged,
+            'refresh_errors': self.refresh_errors,
+            'hot_keys': self.hot_keys()
+        }
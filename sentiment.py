@@ -0,0 +1,223 @@
+# sentiment.py
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from itertools import islice, tee
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def sentiment_label(polarity):
+    """
+    Map a polarity score to a sentiment label
+
+    Args:
+        polarity (float): Polarity between -1 and 1
+
+    Returns:
+        str: 'positive', 'negative' or 'neutral'
+    """
+    if polarity > 0.1:
+        return "positive"
+    elif polarity < -0.1:
+        return "negative"
+    return "neutral"
+
+
+def pattern_analyzer():
+    """
+    Create TextBlob's pattern-based sentiment analyzer
+
+    TextBlob is imported here rather than with this module, as it pulls in
+    NLTK and is slow to load; processes only pay for it once they score text.
+    """
+    from textblob.en.sentiments import PatternAnalyzer
+    return PatternAnalyzer()
+
+
+def content_hash(text):
+    """Return a compact digest identifying ``text``"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SentimentEngine:
+    """
+    TextBlob sentiment scoring with a bounded memo cache
+
+    Results are keyed by a hash of the text, so a headline scored once for
+    /api/company_news is not parsed again for /api/stock_sentiment or on the
+    next refresh. The least recently used results are evicted once
+    ``max_entries`` is reached.
+    """
+
+    def __init__(self, max_entries=20000):
+        self.max_entries = max_entries
+        self._analyzer = None
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _analyze(self, text):
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    self._analyzer = pattern_analyzer()
+        polarity = self._analyzer.analyze(text).polarity
+        return {
+            'polarity': polarity,
+            'label': sentiment_label(polarity)
+        }
+
+    def score(self, text):
+        """
+        Score a single text
+
+        Args:
+            text (str): Text to analyze
+
+        Returns:
+            dict: Dictionary with polarity and sentiment label
+        """
+        return self.score_many([text])[0]
+
+    def score_many(self, texts):
+        """
+        Score a list of texts, parsing each distinct uncached text once
+
+        Args:
+            texts (list): Texts to analyze
+
+        Returns:
+            list: One dictionary with polarity and label per input text
+        """
+        keys = [content_hash(text) for text in texts]
+        results = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    results[key] = self._memo[key]
+            self.hits += sum(1 for key in keys if key in results)
+
+        # Parse outside the lock so concurrent requests aren't serialized
+        scored = {}
+        for key, text in zip(keys, texts):
+            if key not in results and key not in scored:
+                scored[key] = self._analyze(text)
+
+        if scored:
+            with self._lock:
+                self.misses += len(scored)
+                for key, result in scored.items():
+                    self._memo[key] = result
+                    self._memo.move_to_end(key)
+                while len(self._memo) > self.max_entries:
+                    self._memo.popitem(last=False)
+            results.update(scored)
+
+        # Callers may mutate what they get back, so never hand out the memoized dicts
+        return [dict(results[key]) for key in keys]
+
+    def stats(self):
+        """
+        Return a snapshot of memo cache counters
+
+        Returns:
+            dict: Entry count, limit and hit/miss counters
+        """
+        with self._lock:
+            return {
+                'entries': len(self._memo),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Analyzer for bulk-scoring worker processes, created once per process
+_worker_analyzer = None
+
+
+def _init_worker(niceness):
+    global _worker_analyzer
+    _worker_analyzer = pattern_analyzer()
+    if niceness and hasattr(os, 'nice'):
+        # Keep backfills from competing with web workers for CPU
+        os.nice(niceness)
+
+
+def _score_chunk(texts):
+    results = []
+    for text in texts:
+        polarity = _worker_analyzer.analyze(text).polarity
+        results.append({
+            'polarity': polarity,
+            'label': sentiment_label(polarity)
+        })
+    return results
+
+
+def score_bulk(texts, workers=None, chunk_size=256, niceness=10):
+    """
+    Score a large stream of texts on a process pool, yielding results in order
+
+    Texts are consumed lazily in chunks and at most two chunks per worker
+    are in flight, so memory stays flat for inputs of any length. Each
+    worker process parses with its own analyzer, so scoring scales with
+    cores instead of being bound by the GIL, and workers run at a lower
+    priority so web workers on the same host keep their latency.
+
+    Args:
+        texts (iterable): Texts to analyze
+        workers (int): Worker processes, defaults to the CPU count
+        chunk_size (int): Texts sent to a worker per task
+        niceness (int): Priority decrease for worker processes
+
+    Yields:
+        dict: Dictionary with polarity and sentiment label, one per text
+    """
+    workers = workers or os.cpu_count() or 1
+    texts = iter(texts)
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(niceness,)) as pool:
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(texts, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_score_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    """Score headlines from a file or stdin, writing one JSON object per line"""
+    parser = argparse.ArgumentParser(description="Bulk-score headlines with TextBlob on a process pool")
+    parser.add_argument('input', nargs='?', default='-', help="File with one headline per line, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSON lines output file, '-' for stdout")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('-c', '--chunk-size', type=int, default=256, help="Headlines per worker task")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    sink = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        texts, echoed = tee(line.rstrip('\n') for line in source if line.strip())
+        # Results come back in input order, so they pair up with the echoed texts
+        for text, result in zip(echoed, score_bulk(texts, args.workers, args.chunk_size)):
+            sink.write(json.dumps({'text': text, **result}) + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+
+if __name__ == '__main__':
+    main()
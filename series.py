@@ -0,0 +1,310 @@
+# series.py
+import sys
+
+import numpy as np
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+FIELDS = ('date',) + PRICE_FIELDS + ('volume',)
+
+
+# One bar per record: 48 bytes, usable both in memory and as an on-disk file layout
+BAR_DTYPE = np.dtype([
+    ('date', 'M8[m]'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'i8')
+])
+
+
+def format_dates(dates, intraday=False):
+    """
+    Format datetime64 values as ISO date strings
+
+    Args:
+        dates (np.ndarray): datetime64 values in exchange-local time
+        intraday (bool): Include the time, e.g. '2024-01-02T09:30'
+
+    Returns:
+        list: Date strings, one per bar
+    """
+    return np.datetime_as_string(dates, unit='m' if intraday else 'D').tolist()
+
+
+def history_to_bars(hist):
+    """
+    Convert a yfinance history DataFrame into a structured array of bars
+
+    Prices are rounded to cents and timestamps are kept in the exchange's
+    local wall-clock time. An empty history, which is what yfinance returns
+    for unknown or delisted tickers, gives an empty array.
+
+    Args:
+        hist (pd.DataFrame): DataFrame with Open/High/Low/Close/Volume columns
+
+    Returns:
+        np.ndarray: Array with BAR_DTYPE, one element per bar
+    """
+    # yfinance's empty frame has a plain Index rather than a DatetimeIndex
+    if hist.empty or not hasattr(hist.index, 'tz'):
+        return np.empty(0, dtype=BAR_DTYPE)
+    hist = hist.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    index = hist.index
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    bars = np.empty(len(hist), dtype=BAR_DTYPE)
+    bars['date'] = index.to_numpy().astype('M8[m]')
+    prices = hist[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64).round(2)
+    for i, field in enumerate(PRICE_FIELDS):
+        bars[field] = prices[:, i]
+    bars['volume'] = hist['Volume'].fillna(0).to_numpy(dtype=np.float64).astype(np.int64)
+    return bars
+
+
+def bars_to_columns(bars, intraday=False):
+    """
+    Convert a structured array of bars into OHLCV columns
+
+    Args:
+        bars (np.ndarray): Array with BAR_DTYPE
+        intraday (bool): Keep the time of day in the date column
+
+    Returns:
+        dict: Mapping of field name to a list of values, one per bar
+    """
+    columns = {'date': format_dates(bars['date'], intraday)}
+    for field in PRICE_FIELDS + ('volume',):
+        columns[field] = bars[field].tolist()
+    return columns
+
+
+def columns_to_bars(columns):
+    """
+    Convert OHLCV columns into a structured array of bars
+
+    Args:
+        columns (dict): Mapping of field name to a list of values
+
+    Returns:
+        np.ndarray: Array with BAR_DTYPE, one element per bar
+    """
+    bars = np.empty(len(columns['date']), dtype=BAR_DTYPE)
+    for field in FIELDS:
+        bars[field] = columns[field]
+    return bars
+
+
+def history_to_columns(hist, intraday=False):
+    """
+    Convert a yfinance history DataFrame into rounded OHLCV columns
+
+    The whole frame is formatted at once with pandas/NumPy instead of
+    building one dict per row.
+
+    Args:
+        hist (pd.DataFrame): DataFrame with Open/High/Low/Close/Volume columns
+        intraday (bool): Keep the time of day in the date column
+
+    Returns:
+        dict: Mapping of field name to a list of values, one per bar
+    """
+    return bars_to_columns(history_to_bars(hist), intraday)
+
+
+def columns_to_records(columns):
+    """
+    Convert OHLCV columns into a list of per-bar dictionaries
+
+    Args:
+        columns (dict): Mapping of field name to a list of values
+
+    Returns:
+        list: List of dictionaries containing stock data
+    """
+    return [dict(zip(FIELDS, row)) for row in zip(*(columns[field] for field in FIELDS))]
+
+
+def records_to_columns(records):
+    """
+    Convert a list of per-bar dictionaries into OHLCV columns
+
+    Args:
+        records (list): List of dictionaries containing stock data
+
+    Returns:
+        dict: Mapping of field name to a list of values
+    """
+    return {field: [record[field] for record in records] for field in FIELDS}
+
+
+def downsample_ohlc(columns, max_points):
+    """
+    Aggregate bars into at most ``max_points`` OHLC buckets
+
+    Each bucket keeps the first bar's date and open, the last bar's close,
+    the highest high, the lowest low and the summed volume, so candlesticks
+    stay faithful at a coarser resolution.
+
+    Args:
+        columns (dict): OHLCV columns
+        max_points (int): Maximum number of bars to return
+
+    Returns:
+        dict: Downsampled OHLCV columns
+    """
+    n = len(columns['date'])
+    if max_points <= 0 or n <= max_points:
+        return columns
+
+    edges = np.linspace(0, n, max_points + 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:] - 1
+    high = np.asarray(columns['high'], dtype=np.float64)
+    low = np.asarray(columns['low'], dtype=np.float64)
+    volume = np.asarray(columns['volume'], dtype=np.int64)
+    dates = columns['date']
+
+    return {
+        'date': [dates[i] for i in starts],
+        'open': np.asarray(columns['open'], dtype=np.float64)[starts].tolist(),
+        'high': np.maximum.reduceat(high, starts).tolist(),
+        'low': np.minimum.reduceat(low, starts).tolist(),
+        'close': np.asarray(columns['close'], dtype=np.float64)[ends].tolist(),
+        'volume': np.add.reduceat(volume, starts).tolist()
+    }
+
+
+def downsample_lttb(columns, max_points):
+    """
+    Pick at most ``max_points`` bars with Largest-Triangle-Three-Buckets
+
+    LTTB selects the bar in each bucket whose close forms the largest
+    triangle with its neighbours, preserving the visual shape of a line
+    chart. Selected bars are returned unchanged. LTTB always keeps the
+    first and last bars, so fewer than 3 points are OHLC buckets instead.
+
+    Args:
+        columns (dict): OHLCV columns
+        max_points (int): Maximum number of bars to return
+
+    Returns:
+        dict: Downsampled OHLCV columns
+    """
+    n = len(columns['date'])
+    if max_points <= 0 or n <= max_points:
+        return columns
+    if max_points < 3:
+        return downsample_ohlc(columns, max_points)
+
+    y = np.asarray(columns['close'], dtype=np.float64)
+    x = np.arange(n, dtype=np.float64)
+    # First and last bars are always kept, the rest is split into equal buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+
+    return {field: [columns[field][i] for i in selected] for field in FIELDS}
+
+
+class PriceSeries:
+    """
+    A ticker's OHLCV bars as held in the cache
+
+    The bars live in one BAR_DTYPE structured array, 48 bytes a bar,
+    rather than a list of per-bar dictionaries of boxed floats and date
+    strings, which take over 1 KB a bar. Dates stay datetime64 until a
+    response is built from the series, so JSON is only produced at the
+    edge (and, for most routes, only once per cache entry).
+
+    The bars are shared by every request that reads the entry, so they are
+    made read-only. Bars mapped from the price store stay mapped rather
+    than copied; the store replaces files instead of writing them in place,
+    so a mapping never changes under a series. ``sys.getsizeof`` includes
+    the array's buffer, so the cache's byte budget counts what the series
+    really takes.
+    """
+
+    __slots__ = ('bars', 'intraday')
+
+    def __init__(self, bars, intraday=False):
+        # Arrays of bars, memmaps included, are viewed; anything else is copied
+        if isinstance(bars, np.ndarray) and bars.dtype == BAR_DTYPE:
+            bars = np.asarray(bars)
+        else:
+            bars = np.array(bars, dtype=BAR_DTYPE)
+        bars.flags.writeable = False
+        self.bars = bars
+        self.intraday = intraday
+
+    @classmethod
+    def from_records(cls, records, intraday=False):
+        """Build a series from a list of per-bar dictionaries sorted by date"""
+        return cls(columns_to_bars(records_to_columns(records)), intraday)
+
+    def __len__(self):
+        return len(self.bars)
+
+    def __sizeof__(self):
+        # getsizeof leaves out the buffer of an array that doesn't own it
+        return object.__sizeof__(self) + sys.getsizeof(self.bars) + (0 if self.bars.base is None else self.bars.nbytes)
+
+    def since(self, start):
+        """
+        Return the bars dated on or after ``start``
+
+        Args:
+            start (str): ISO date such as '2024-01-02'
+
+        Returns:
+            PriceSeries: A series sharing this one's bars
+        """
+        first = int(np.searchsorted(self.bars['date'], np.datetime64(start, 'm')))
+        return PriceSeries(self.bars[first:], self.intraday)
+
+    def columns(self):
+        """Return the bars as OHLCV columns of plain Python values"""
+        return bars_to_columns(self.bars, self.intraday)
+
+    def records(self):
+        """Return the bars as a list of per-bar dictionaries"""
+        return columns_to_records(self.columns())
+
+    def to_json(self):
+        """
+        Encode the series as JSON-serializable columns, dates in epoch minutes
+
+        Returns:
+            dict: Columns and the intraday flag, see ``from_json``
+        """
+        columns = {field: self.bars[field].tolist() for field in PRICE_FIELDS + ('volume',)}
+        columns['date'] = self.bars['date'].astype(np.int64).tolist()
+        columns['intraday'] = self.intraday
+        return columns
+
+    @classmethod
+    def from_json(cls, value):
+        """Decode a series encoded with ``to_json``"""
+        bars = np.empty(len(value['date']), dtype=BAR_DTYPE)
+        bars['date'] = np.asarray(value['date'], dtype=np.int64).astype('M8[m]')
+        for field in PRICE_FIELDS + ('volume',):
+            bars[field] = value[field]
+        return cls(bars, value['intraday'])
@@ -0,0 +1,227 @@
+# shared_cache.py
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+from series import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+# Connections inherited across a fork, never used or closed again
+_inherited_connections = []
+
+# Types stored as ``{"__type__": name, "value": obj.to_json()}`` and
+# rebuilt with ``cls.from_json(value)`` when read back
+JSON_TYPES = {cls.__name__: cls for cls in (PriceSeries,)}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def encode_object(value):
+    """``json.dumps`` default for the types in JSON_TYPES"""
+    name = type(value).__name__
+    if JSON_TYPES.get(name) is type(value):
+        return {'__type__': name, 'value': value.to_json()}
+    raise TypeError(f"Object of type {name} is not JSON serializable")
+
+
+def decode_object(obj):
+    """``json.loads`` object hook reviving the types in JSON_TYPES"""
+    cls = JSON_TYPES.get(obj.get('__type__'))
+    return cls.from_json(obj['value']) if cls is not None and 'value' in obj else obj
+
+
+class SQLiteCache:
+    """
+    Cache tier shared by every worker process on the host
+
+    Values are stored as JSON in a single SQLite file in WAL mode, so
+    gunicorn workers can read each other's results without an external
+    service. Each thread gets its own connection, opened on first use, so
+    a preloaded gunicorn master that never touches the cache forks its
+    workers without one.
+
+    Leases let one process claim the right to refresh a key while the
+    others poll for its result instead of hitting the upstream API too.
+    """
+
+    def __init__(self, path, prune_interval=300):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._last_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def _owner(self):
+        # Leases belong to a process, so read the pid on each use (gunicorn
+        # --preload forks workers after this object is created)
+        return f"{os.getpid()}"
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # SQLite connections can't be used across a fork, so a worker
+        # forked from a process that had one opens its own. The inherited
+        # one must not be closed in the child either, so it is kept alive
+        if conn is not None and self._local.pid != os.getpid():
+            _inherited_connections.append(conn)
+            conn = None
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key, newer_than=0):
+        """
+        Return the stored entry for ``key`` if it has not expired
+
+        Args:
+            key (str): Cache key
+            newer_than (float): Only return an entry fetched after this time
+
+        Returns:
+            tuple: ``(timestamp, data)``, or None on a miss
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT timestamp, data FROM cache WHERE key = ? AND expires_at > ? AND timestamp > ?",
+                (key, time.time(), newer_than)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache read failed for {key}: {e}")
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0], json.loads(row[1], object_hook=decode_object)
+
+    def set(self, key, data, ttl, timestamp=None):
+        """
+        Store ``data`` under ``key`` for ``ttl`` seconds
+
+        Args:
+            key (str): Cache key
+            data: JSON-serializable value, or an instance of a JSON_TYPES type
+            ttl (float): Seconds until the entry expires
+            timestamp (float): Time the value was fetched, defaults to now
+        """
+        timestamp = timestamp or time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, timestamp, expires_at, data) VALUES (?, ?, ?, ?)",
+                (key, timestamp, timestamp + ttl, json.dumps(data, default=encode_object))
+            )
+            self._maybe_prune(conn)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.errors += 1
+            logger.warning(f"Shared cache write failed for {key}: {e}")
+
+    def delete(self, key):
+        """Remove ``key`` from the shared store"""
+        try:
+            self._connect().execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache delete failed for {key}: {e}")
+
+    def acquire_lease(self, key, duration):
+        """
+        Try to claim the right to load ``key`` across processes
+
+        Args:
+            key (str): Cache key
+            duration (float): Seconds before an unreleased lease lapses
+
+        Returns:
+            bool: True if this process now holds the lease
+        """
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self._owner, now + duration)
+            )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache lease failed for {key}: {e}")
+            # Never block a request on a broken shared tier
+            return True
+
+    def release_lease(self, key):
+        """Release a lease taken with ``acquire_lease``"""
+        try:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner))
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Shared cache lease release failed for {key}: {e}")
+
+    def wait_for(self, key, timeout, poll_interval=0.05, newer_than=0):
+        """
+        Poll for another process to publish ``key``
+
+        Args:
+            key (str): Cache key
+            timeout (float): Maximum seconds to wait
+            poll_interval (float): Seconds between polls
+            newer_than (float): Only return an entry fetched after this time
+
+        Returns:
+            tuple: ``(timestamp, data)``, or None if nothing arrived in time
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            entry = self.get(key, newer_than)
+            if entry is not None:
+                return entry
+            time.sleep(poll_interval)
+        return None
+
+    def _maybe_prune(self, conn):
+        now = time.time()
+        if now - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = now
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    def stats(self):
+        """
+        Return a snapshot of shared-tier counters
+
+        Returns:
+            dict: Hit, miss and error counts for this process
+        """
+        return {
+            'path': self.path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors
+        }
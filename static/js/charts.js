@@ -4,6 +4,9 @@ window.priceChart = null;
 window.sentimentChart = null;
 window.candleChart = null;
 window.stockData = [];
+window.stockColumns = null;
+window.stockRangeDays = 365;  // History covered by the initial /api/stock_data load
+window.longRangeColumns = null;  // Longer, server-downsampled history for ranges beyond that
 window.chartType = 'line';
 
 
@@ -22,12 +25,92 @@ document.addEventListener('DOMContentLoaded', function() {
     window.chartInitialized = false;
 });
 
+// Check whether stock data is in the columnar shape ({date: [...], open: [...], ...})
+function isStockColumns(stockData) {
+    return !!stockData && !Array.isArray(stockData) && Array.isArray(stockData.date);
+}
+
+// Convert columnar stock data into one object per bar
+function stockColumnsToRecords(columns) {
+    return columns.date.map((date, i) => ({
+        date: date,
+        open: columns.open[i],
+        high: columns.high[i],
+        low: columns.low[i],
+        close: columns.close[i],
+        volume: columns.volume[i]
+    }));
+}
+
+// Convert per-bar stock data into columns
+function stockRecordsToColumns(records) {
+    return {
+        date: records.map(d => d.date),
+        open: records.map(d => parseFloat(d.open)),
+        high: records.map(d => parseFloat(d.high)),
+        low: records.map(d => parseFloat(d.low)),
+        close: records.map(d => parseFloat(d.close)),
+        volume: records.map(d => d.volume)
+    };
+}
+
+// Index of the first bar on or after startDate (dates are sorted 'YYYY-MM-DD' strings)
+function firstIndexOnOrAfter(dates, startDate) {
+    const start = startDate.toISOString().slice(0, 10);
+    let low = 0;
+    let high = dates.length;
+    while (low < high) {
+        const mid = (low + high) >> 1;
+        if (dates[mid] < start) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+}
+
+// Columns covering the requested number of days
+function chartColumnsFor(days) {
+    if (days > window.stockRangeDays && window.longRangeColumns && window.longRangeColumns.days >= days) {
+        return window.longRangeColumns.columns;
+    }
+    return window.stockColumns || stockRecordsToColumns(window.stockData);
+}
+
+// Fetch a longer history than the initial load, downsampled on the server to the chart's width
+function loadLongChartRange(days) {
+    const ticker = window.currentStockTicker;
+    if (!ticker) {
+        return false;
+    }
+    
+    const priceChartEl = document.getElementById('price-chart');
+    const maxPoints = Math.max(200, Math.round((priceChartEl && priceChartEl.clientWidth) || 800));
+    
+    fetch(`/api/stock_data?ticker=${ticker}&range=${days}d&max_points=${maxPoints}&format=columnar`)
+        .then(response => response.json())
+        .then(columns => {
+            if (isStockColumns(columns) && columns.date.length > 0 && ticker === window.currentStockTicker) {
+                window.longRangeColumns = {days: days, columns: columns};
+                updateChartTimeRange(days);
+            }
+        })
+        .catch(error => {
+            console.error("Error loading long chart range:", error);
+        });
+    return true;
+}
+
 // Initialize price chart with ApexCharts
 function initPriceChart(stockData) {
-    console.log("initPriceChart called with data:", stockData ? stockData.length : "no data");
+    const columnar = isStockColumns(stockData);
+    console.log("initPriceChart called with data:", stockData ? (columnar ? stockData.date.length : stockData.length) : "no data");
     
-    // Store the full dataset globally
-    window.stockData = stockData;
+    // Store the full dataset globally, both per bar and as columns for the chart series
+    window.stockData = columnar ? stockColumnsToRecords(stockData) : stockData;
+    window.stockColumns = columnar ? stockData : stockRecordsToColumns(stockData || []);
+    window.longRangeColumns = null;
     
     // Check if price chart element exists
     const priceChartEl = document.getElementById('price-chart');
@@ -246,17 +329,23 @@ function updateChartTimeRange(days) {
             days = 90; // Default to 90 days
         }
         
+        // Ranges beyond the initial load are fetched from the server first
+        if (days > window.stockRangeDays && !(window.longRangeColumns && window.longRangeColumns.days >= days)) {
+            if (loadLongChartRange(days)) {
+                return;
+            }
+        }
+        
         const today = new Date();
         const startDate = new Date();
         startDate.setDate(today.getDate() - days);
         
-        // Filter data for the selected time range
-        const filteredData = window.stockData.filter(d => {
-            const dataDate = new Date(d.date);
-            return dataDate >= startDate;
-        });
+        // Find the selected time range in the sorted date column
+        const columns = chartColumnsFor(days);
+        const start = firstIndexOnOrAfter(columns.date, startDate);
+        const dataPoints = columns.date.length - start;
         
-        if (filteredData.length === 0) {
+        if (dataPoints === 0) {
             console.warn("No data available for selected time range");
             return;
         }
@@ -264,17 +353,20 @@ function updateChartTimeRange(days) {
         // Format data based on chart type
         if (window.chartType === 'line' && window.priceChart) {
             // Format data for line chart
-            const chartData = filteredData.map(d => ({
-                x: new Date(d.date).getTime(),
-                y: parseFloat(d.close)
-            }));
+            const chartData = [];
+            for (let i = start; i < columns.date.length; i++) {
+                chartData.push({
+                    x: new Date(columns.date[i]).getTime(),
+                    y: columns.close[i]
+                });
+            }
             
             window.priceChart.updateSeries([{
                 name: 'Price',
                 data: chartData
             }]);
             
-            console.log("Chart updated with filtered data:", filteredData.length, "points");
+            console.log("Chart updated with filtered data:", dataPoints, "points");
         } else if (window.chartType === 'candle' && window.candleChart) {
             // Update candlestick data
             updateCandleChartData(days);
@@ -282,7 +374,7 @@ function updateChartTimeRange(days) {
         
         // Dispatch a custom event for chart updates
         document.dispatchEvent(new CustomEvent('chartUpdated', {
-            detail: { days: days, dataPoints: filteredData.length }
+            detail: { days: days, dataPoints: dataPoints }
         }));
     } catch (error) {
         console.error("Error updating chart:", error);
@@ -301,34 +393,30 @@ function updateCandleChartData(days) {
         const startDate = new Date();
         startDate.setDate(today.getDate() - days);
         
-        // Filter data for the selected time range
-        const filteredData = window.stockData.filter(d => {
-            const dataDate = new Date(d.date);
-            return dataDate >= startDate;
-        });
+        // Find the selected time range in the sorted date column
+        const columns = chartColumnsFor(days);
+        const start = firstIndexOnOrAfter(columns.date, startDate);
         
-        if (filteredData.length === 0) {
+        if (start >= columns.date.length) {
             console.warn("No data available for selected time range");
             return;
         }
         
         // Format data for candlestick chart
-        const candleData = filteredData.map(d => ({
-            x: new Date(d.date).getTime(),
-            y: [
-                parseFloat(d.open), 
-                parseFloat(d.high), 
-                parseFloat(d.low), 
-                parseFloat(d.close)
-            ]
-        }));
+        const candleData = [];
+        for (let i = start; i < columns.date.length; i++) {
+            candleData.push({
+                x: new Date(columns.date[i]).getTime(),
+                y: [columns.open[i], columns.high[i], columns.low[i], columns.close[i]]
+            });
+        }
         
         window.candleChart.updateSeries([{
             name: 'Price',
             data: candleData
         }]);
         
-        console.log("Candle chart updated with filtered data:", filteredData.length, "points");
+        console.log("Candle chart updated with filtered data:", candleData.length, "points");
     } catch (error) {
         console.error("Error updating candle chart:", error);
     }
@@ -653,13 +741,17 @@ function updateCompanyInfo(ticker, latestData) {
             stockPriceElement.textContent = `$${price}`;
         }
         
-        // Calculate price change
-        if (window.stockData && window.stockData.length > 1) {
-            const previousDay = window.stockData[window.stockData.length - 2];
-            const currentPrice = parseFloat(latestData.close);
-            const previousPrice = parseFloat(previousDay.close);
-            const priceChange = currentPrice - previousPrice;
-            const percentageChange = (priceChange / previousPrice) * 100;
+        // Calculate price change; live quotes carry the change from the previous close
+        if (latestData.change !== undefined || (window.stockData && window.stockData.length > 1)) {
+            let priceChange = latestData.change;
+            let percentageChange = latestData.change_percent;
+            if (priceChange === undefined) {
+                const previousDay = window.stockData[window.stockData.length - 2];
+                const currentPrice = parseFloat(latestData.close);
+                const previousPrice = parseFloat(previousDay.close);
+                priceChange = currentPrice - previousPrice;
+                percentageChange = (priceChange / previousPrice) * 100;
+            }
             
             const priceChangeElement = document.getElementById('price-change');
             if (priceChangeElement) {
@@ -673,10 +765,12 @@ function updateCompanyInfo(ticker, latestData) {
         
         console.log("Company info updated for:", ticker);
         
-        // Trigger animations for metrics
-        setTimeout(() => {
-            document.dispatchEvent(new CustomEvent('dataLoaded'));
-        }, 100);
+        // Trigger animations for metrics, but not on every live quote
+        if (!latestData.live) {
+            setTimeout(() => {
+                document.dispatchEvent(new CustomEvent('dataLoaded'));
+            }, 100);
+        }
     } catch (error) {
         console.error("Error updating company info:", error);
         showTickerError(ticker);
@@ -779,8 +873,9 @@ function updateKeyMetrics(ticker, latestData) {
         }
     };
     
-    // Get metrics for this ticker or use default values
-    const stockMetrics = metrics[ticker] || {
+    // Prefer metrics loaded from the API, then the samples, then default values
+    const apiMetrics = window.keyMetrics && window.keyMetrics.ticker === ticker ? window.keyMetrics.data : null;
+    const stockMetrics = apiMetrics || metrics[ticker] || {
         sector: 'Unknown',
         exchange: 'NYSE',
         pe: 'N/A',
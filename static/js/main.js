@@ -36,9 +36,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     // Load initial data
-    loadStockData(currentTicker);
-    loadNewsData(currentTicker);
-    loadSentimentData(currentTicker);
+    loadDashboard(currentTicker);
     
     // Search button click handler
     document.getElementById('search-btn').addEventListener('click', function() {
@@ -52,6 +50,9 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
     
+    // Suggest symbols and company names while typing
+    initTickerAutocomplete(document.getElementById('ticker-input'));
+    
     // Time range buttons
     document.querySelectorAll('.time-range').forEach(button => {
         button.addEventListener('click', function() {
@@ -318,6 +319,39 @@ function updateLogoForTheme(marketTheme, isDark) {
     }
 }
 
+// Fill the input's datalist from /api/search as the user types
+function initTickerAutocomplete(input) {
+    const datalist = document.getElementById(input.getAttribute('list'));
+    if (!datalist) return;
+    
+    let timer = null;
+    let controller = null;
+    input.addEventListener('input', function() {
+        const query = input.value.trim();
+        clearTimeout(timer);
+        if (!query) return;
+        
+        timer = setTimeout(() => {
+            // Only the latest query's suggestions matter
+            if (controller) controller.abort();
+            controller = new AbortController();
+            fetch(`/api/search?q=${encodeURIComponent(query)}&limit=8`, { signal: controller.signal })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.results) return;
+                    datalist.innerHTML = '';
+                    data.results.forEach(result => {
+                        const option = document.createElement('option');
+                        option.value = result.symbol;
+                        option.textContent = result.name;
+                        datalist.appendChild(option);
+                    });
+                })
+                .catch(() => {});
+        }, 150);
+    });
+}
+
 // Search function
 // Search function
 // Search function
@@ -372,6 +406,9 @@ function updateKeyMetricsFromAPI(ticker, metricsData) {
         
         console.log("Updating key metrics from API for:", ticker, metricsData);
         
+        // Remember them so later updates (e.g. live quotes) don't overwrite them with samples
+        window.keyMetrics = {ticker: ticker, data: metricsData};
+        
         // Update metrics on the page
         document.querySelectorAll('[data-metric]').forEach(element => {
             const metric = element.getAttribute('data-metric');
@@ -544,17 +581,19 @@ function updateChartTheme(chart) {
     });
 }
 
-// Load stock data from API
-// Load stock data from API
-function loadStockData(ticker) {
-    console.log("Loading stock data for:", ticker);
+// Load stock data, key metrics, news and sentiment with one request.
+// The server loads the sections concurrently; any section it could not
+// finish in time is fetched again from its own endpoint.
+function loadDashboard(ticker) {
+    console.log("Loading dashboard for:", ticker);
+    window.currentStockTicker = ticker;
     
     // Show loading indicator
     document.querySelectorAll('.loading-overlay').forEach(overlay => {
         overlay.classList.add('active');
     });
     
-    fetch(`/api/stock_data?ticker=${ticker}`)
+    fetch(`/api/dashboard?ticker=${ticker}&format=columnar`)
         .then(response => {
             if (!response.ok) {
                 throw new Error('Network response was not ok');
@@ -562,45 +601,103 @@ function loadStockData(ticker) {
             return response.json();
         })
         .then(data => {
-            if (data && data.length > 0) {
-                // Save data globally
-                window.stockData = data;
-                
-                console.log("Stock data loaded successfully:", data.length, "data points");
-                
-                // Update company info
-                updateCompanyInfo(ticker, data[data.length-1]);
-                
-                // Load key metrics data - ADD THIS LINE
+            const status = data.status || {};
+            if (data.partial) {
+                console.warn("Partial dashboard data for:", ticker, status);
+            }
+            
+            if (status.stock_data === 'ok') {
+                renderStockData(ticker, data.stock_data);
+            } else {
+                loadStockData(ticker, false);
+            }
+            
+            if (status.metrics === 'ok') {
+                updateKeyMetricsFromAPI(ticker, data.metrics);
+            } else {
                 loadKeyMetricsData(ticker);
-                
-                // Initialize price chart with a slight delay to ensure DOM is ready
-                setTimeout(() => {
-                    if (document.getElementById('price-chart')) {
-                        console.log("Initializing price chart");
-                        initPriceChart(data);
-                    } else {
-                        console.error("Price chart element not available");
-                    }
-                }, 100);
-                
-                // Update theme based on performance - moved inside where data is available
-                updateThemeBasedOnPerformance(data);
-                
-                // Hide loading overlay with a delay to ensure chart is rendered
-                setTimeout(() => {
-                    document.querySelectorAll('.loading-overlay').forEach(overlay => {
-                        overlay.classList.remove('active');
-                    });
-                }, 500);
+            }
+            
+            if (status.news === 'ok') {
+                renderNewsData(data.news);
             } else {
-                console.error("No data available for ticker:", ticker);
-                showError(`No data available for ${ticker}`);
-                
-                // Hide loading overlays
-                document.querySelectorAll('.loading-overlay').forEach(overlay => {
-                    overlay.classList.remove('active');
-                });
+                loadNewsData(ticker);
+            }
+            
+            if (status.sentiment === 'ok') {
+                renderSentimentData(data.sentiment);
+            } else {
+                loadSentimentData(ticker);
+            }
+        })
+        .catch(error => {
+            console.error('Error fetching dashboard data, loading sections individually:', error);
+            loadStockData(ticker);
+            loadNewsData(ticker);
+            loadSentimentData(ticker);
+        })
+        .finally(() => {
+            // Keep the price current without polling the API
+            subscribeToQuotes(ticker);
+        });
+}
+
+// Apply live quote updates pushed by the server as Server-Sent Events
+function subscribeToQuotes(ticker) {
+    if (!window.EventSource) return;
+    if (window.quoteStream) {
+        window.quoteStream.close();
+    }
+    
+    // Messages only carry the fields that changed, so merge them into the full quote
+    const quote = {};
+    const stream = new EventSource(`/api/stream/quotes?ticker=${ticker}`);
+    stream.addEventListener('quote', event => {
+        const delta = JSON.parse(event.data);
+        if (delta.ticker !== ticker) return;
+        Object.assign(quote, delta);
+        if (quote.price === undefined) return;
+        
+        updateCompanyInfo(ticker, {
+            close: quote.price,
+            volume: quote.volume,
+            change: quote.change,
+            change_percent: quote.change_percent,
+            live: true
+        });
+    });
+    // A full server answers 503 and EventSource gives up, so try again later
+    stream.onerror = () => {
+        if (stream.readyState === EventSource.CLOSED && window.quoteStream === stream) {
+            setTimeout(() => {
+                if (window.quoteStream === stream) subscribeToQuotes(ticker);
+            }, 30000);
+        }
+    };
+    window.quoteStream = stream;
+}
+
+// Load stock data from API
+function loadStockData(ticker, withMetrics = true) {
+    console.log("Loading stock data for:", ticker);
+    window.currentStockTicker = ticker;
+    
+    // Show loading indicator
+    document.querySelectorAll('.loading-overlay').forEach(overlay => {
+        overlay.classList.add('active');
+    });
+    
+    fetch(`/api/stock_data?ticker=${ticker}&format=columnar`)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Network response was not ok');
+            }
+            return response.json();
+        })
+        .then(columns => {
+            if (renderStockData(ticker, columns) && withMetrics) {
+                // Load key metrics data
+                loadKeyMetricsData(ticker);
             }
         })
         .catch(error => {
@@ -614,6 +711,50 @@ function loadStockData(ticker) {
         });
 }
 
+// Render columnar stock data; returns false if there is nothing to show
+function renderStockData(ticker, columns) {
+    const data = isStockColumns(columns) ? stockColumnsToRecords(columns) : [];
+    if (data && data.length > 0) {
+        // Save data globally
+        window.stockData = data;
+        
+        console.log("Stock data loaded successfully:", data.length, "data points");
+        
+        // Update company info
+        updateCompanyInfo(ticker, data[data.length-1]);
+        
+        // Initialize price chart with a slight delay to ensure DOM is ready
+        setTimeout(() => {
+            if (document.getElementById('price-chart')) {
+                console.log("Initializing price chart");
+                initPriceChart(columns);
+            } else {
+                console.error("Price chart element not available");
+            }
+        }, 100);
+        
+        // Update theme based on performance - moved inside where data is available
+        updateThemeBasedOnPerformance(data);
+        
+        // Hide loading overlay with a delay to ensure chart is rendered
+        setTimeout(() => {
+            document.querySelectorAll('.loading-overlay').forEach(overlay => {
+                overlay.classList.remove('active');
+            });
+        }, 500);
+        return true;
+    }
+    
+    console.error("No data available for ticker:", ticker);
+    showError(`No data available for ${ticker}`);
+    
+    // Hide loading overlays
+    document.querySelectorAll('.loading-overlay').forEach(overlay => {
+        overlay.classList.remove('active');
+    });
+    return false;
+}
+
 // Create necessary tour elements
 function createTourElements() {
     // Check if tour overlay exists, if not create it
@@ -1616,17 +1757,22 @@ function loadNewsData(ticker) {
             return response.json();
         })
         .then(data => {
-            displayNews(data);
-            
-            // Dispatch custom event
-            const newsEvent = new CustomEvent('newsDisplayed');
-            document.dispatchEvent(newsEvent);
+            renderNewsData(data);
         })
         .catch(error => {
             console.error('Error fetching news data:', error);
         });
 }
 
+// Display news items and notify listeners
+function renderNewsData(newsItems) {
+    displayNews(newsItems);
+    
+    // Dispatch custom event
+    const newsEvent = new CustomEvent('newsDisplayed');
+    document.dispatchEvent(newsEvent);
+}
+
 // Display news function
 function displayNews(newsItems) {
     const newsContainer = document.getElementById('news-container');
@@ -1703,37 +1849,42 @@ function loadSentimentData(ticker) {
             return response.json();
         })
         .then(data => {
-            // Update sentiment metrics
-            const buzzScore = Math.round(data.buzz * 100);
-            const bullishScore = Math.round(data.sentiment_score * 100);
-            const sectorScore = Math.round(data.sector_sentiment * 100);
-            
-            const buzzScoreEl = document.getElementById('buzz-score');
-            if (buzzScoreEl) buzzScoreEl.textContent = buzzScore;
-            
-            const bullishScoreEl = document.getElementById('bullish-score');
-            if (bullishScoreEl) bullishScoreEl.textContent = `${bullishScore}%`;
-            
-            const sectorScoreEl = document.getElementById('sector-score');
-            if (sectorScoreEl) sectorScoreEl.textContent = `${sectorScore}%`;
-            
-            // Update progress bars
-            const buzzBar = document.getElementById('buzz-score-bar');
-            const bullishBar = document.getElementById('bullish-score-bar');
-            const sectorBar = document.getElementById('sector-score-bar');
-            
-            if (buzzBar) buzzBar.style.width = `${buzzScore}%`;
-            if (bullishBar) bullishBar.style.width = `${bullishScore}%`;
-            if (sectorBar) sectorBar.style.width = `${sectorScore}%`;
-            
-            // Update sentiment chart
-            updateSentimentChart(bullishScore, sectorScore);
+            renderSentimentData(data);
         })
         .catch(error => {
             console.error('Error fetching sentiment data:', error);
         });
 }
 
+// Update the sentiment scores, bars and chart
+function renderSentimentData(data) {
+    // Update sentiment metrics
+    const buzzScore = Math.round(data.buzz * 100);
+    const bullishScore = Math.round(data.sentiment_score * 100);
+    const sectorScore = Math.round(data.sector_sentiment * 100);
+    
+    const buzzScoreEl = document.getElementById('buzz-score');
+    if (buzzScoreEl) buzzScoreEl.textContent = buzzScore;
+    
+    const bullishScoreEl = document.getElementById('bullish-score');
+    if (bullishScoreEl) bullishScoreEl.textContent = `${bullishScore}%`;
+    
+    const sectorScoreEl = document.getElementById('sector-score');
+    if (sectorScoreEl) sectorScoreEl.textContent = `${sectorScore}%`;
+    
+    // Update progress bars
+    const buzzBar = document.getElementById('buzz-score-bar');
+    const bullishBar = document.getElementById('bullish-score-bar');
+    const sectorBar = document.getElementById('sector-score-bar');
+    
+    if (buzzBar) buzzBar.style.width = `${buzzScore}%`;
+    if (bullishBar) bullishBar.style.width = `${bullishScore}%`;
+    if (sectorBar) sectorBar.style.width = `${sectorScore}%`;
+    
+    // Update sentiment chart
+    updateSentimentChart(bullishScore, sectorScore);
+}
+
 // Update sentiment chart
 function updateSentimentChart(bullishScore, sectorScore) {
     // Check if ApexCharts is available
@@ -2185,81 +2336,107 @@ function loadParallelStock(user, ticker) {
     
     ticker = ticker.toUpperCase();
     
+    // Load the other panel's ticker in the same batch request if it hasn't been loaded yet
+    const requested = {[user]: ticker};
+    const otherUser = user === 1 ? 2 : 1;
+    const otherInput = document.getElementById(`parallel-ticker-${otherUser}`);
+    const otherTicker = otherInput ? otherInput.value.trim().toUpperCase() : '';
+    const otherData = otherUser === 1 ? parallelData1 : parallelData2;
+    if (/^[A-Z]{1,5}$/.test(otherTicker) && (!otherData || otherData.ticker !== otherTicker)) {
+        requested[otherUser] = otherTicker;
+    }
+    
     // Show loading state
-    const chartEl = document.getElementById(`parallel-chart-${user}`);
-    if (chartEl) {
-        chartEl.innerHTML = `
-            <div class="parallel-loading">
-                <div class="spinner-border text-primary" role="status">
-                    <span class="visually-hidden">Loading...</span>
+    Object.keys(requested).forEach(panel => {
+        const chartEl = document.getElementById(`parallel-chart-${panel}`);
+        if (chartEl) {
+            chartEl.innerHTML = `
+                <div class="parallel-loading">
+                    <div class="spinner-border text-primary" role="status">
+                        <span class="visually-hidden">Loading...</span>
+                    </div>
                 </div>
-            </div>
-        `;
-    }
+            `;
+        }
+    });
     
-    fetch(`/api/stock_data?ticker=${ticker}`)
+    const tickers = [...new Set(Object.values(requested))];
+    fetch(`/api/stock_data?tickers=${tickers.join(',')}`)
         .then(response => response.json())
-        .then(data => {
-            if (user === 1) {
-                parallelData1 = {
-                    ticker: ticker,
-                    data: data
-                };
-            } else {
-                parallelData2 = {
-                    ticker: ticker,
-                    data: data
-                };
+        .then(payload => {
+            if (payload.error) {
+                throw new Error(payload.error);
             }
             
-            // Get company info
-            const companyInfo = getCompanyInfo(ticker);
-            
-            // Update stock info
-            if (data.length > 0) {
-                const latestData = data[data.length - 1];
-                
-                const nameEl = document.getElementById(`parallel-name-${user}`);
-                if (nameEl) {
-                    nameEl.textContent = `${companyInfo.name} (${ticker})`;
-                }
-                
-                const priceEl = document.getElementById(`parallel-price-${user}`);
-                if (priceEl) {
-                    priceEl.textContent = `$${parseFloat(latestData.close).toFixed(2)}`;
-                }
-                
-                // Calculate change
-                if (data.length > 1) {
-                    const previousData = data[data.length - 2];
-                    const change = parseFloat(latestData.close) - parseFloat(previousData.close);
-                    const percentChange = (change / parseFloat(previousData.close)) * 100;
-                    
-                    const changeElement = document.getElementById(`parallel-change-${user}`);
-                    if (changeElement) {
-                        changeElement.textContent = `${change >= 0 ? '+' : ''}${change.toFixed(2)} (${percentChange.toFixed(2)}%)`;
-                        changeElement.className = change >= 0 ? 'parallel-change positive' : 'parallel-change negative';
-                    }
-                }
-            }
+            Object.entries(requested).forEach(([panel, panelTicker]) => {
+                renderParallelStock(parseInt(panel), panelTicker, payload[panelTicker] || []);
+            });
             
             // Update charts with the new data
             updateParallelCharts();
         })
         .catch(error => {
-            console.error(`Error loading parallel stock ${ticker}:`, error);
-            const chartEl = document.getElementById(`parallel-chart-${user}`);
-            if (chartEl) {
-                chartEl.innerHTML = `
-                    <div class="parallel-error">
-                        <i class="fas fa-exclamation-triangle"></i>
-                        <p>Failed to load stock data</p>
-                    </div>
-                `;
-            }
+            console.error(`Error loading parallel stocks ${tickers.join(', ')}:`, error);
+            Object.keys(requested).forEach(panel => {
+                const chartEl = document.getElementById(`parallel-chart-${panel}`);
+                if (chartEl) {
+                    chartEl.innerHTML = `
+                        <div class="parallel-error">
+                            <i class="fas fa-exclamation-triangle"></i>
+                            <p>Failed to load stock data</p>
+                        </div>
+                    `;
+                }
+            });
         });
 }
 
+// Store one panel's stock data and update its price summary
+function renderParallelStock(user, ticker, data) {
+    if (user === 1) {
+        parallelData1 = {
+            ticker: ticker,
+            data: data
+        };
+    } else {
+        parallelData2 = {
+            ticker: ticker,
+            data: data
+        };
+    }
+    
+    // Get company info
+    const companyInfo = getCompanyInfo(ticker);
+    
+    // Update stock info
+    if (data.length > 0) {
+        const latestData = data[data.length - 1];
+        
+        const nameEl = document.getElementById(`parallel-name-${user}`);
+        if (nameEl) {
+            nameEl.textContent = `${companyInfo.name} (${ticker})`;
+        }
+        
+        const priceEl = document.getElementById(`parallel-price-${user}`);
+        if (priceEl) {
+            priceEl.textContent = `$${parseFloat(latestData.close).toFixed(2)}`;
+        }
+        
+        // Calculate change
+        if (data.length > 1) {
+            const previousData = data[data.length - 2];
+            const change = parseFloat(latestData.close) - parseFloat(previousData.close);
+            const percentChange = (change / parseFloat(previousData.close)) * 100;
+            
+            const changeElement = document.getElementById(`parallel-change-${user}`);
+            if (changeElement) {
+                changeElement.textContent = `${change >= 0 ? '+' : ''}${change.toFixed(2)} (${percentChange.toFixed(2)}%)`;
+                changeElement.className = change >= 0 ? 'parallel-change positive' : 'parallel-change negative';
+            }
+        }
+    }
+}
+
 // Update parallel charts
 function updateParallelCharts() {
     // Update chart 1
@@ -0,0 +1,255 @@
+# symbols.py
+import re
+import csv
+import time
+import bisect
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Legal-form suffixes dropped when a company name is used as a search term
+LEGAL_SUFFIX = re.compile(r'[,\s]+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc)\.?$', re.IGNORECASE)
+WORD = re.compile(r'[a-z0-9]+')
+
+
+def common_name(name):
+    """
+    Strip legal-form suffixes from a company name
+
+    Args:
+        name (str): Listed company name, e.g. 'Apple Inc.'
+
+    Returns:
+        str: Name as people write it, e.g. 'Apple'
+    """
+    stripped = LEGAL_SUFFIX.sub('', name)
+    while stripped != name:
+        name, stripped = stripped, LEGAL_SUFFIX.sub('', stripped)
+    return name
+
+
+class NegativeCache:
+    """
+    Bounded set of keys known to have no result
+
+    Entries expire after ``ttl`` seconds, and the least recently seen keys
+    are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=4096, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            added = self._entries.get(key)
+            if added is None:
+                return False
+            if time.monotonic() - added >= self.ttl:
+                del self._entries[key]
+                return False
+            self._entries.move_to_end(key)
+            return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key):
+        """Remember that ``key`` has no result"""
+        with self._lock:
+            self._entries[key] = time.monotonic()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        """Forget ``key``, e.g. once it turns out to exist"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Forget every key"""
+        with self._lock:
+            self._entries.clear()
+
+
+class SymbolIndex:
+    """
+    In-memory index of listed symbols and company names
+
+    Symbols are kept in a sorted array, and so are the (word, symbol) pairs
+    of every name, so a prefix query is two binary searches and a slice
+    rather than a scan of the whole listing. Queries and symbols that found
+    nothing are remembered in a negative cache: an unknown symbol is
+    answered without asking a provider again, and once a prefix has no
+    matches every longer query starting with it is answered at once.
+    """
+
+    def __init__(self, listings=(), negative_cache_size=4096, negative_ttl=3600):
+        self._names = {}
+        self._symbols = []
+        self._words = []
+        self._lock = threading.Lock()
+        self.missing_symbols = NegativeCache(negative_cache_size, negative_ttl)
+        self.empty_queries = NegativeCache(negative_cache_size, negative_ttl)
+        self.lookups = 0
+        self.searches = 0
+        self.negative_hits = 0
+        for symbol, name in listings:
+            self._insert(symbol, name)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """
+        Build an index from a ``symbol,name`` CSV listing
+
+        A missing or unreadable file is logged and gives an empty index.
+
+        Args:
+            path (str): Path of the listing file
+            **kwargs: Passed to the constructor
+
+        Returns:
+            SymbolIndex: The loaded index
+        """
+        listings = []
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if row.get('symbol'):
+                        listings.append((row['symbol'].strip().upper(), (row.get('name') or '').strip()))
+        except OSError as e:
+            logger.warning(f"Could not load symbol listing from {path}: {e}")
+        index = cls(listings, **kwargs)
+        logger.info(f"Loaded {len(index)} symbols from {path}")
+        return index
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def __contains__(self, symbol):
+        return self.lookup(symbol) is not None
+
+    def _insert(self, symbol, name):
+        if symbol in self._names:
+            return
+        self._names[symbol] = name
+        bisect.insort(self._symbols, symbol)
+        for word in set(WORD.findall(name.lower())):
+            bisect.insort(self._words, (word, symbol))
+
+    def add(self, symbol, name):
+        """
+        Add a listing, e.g. one a provider confirmed after a lookup miss
+
+        Args:
+            symbol (str): Ticker symbol
+            name (str): Company name
+        """
+        with self._lock:
+            self._insert(symbol, name or symbol)
+        self.missing_symbols.discard(symbol)
+        # Queries that found nothing before might match the new listing
+        self.empty_queries.clear()
+
+    def lookup(self, symbol):
+        """
+        Return the company name listed for ``symbol``
+
+        Args:
+            symbol (str): Ticker symbol
+
+        Returns:
+            str: Company name, or None if the symbol isn't listed
+        """
+        self.lookups += 1
+        return self._names.get(symbol)
+
+    def is_known_missing(self, symbol):
+        """Return True if ``symbol`` was recently confirmed not to exist"""
+        if symbol in self.missing_symbols:
+            self.negative_hits += 1
+            return True
+        return False
+
+    def mark_missing(self, symbol):
+        """Remember that a provider has no listing for ``symbol``"""
+        self.missing_symbols.add(symbol)
+
+    def search(self, query, limit=10):
+        """
+        Find listings whose symbol or a word of whose name starts with ``query``
+
+        Symbol matches come first, shortest symbol first, so an exact symbol
+        is always the top result. With several words in ``query``, a name
+        has to contain a word starting with each of them.
+
+        Args:
+            query (str): What the user has typed so far
+            limit (int): Maximum number of results
+
+        Returns:
+            list: Dicts with 'symbol' and 'name', best match first
+        """
+        self.searches += 1
+        query = query.strip().lower()
+        if not query:
+            return []
+        # A query can only match if every prefix of it matched something
+        for end in range(1, len(query) + 1):
+            if query[:end] in self.empty_queries:
+                self.negative_hits += 1
+                return []
+
+        terms = WORD.findall(query)
+        with self._lock:
+            upper = query.upper()
+            start = bisect.bisect_left(self._symbols, upper)
+            stop = bisect.bisect_left(self._symbols, upper + '\uffff')
+            symbols = sorted(self._symbols[start:stop], key=lambda symbol: (len(symbol), symbol))[:limit]
+
+            by_name = []
+            if terms:
+                start = bisect.bisect_left(self._words, (terms[0],))
+                stop = bisect.bisect_left(self._words, (terms[0] + '\uffff',))
+                by_name = [symbol for _, symbol in self._words[start:stop]]
+
+        seen = set(symbols)
+        named = []
+        for symbol in by_name:
+            if symbol in seen:
+                continue
+            seen.add(symbol)
+            words = WORD.findall(self._names[symbol].lower())
+            if all(any(word.startswith(term) for word in words) for term in terms[1:]):
+                # Names that start with the query rank above mid-name matches,
+                # and shorter names (usually the parent company) go first
+                name = self._names[symbol]
+                named.append((not words[0].startswith(terms[0]), len(name), name, symbol))
+        named.sort()
+
+        results = symbols + [entry[-1] for entry in named]
+        if not results:
+            self.empty_queries.add(query)
+        return [{'symbol': symbol, 'name': self._names[symbol]} for symbol in results[:limit]]
+
+    def stats(self):
+        """
+        Return a snapshot of index counters
+
+        Returns:
+            dict: Index size, negative cache sizes and lookup/search counters
+        """
+        return {
+            'symbols': len(self._symbols),
+            'name_words': len(self._words),
+            'missing_symbols': len(self.missing_symbols),
+            'empty_queries': len(self.empty_queries),
+            'lookups': self.lookups,
+            'searches': self.searches,
+            'negative_hits': self.negative_hits
+        }
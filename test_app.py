@@ -0,0 +1,255 @@
+# test_app.py
+import os
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+
+# Keep the app in-process: no shared SQLite tier, no on-disk price store
+os.environ.setdefault("SHARED_CACHE_PATH", "")
+os.environ.setdefault("PRICE_STORE_DIR", "")
+
+import app as market_pulse  # noqa: E402
+from breaker import CLOSED, ProviderGuard  # noqa: E402
+from sentiment import SentimentEngine  # noqa: E402
+
+
+def history(days=30, close=100.0):
+    """yfinance-style daily history ending today"""
+    index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=days, freq='D')
+    closes = close + np.arange(days, dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1, 'Close': closes,
+                         'Volume': np.full(days, 1000)}, index=index)
+
+
+def empty_history():
+    """What yfinance returns for unknown or delisted tickers"""
+    return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'],
+                        index=pd.Index([], name='Date'))
+
+
+class Yahoo:
+    """Stand-in for the yfinance module, serving one history and news feed per ticker"""
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.news = {}
+        self.requests = []
+        self.news_requests = []
+
+    def Ticker(self, ticker):
+        return StubTicker(self, ticker)
+
+
+class StubTicker:
+    """The parts of yf.Ticker the app uses"""
+
+    info = {}
+
+    def __init__(self, yahoo, ticker):
+        self.yahoo = yahoo
+        self.ticker = ticker
+
+    def history(self, period=None, interval='1d', start=None, **kwargs):
+        self.yahoo.requests.append(self.ticker)
+        result = self.yahoo.histories.get(self.ticker, empty_history)
+        if isinstance(result, Exception):
+            raise result
+        return result()
+
+    @property
+    def news(self):
+        self.yahoo.news_requests.append(self.ticker)
+        return self.yahoo.news.get(self.ticker, [])
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    yahoo = Yahoo({})
+    monkeypatch.setattr(market_pulse, 'yahoo_finance', lambda: yahoo)
+    return yahoo
+
+
+@pytest.fixture
+def alphavantage(monkeypatch):
+    requests = []
+
+    def get_json(url, params=None, **kwargs):
+        requests.append(params)
+        return {'Time Series (Daily)': {
+            '2024-01-03': {'1. open': '11', '2. high': '12', '3. low': '10', '4. close': '11.5', '5. volume': '300'},
+            '2024-01-02': {'1. open': '10', '2. high': '11', '3. low': '9', '4. close': '10.5', '5. volume': '200'}
+        }}
+    monkeypatch.setattr(market_pulse.upstream, 'get_json', get_json)
+    return requests
+
+
+@pytest.fixture
+def client(monkeypatch, yahoo, alphavantage):
+    monkeypatch.setattr(market_pulse, 'providers', {
+        name: ProviderGuard(name, rate=1000, burst=1000, failure_threshold=2, observer=market_pulse.observe_upstream)
+        for name in ('yahoo', 'alphavantage', 'newsapi')
+    })
+    market_pulse.cache.clear()
+    yield market_pulse.app.test_client()
+    market_pulse.cache.clear()
+
+
+def test_unknown_ticker_falls_back_to_alphavantage(client, yahoo, alphavantage):
+    for ticker in ('ZZZZA', 'ZZZZB', 'ZZZZC'):
+        response = client.get(f'/api/stock_data?ticker={ticker}&range=max')
+        assert response.status_code == 200
+        assert [bar['close'] for bar in response.get_json()] == [10.5, 11.5]
+
+    assert yahoo.requests == ['ZZZZA', 'ZZZZB', 'ZZZZC']
+    assert [params['symbol'] for params in alphavantage] == ['ZZZZA', 'ZZZZB', 'ZZZZC']
+    yahoo_stats = market_pulse.providers['yahoo'].stats()
+    assert (yahoo_stats['state'], yahoo_stats['failures']) == (CLOSED, 0)
+
+
+def test_lttb_stock_data_honours_small_max_points(client, yahoo):
+    yahoo.histories['AAPL'] = lambda: history(260)
+    for max_points in (1, 2, 3):
+        response = client.get(f'/api/stock_data?ticker=AAPL&range=max&max_points={max_points}&downsample=lttb')
+        assert response.status_code == 200
+        assert len(response.get_json()) == max_points
+
+
+@pytest.mark.parametrize('range_name', ['0d', '00d'])
+def test_empty_range_is_rejected(client, range_name):
+    response = client.get(f'/api/stock_data?ticker=AAPL&range={range_name}')
+    assert response.status_code == 400
+    assert 'Invalid range' in response.get_json()['error']
+
+
+def test_one_day_range_starts_a_day_back(client, yahoo):
+    yahoo.histories['AAPL'] = lambda: history(30)
+    bars = client.get('/api/stock_data?ticker=AAPL&range=1d').get_json()
+    yesterday = (pd.Timestamp.today().normalize() - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    assert [bar['date'] for bar in bars] == [yesterday, pd.Timestamp.today().strftime('%Y-%m-%d')]
+
+
+@pytest.fixture
+def dashboard_sections(monkeypatch, yahoo):
+    yahoo.histories['AAPL'] = lambda: history(30)
+    monkeypatch.setattr(market_pulse, 'get_cached_stock_metrics', lambda ticker: {'marketCap': '3.00T'})
+    monkeypatch.setattr(market_pulse, 'get_cached_company_news', lambda ticker: [{'title': f"{ticker} beats"}])
+    monkeypatch.setattr(market_pulse, 'get_cached_stock_sentiment', lambda ticker: {'score': 0.4})
+
+
+def test_dashboard_returns_every_section(client, dashboard_sections):
+    result = client.get('/api/dashboard?ticker=aapl&range=5d').get_json()
+
+    assert result['ticker'] == 'AAPL'
+    assert result['status'] == dict.fromkeys(('stock_data', 'metrics', 'news', 'sentiment'), 'ok')
+    assert not result['partial']
+    assert len(result['stock_data']) == 6
+    assert result['metrics'] == {'marketCap': '3.00T'}
+    assert result['news'] == [{'title': 'AAPL beats'}]
+
+
+def test_dashboard_reports_failed_sections_and_returns_the_rest(client, dashboard_sections, monkeypatch):
+    def failing_metrics(ticker):
+        raise RuntimeError('metrics provider down')
+    monkeypatch.setattr(market_pulse, 'get_cached_stock_metrics', failing_metrics)
+
+    response = client.get('/api/dashboard?ticker=AAPL')
+    result = response.get_json()
+
+    assert response.status_code == 200
+    assert result['partial']
+    assert result['status'] == {'stock_data': 'ok', 'metrics': 'error', 'news': 'ok', 'sentiment': 'ok'}
+    assert result['metrics'] is None
+    assert result['sentiment'] == {'score': 0.4}
+    assert len(result['stock_data']) == 30
+
+
+def test_dashboard_reports_slow_sections_as_pending(client, dashboard_sections, monkeypatch):
+    release = threading.Event()
+
+    def slow_news(ticker):
+        release.wait(5)
+        return []
+    monkeypatch.setattr(market_pulse, 'get_cached_company_news', slow_news)
+    monkeypatch.setitem(market_pulse.DASHBOARD_TIMEOUTS, 'news', 0.05)
+
+    try:
+        result = client.get('/api/dashboard?ticker=AAPL').get_json()
+    finally:
+        release.set()
+
+    assert result['partial']
+    assert result['status']['news'] == 'pending'
+    assert result['news'] is None
+    assert result['status']['metrics'] == 'ok'
+
+
+def test_dashboard_rejects_invalid_tickers(client):
+    assert client.get('/api/dashboard?ticker=NOT%20A%20TICKER').status_code == 400
+
+
+def test_news_and_sentiment_share_one_fetch_and_scoring(client, yahoo, monkeypatch):
+    monkeypatch.setattr(market_pulse, 'sentiment_engine', SentimentEngine())
+    yahoo.news['AAPL'] = [
+        {'content': {'title': 'Apple posts a great quarter', 'pubDate': '2024-05-02T20:30:00Z',
+                     'provider': {'displayName': 'Reuters'}, 'canonicalUrl': {'url': 'https://example.com/1'}}},
+        {'title': 'Apple shares fall on terrible guidance', 'publisher': 'Bloomberg', 'link': 'https://example.com/2',
+         'providerPublishTime': 1714680000},
+        {'content': {'title': ''}}
+    ]
+
+    news = client.get('/api/company_news?ticker=AAPL').get_json()
+    sentiment = client.get('/api/stock_sentiment?ticker=AAPL').get_json()
+
+    assert yahoo.news_requests == ['AAPL']
+    assert market_pulse.sentiment_engine.stats()['misses'] == 2
+    assert [(article['title'], article['source'], article['sentiment_label']) for article in news] == [
+        ('Apple posts a great quarter', 'Reuters', 'positive'),
+        ('Apple shares fall on terrible guidance', 'Bloomberg', 'negative')
+    ]
+    average = sum(article['sentiment'] for article in news) / 2
+    assert sentiment['sentiment_score'] == round((average + 1) / 2, 2)
+    assert sentiment['buzz'] == 0.15
+
+
+def metric(text, name, **labels):
+    """Value of one series in a /metrics page, 0 if it isn't there yet"""
+    label_string = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    prefix = f"{name}{{{label_string}}} " if labels else f"{name} "
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0
+
+
+def test_metrics_record_routes_cache_and_upstream_calls(client, yahoo):
+    yahoo.histories['AAPL'] = lambda: history(30)
+    yahoo.histories['MSFT'] = ConnectionError('connection reset')
+    before = client.get('/metrics').get_data(as_text=True)
+
+    client.get('/api/stock_data?ticker=AAPL')
+    client.get('/api/stock_data?ticker=AAPL')
+    client.get('/api/stock_data?ticker=MSFT')
+    client.get('/api/stock_data?ticker=bad ticker!')
+    response = client.get('/metrics')
+    after = response.get_data(as_text=True)
+
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    assert '# TYPE marketpulse_http_request_duration_seconds histogram' in after
+
+    def delta(name, **labels):
+        return metric(after, name, **labels) - metric(before, name, **labels)
+
+    assert delta('marketpulse_http_request_duration_seconds_count',
+                 route='/api/stock_data', method='GET', status='200') == 3
+    assert delta('marketpulse_http_request_duration_seconds_count',
+                 route='/api/stock_data', method='GET', status='400') == 1
+    assert delta('marketpulse_http_request_duration_seconds_bucket',
+                 route='/api/stock_data', method='GET', status='200', le='+Inf') == 3
+    assert delta('marketpulse_cache_lookups_total', prefix='stock_data_', outcome='miss') >= 2
+    assert delta('marketpulse_cache_lookups_total', prefix='stock_data_', outcome='hit') >= 1
+    assert delta('marketpulse_upstream_request_duration_seconds_count', provider='yahoo', operation='history') == 2
+    assert delta('marketpulse_upstream_errors_total', provider='yahoo', operation='history') == 1
+    assert delta('marketpulse_mock_fallbacks_total', data='stock_data') == 1
+    assert metric(after, 'marketpulse_provider_circuit_open', provider='yahoo') == 0
+    assert 'marketpulse_cache_bytes ' in after
@@ -0,0 +1,120 @@
+# test_asgi.py
+import os
+import asyncio
+
+import pytest
+
+# Keep the app in-process: no shared SQLite tier, no on-disk price store
+os.environ.setdefault("SHARED_CACHE_PATH", "")
+os.environ.setdefault("PRICE_STORE_DIR", "")
+
+import app as market_pulse  # noqa: E402
+from asgi import ASGIBridge  # noqa: E402
+from breaker import ProviderGuard  # noqa: E402
+from test_app import Yahoo, history  # noqa: E402
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    yahoo = Yahoo({'AAPL': lambda: history(30)})
+    monkeypatch.setattr(market_pulse, 'yahoo_finance', lambda: yahoo)
+    monkeypatch.setattr(market_pulse, 'providers', {
+        name: ProviderGuard(name, rate=1000, burst=1000) for name in ('yahoo', 'alphavantage', 'newsapi')
+    })
+    market_pulse.cache.clear()
+    bridge = ASGIBridge(market_pulse.app, threads=4)
+    yield bridge
+    bridge.executor.shutdown(wait=True)
+    market_pulse.cache.clear()
+
+
+async def call(bridge, path, query='', headers=()):
+    """Send one GET through the bridge and collect the response"""
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': query.encode(),
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 50000)
+    }
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    connected = asyncio.Event()
+    messages = []
+
+    async def receive():
+        if requests:
+            return requests.pop(0)
+        # The client stays connected until the response is sent
+        await connected.wait()
+
+    async def send(message):
+        messages.append(message)
+
+    await bridge(scope, receive, send)
+    start = messages[0]
+    headers = {name.decode(): value.decode() for name, value in start['headers']}
+    return start['status'], headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+
+def get(bridge, path, query='', headers=()):
+    return asyncio.run(call(bridge, path, query, headers))
+
+
+def without_max_age(headers):
+    # max-age counts down to the entry's expiry, so it may tick between requests
+    return {name: value for name, value in headers.items() if name != 'cache-control'}
+
+
+@pytest.mark.parametrize('headers', [(), (('Accept-Encoding', 'gzip'),)])
+def test_event_loop_hit_matches_the_thread_pool_response(bridge, headers):
+    pooled = get(bridge, '/api/stock_data', 'ticker=AAPL&range=5d', headers)
+    assert (bridge.pool_requests, bridge.loop_hits) == (1, 0)
+
+    cached = get(bridge, '/api/stock_data', 'ticker=AAPL&range=5d', headers)
+    assert (bridge.pool_requests, bridge.loop_hits) == (1, 1)
+
+    assert cached[0] == pooled[0] == 200
+    assert without_max_age(cached[1]) == without_max_age(pooled[1])
+    assert 'max-age=' in cached[1]['cache-control']
+    assert cached[2] == pooled[2]
+    assert 'etag' in pooled[1]
+
+
+def test_not_modified_through_both_paths(bridge):
+    _, headers, _ = get(bridge, '/api/stock_data', 'ticker=AAPL')
+    etag = headers['etag']
+
+    # A second bridge hasn't seen the URL, so its request runs on the pool
+    pool_bridge = ASGIBridge(market_pulse.app, threads=1)
+    try:
+        pooled = get(pool_bridge, '/api/stock_data', 'ticker=AAPL', [('If-None-Match', etag)])
+    finally:
+        pool_bridge.executor.shutdown(wait=True)
+    cached = get(bridge, '/api/stock_data', 'ticker=AAPL', [('If-None-Match', etag)])
+
+    assert (pool_bridge.pool_requests, bridge.loop_hits) == (1, 1)
+    assert pooled[0] == cached[0] == 304
+    assert pooled[2] == cached[2] == b''
+    assert pooled[1]['etag'] == cached[1]['etag'] == etag
+
+
+def test_expired_views_go_back_to_the_thread_pool(bridge):
+    first = get(bridge, '/api/stock_data', 'ticker=AAPL')
+    market_pulse.cache.clear()
+
+    again = get(bridge, '/api/stock_data', 'ticker=AAPL')
+    assert (bridge.pool_requests, bridge.loop_hits) == (2, 0)
+    assert again[2] == first[2]
+
+
+def test_uncached_routes_always_run_on_the_thread_pool(bridge):
+    for _ in range(2):
+        status, headers, body = get(bridge, '/api/cache_stats')
+        assert status == 200
+    assert (bridge.pool_requests, bridge.loop_hits) == (2, 0)
+    assert bridge.stats()['cached_urls'] == 0
@@ -0,0 +1,138 @@
+# test_breaker.py
+import pytest
+import requests
+
+import breaker
+from breaker import (CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderGuard, ProviderUnavailable, TokenBucket,
+                     is_provider_failure)
+from upstream import UpstreamError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def raising(error):
+    def call():
+        raise error
+    return call
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breaker.time, 'monotonic', clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    clock.now += 60
+    assert bucket.tokens == 3
+
+
+def test_breaker_opens_at_threshold_and_half_opens_after_timeout(clock):
+    circuit = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    circuit.record_failure()
+    assert circuit.state == CLOSED
+    circuit.record_failure()
+    assert circuit.state == OPEN
+    assert not circuit.allow()
+
+    clock.now += 30
+    assert circuit.state == HALF_OPEN
+    assert circuit.allow()
+    assert not circuit.allow()
+    circuit.record_success()
+    assert circuit.state == CLOSED
+    assert circuit.opened == 1
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    circuit = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    circuit.record_failure()
+    clock.now += 30
+    assert circuit.allow()
+    circuit.record_failure()
+    assert circuit.state == OPEN
+    assert circuit.opened == 2
+    clock.now += 29
+    assert not circuit.allow()
+
+
+def test_guard_sheds_calls_while_open_or_throttled(clock):
+    calls = []
+    guard = ProviderGuard('alpha', rate=1, burst=2, failure_threshold=1, reset_timeout=30,
+                          observer=lambda *args: calls.append(args))
+
+    def fail():
+        raise ConnectionError('down')
+
+    assert guard.call(lambda: 'ok', operation='quote') == 'ok'
+    with pytest.raises(ConnectionError):
+        guard.call(fail)
+    with pytest.raises(ProviderUnavailable):
+        guard.call(lambda: 'ok')
+
+    clock.now += 30
+    assert guard.call(lambda: 'ok') == 'ok'
+    assert guard.call(lambda: 'ok') == 'ok'
+    with pytest.raises(ProviderUnavailable):
+        guard.call(lambda: 'ok')
+
+    stats = guard.stats()
+    assert (stats['state'], stats['calls'], stats['failures']) == (CLOSED, 4, 1)
+    assert (stats['shed_open'], stats['shed_rate_limited']) == (1, 1)
+    assert [(name, operation, error is None) for name, operation, _, error in calls] == [
+        ('alpha', 'quote', True), ('alpha', 'call', False), ('alpha', 'call', True), ('alpha', 'call', True)
+    ]
+
+
+def test_request_errors_leave_the_breaker_closed(clock):
+    guard = ProviderGuard('yahoo', rate=100, burst=100, failure_threshold=1)
+
+    for _ in range(5):
+        with pytest.raises(KeyError):
+            guard.call(raising(KeyError('ZZZZA')))
+    assert guard.breaker.state == CLOSED
+    assert guard.stats()['failures'] == 0
+    assert guard.call(lambda: 'ok') == 'ok'
+
+
+def test_failed_request_frees_the_half_open_trial(clock):
+    guard = ProviderGuard('yahoo', rate=100, burst=100, failure_threshold=1, reset_timeout=30)
+    with pytest.raises(UpstreamError):
+        guard.call(raising(UpstreamError('api.example.com failed after 3 attempts')))
+    clock.now += 30
+
+    with pytest.raises(ValueError):
+        guard.call(raising(ValueError('bad JSON')))
+    assert guard.breaker.state == HALF_OPEN
+    assert guard.call(lambda: 'ok') == 'ok'
+    assert guard.breaker.state == CLOSED
+
+
+@pytest.mark.parametrize('status, failure', [(429, True), (500, True), (503, True), (404, False), (400, False)])
+def test_http_errors_count_only_for_throttling_and_server_errors(status, failure):
+    response = requests.Response()
+    response.status_code = status
+    assert is_provider_failure(requests.HTTPError(response=response)) is failure
+
+
+def test_transport_and_throttling_errors_are_provider_failures():
+    class YFRateLimitError(Exception):
+        pass
+
+    assert is_provider_failure(requests.ConnectionError('reset'))
+    assert is_provider_failure(requests.Timeout('read timed out'))
+    assert is_provider_failure(TimeoutError())
+    assert is_provider_failure(YFRateLimitError('Too Many Requests'))
+    assert not is_provider_failure(ValueError('No data found, symbol may be delisted'))
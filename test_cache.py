@@ -0,0 +1,256 @@
+# test_cache.py
+import time
+import threading
+
+import pytest
+
+from cache import TTLCache, estimate_size
+from refresher import BackgroundRefresher
+from shared_cache import SQLiteCache
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+
+def age(cache, key, seconds):
+    """Make ``key``'s entry look ``seconds`` old"""
+    value, _ = cache.lookup(key)
+    cache.set(key, value, timestamp=time.time() - seconds, share=False)
+
+
+def test_lru_evicts_least_recently_used_first():
+    cache = TTLCache(max_entries=3)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+    cache.get('a')
+    cache.set('d', 'd')
+
+    assert 'b' not in cache
+    assert all(key in cache for key in ('a', 'c', 'd'))
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_budget_evicts_until_under_limit():
+    value = 'x' * 1000
+    cache = TTLCache(max_bytes=3 * estimate_size(value) + 100)
+    for key in ('a', 'b', 'c', 'd'):
+        cache.set(key, value)
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] <= stats['max_bytes']
+    assert 'a' not in cache
+
+
+def test_value_larger_than_budget_is_not_cached():
+    cache = TTLCache(max_bytes=100)
+    cache.set('big', 'x' * 1000)
+    assert 'big' not in cache
+    assert cache.stats()['bytes'] == 0
+
+
+def test_longest_matching_prefix_picks_the_ttl():
+    cache = TTLCache(ttls={'stock_data_': 300, 'stock_data_intraday_': 60, 'news_': 900}, default_ttl=30)
+    assert cache.ttl_for('stock_data_AAPL') == 300
+    assert cache.ttl_for('stock_data_intraday_5m_AAPL') == 60
+    assert cache.ttl_for('news_AAPL') == 900
+    assert cache.ttl_for('metrics_AAPL') == 30
+    assert cache.prefix_for('stock_data_intraday_5m_AAPL') == 'stock_data_intraday_'
+
+    for key in ('stock_data_AAPL', 'stock_data_intraday_5m_AAPL'):
+        cache.set(key, key)
+        age(cache, key, 120)
+    assert cache.lookup('stock_data_AAPL') == ('stock_data_AAPL', 'fresh')
+    assert cache.lookup('stock_data_intraday_5m_AAPL') == (None, None)
+
+
+def test_stale_entries_are_served_until_the_grace_period_ends():
+    cache = TTLCache(default_ttl=10, stale_ttl=60)
+    cache.set('quote_AAPL', 'old')
+
+    age(cache, 'quote_AAPL', 30)
+    assert cache.lookup('quote_AAPL') == ('old', 'stale')
+    assert cache.get('quote_AAPL') is None
+
+    age(cache, 'quote_AAPL', 80)
+    assert cache.lookup('quote_AAPL') == (None, None)
+    assert len(cache) == 0
+
+
+def test_purge_expired_drops_only_entries_past_the_grace_period():
+    cache = TTLCache(default_ttl=10, stale_ttl=60)
+    for key in ('fresh', 'stale', 'expired'):
+        cache.set(key, key)
+    age(cache, 'stale', 30)
+    age(cache, 'expired', 80)
+
+    assert cache.purge_expired() == 1
+    assert set(cache._entries) == {'fresh', 'stale'}
+
+
+def test_prewarm_pass_purges_expired_entries():
+    cache = TTLCache(default_ttl=10, stale_ttl=60)
+    refresher = BackgroundRefresher(cache, workers=1, prewarm_margin=0, prewarm_interval=3600)
+    cache.set('news_AAPL', 'unread')
+    age(cache, 'news_AAPL', 80)
+
+    refresher.prewarm()
+    assert len(cache) == 0
+    assert refresher.stats()['purged'] == 1
+
+
+def test_get_or_load_coalesces_concurrent_misses():
+    cache = TTLCache()
+    calls = []
+    release = threading.Event()
+
+    def slow_loader():
+        calls.append(threading.current_thread().name)
+        release.wait(5)
+        return 'loaded'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('stock_data_AAPL', slow_loader)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()['coalesced'] < 7:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['loaded'] * 8
+    assert cache.stats()['inflight'] == 0
+
+
+def test_get_or_load_shares_the_loader_error_and_retries_later():
+    cache = TTLCache()
+
+    def failing():
+        raise ConnectionError('down')
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_load('stock_data_AAPL', failing)
+    assert 'stock_data_AAPL' not in cache
+    assert cache.get_or_load('stock_data_AAPL', CountingLoader()) == 'value-1'
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"))
+
+
+def test_reload_calls_loader_despite_unexpired_shared_row(shared):
+    cache = TTLCache(ttls={'stock_data_': 60}, shared=shared)
+    loader = CountingLoader()
+    cache.get_or_load('stock_data_AAPL', loader)
+
+    # The shared row was written along with the local entry and hasn't expired
+    assert cache.reload('stock_data_AAPL', loader) == 'value-2'
+    assert loader.calls == 2
+    assert shared.get('stock_data_AAPL')[1] == 'value-2'
+
+
+def test_reload_takes_newer_value_from_another_worker(shared):
+    cache = TTLCache(ttls={'stock_data_': 60}, shared=shared)
+    other = TTLCache(ttls={'stock_data_': 60}, shared=SQLiteCache(shared.path))
+    cache.set('stock_data_AAPL', 'old', timestamp=time.time() - 10)
+    other.set('stock_data_AAPL', 'refreshed elsewhere')
+
+    loader = CountingLoader()
+    assert cache.reload('stock_data_AAPL', loader) == 'refreshed elsewhere'
+    assert loader.calls == 0
+
+
+def test_get_or_load_reads_through_shared_tier(shared):
+    TTLCache(shared=shared).get_or_load('news_AAPL', CountingLoader())
+    loader = CountingLoader()
+    assert TTLCache(shared=SQLiteCache(shared.path)).get_or_load('news_AAPL', loader) == 'value-1'
+    assert loader.calls == 0
+
+
+def test_prewarm_keeps_entry_fresh_with_shared_tier(shared):
+    cache = TTLCache(ttls={'stock_data_': 60}, shared=shared, stale_ttl=60)
+    refresher = BackgroundRefresher(cache, workers=1, prewarm_margin=120, prewarm_interval=3600)
+    loader = CountingLoader()
+    refresher.get('stock_data_AAPL', loader)
+
+    for _ in range(3):
+        refresher.get('stock_data_AAPL', loader)
+        assert refresher.prewarm() == 1
+        refresher._queue.join()
+    assert loader.calls == 4
+    assert cache.lookup('stock_data_AAPL') == ('value-4', 'fresh')
+
+
+def test_load_many_batches_claimed_keys_and_falls_back_per_key():
+    cache = TTLCache()
+    batches = []
+
+    def load_batch(keys):
+        batches.append(keys)
+        return {key: f"bulk-{key}" for key in keys if key != 'stock_data_MISSING'}
+
+    results = cache.load_many(['stock_data_AAPL', 'stock_data_MISSING'], load_batch, lambda key: f"one-{key}")
+    assert results == {'stock_data_AAPL': 'bulk-stock_data_AAPL', 'stock_data_MISSING': 'one-stock_data_MISSING'}
+    assert batches == [['stock_data_AAPL', 'stock_data_MISSING']]
+    assert cache.get('stock_data_MISSING') == 'one-stock_data_MISSING'
+
+
+def test_load_many_falls_back_per_key_when_the_batch_fails():
+    def load_batch(keys):
+        raise RuntimeError("bulk download failed")
+
+    results = TTLCache().load_many(['a', 'b'], load_batch, lambda key: key.upper())
+    assert results == {'a': 'A', 'b': 'B'}
+
+
+def test_load_many_waits_for_keys_already_loading():
+    cache = TTLCache()
+    started = threading.Event()
+    release = threading.Event()
+    single = CountingLoader()
+
+    def slow_one():
+        started.set()
+        release.wait(5)
+        return single()
+
+    thread = threading.Thread(target=cache.get_or_load, args=('stock_data_AAPL', slow_one))
+    thread.start()
+    started.wait(5)
+
+    batches = []
+    result = {}
+    batch_thread = threading.Thread(target=lambda: result.update(cache.load_many(
+        ['stock_data_AAPL', 'stock_data_MSFT'], lambda keys: batches.append(keys) or {k: 'bulk' for k in keys},
+        lambda key: 'one')))
+    batch_thread.start()
+    time.sleep(0.05)
+    release.set()
+    thread.join()
+    batch_thread.join()
+
+    assert batches == [['stock_data_MSFT']]
+    assert result == {'stock_data_AAPL': 'value-1', 'stock_data_MSFT': 'bulk'}
+    assert single.calls == 1
+    assert cache.stats()['coalesced'] == 1
+
+
+def test_load_many_uses_values_other_workers_published(shared):
+    TTLCache(shared=SQLiteCache(shared.path)).set('stock_data_AAPL', 'from another worker')
+    batches = []
+    results = TTLCache(shared=shared).load_many(
+        ['stock_data_AAPL', 'stock_data_MSFT'], lambda keys: batches.append(keys) or {k: 'bulk' for k in keys},
+        lambda key: 'one')
+    assert results == {'stock_data_AAPL': 'from another worker', 'stock_data_MSFT': 'bulk'}
+    assert batches == [['stock_data_MSFT']]
+    assert shared.acquire_lease('stock_data_MSFT', 10)
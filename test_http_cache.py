@@ -0,0 +1,67 @@
+# test_http_cache.py
+import gzip
+import json
+import time
+
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from http_cache import MIN_COMPRESS_SIZE, EncodedBody
+
+BODY = json.dumps([{'date': f"2024-01-{day:02d}", 'close': 100 + day} for day in range(1, 29)] * 4).encode()
+
+
+def make_request(**headers):
+    return Request(EnvironBuilder(path='/api/stock_data', headers=headers).get_environ())
+
+
+def test_compresses_for_clients_that_accept_it():
+    body = EncodedBody(BODY)
+    response = body.respond(make_request(**{'Accept-Encoding': 'gzip'}))
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(response.get_data()) == BODY
+    assert response.headers['ETag'] == f'"{body.etag}-gzip"'
+
+
+def test_small_bodies_are_sent_uncompressed():
+    body = EncodedBody(b'{"ok":true}')
+    assert len(body.body) < MIN_COMPRESS_SIZE
+    response = body.respond(make_request(**{'Accept-Encoding': 'gzip'}))
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'] == f'"{body.etag}"'
+
+
+def test_matching_etag_in_any_encoding_gets_304():
+    body = EncodedBody(BODY)
+    for etag in (body.etag, f"{body.etag}-gzip"):
+        response = body.respond(make_request(**{'If-None-Match': f'"{etag}"', 'Accept-Encoding': 'gzip'}))
+        assert response.status_code == 304
+        assert response.get_data() == b''
+        assert response.headers['ETag'] == f'"{etag}"'
+
+
+def test_stale_etag_gets_the_body():
+    response = EncodedBody(BODY).respond(make_request(**{'If-None-Match': '"outdated"'}))
+    assert response.status_code == 200
+    assert response.get_data() == BODY
+
+
+def test_max_age_counts_down_to_expiry():
+    response = EncodedBody(BODY, expires_at=time.time() + 60).respond(make_request())
+    max_age = int(response.headers['Cache-Control'].split('max-age=')[1])
+    assert 58 <= max_age <= 60
+    assert EncodedBody(BODY).respond(make_request()).headers['Cache-Control'] == 'no-cache'
+
+
+def test_fast_bodies_compress_at_lower_levels():
+    fast = EncodedBody(BODY, fast=True)
+    assert gzip.decompress(fast.encoded('gzip')) == BODY
+    assert len(fast.encoded('gzip')) >= len(EncodedBody(BODY).encoded('gzip'))
+    assert fast.etag == EncodedBody(BODY).etag
+
+
+def test_precompress_fills_every_encoding_once():
+    body = EncodedBody(BODY).precompress()
+    assert body.size > len(BODY)
+    assert body.encoded('gzip') is body.encoded('gzip')
@@ -0,0 +1,109 @@
+# test_indicators.py
+import numpy as np
+import pytest
+
+from indicators import INDICATORS, IndicatorEngine, parse_indicator_spec, rolling_mean
+
+
+def make_bars(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return {
+        'date': np.datetime64('2020-01-01T00:00') + np.arange(n) * np.timedelta64(1, 'D'),
+        'open': close + rng.normal(0, 0.5, n),
+        'high': close + rng.uniform(0, 1, n),
+        'low': close - rng.uniform(0, 1, n),
+        'close': close,
+        'volume': rng.integers(1000, 5000, n)
+    }
+
+
+def window(bars, start, end):
+    return {field: values[start:end] for field, values in bars.items()}
+
+
+def assert_values_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for output in expected:
+        np.testing.assert_allclose(actual[output], expected[output], rtol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize('spec', ['sma:20', 'ema:12', 'rsi:14', 'macd', 'bollinger:20:2', 'vwap', 'vwap:10',
+                                  'volatility:20'])
+def test_appended_bar_reuses_state(spec):
+    name, params = parse_indicator_spec(spec)
+    bars = make_bars(300)
+    engine = IndicatorEngine()
+    engine.compute('AAPL:1d', window(bars, 0, 299), name, params)
+
+    result = engine.compute('AAPL:1d', bars, name, params)
+
+    assert (engine.full, engine.incremental) == (1, 1)
+    assert_values_equal(result, IndicatorEngine().compute('AAPL:1d', bars, name, params))
+
+
+@pytest.mark.parametrize('spec', ['sma:20', 'ema:12', 'rsi:14', 'macd', 'bollinger:20:2', 'vwap:10',
+                                  'volatility:20'])
+def test_rolled_window_reuses_state(spec):
+    name, params = parse_indicator_spec(spec)
+    bars = make_bars(301)
+    engine = IndicatorEngine()
+    engine.compute('AAPL:1d', window(bars, 0, 300), name, params)
+
+    # A day later the period window has dropped the first bar and added one
+    result = engine.compute('AAPL:1d', window(bars, 1, 301), name, params)
+
+    assert (engine.full, engine.incremental) == (1, 1)
+    # Values keep the warm-up of the bars that rolled out
+    full = IndicatorEngine().compute('AAPL:1d', bars, name, params)
+    assert_values_equal(result, {output: values[1:] for output, values in full.items()})
+
+
+def test_rolled_window_recomputes_vwap_anchored_at_the_first_bar():
+    name, params = parse_indicator_spec('vwap')
+    bars = make_bars(301)
+    engine = IndicatorEngine()
+    engine.compute('AAPL:1d', window(bars, 0, 300), name, params)
+
+    result = engine.compute('AAPL:1d', window(bars, 1, 301), name, params)
+
+    assert (engine.full, engine.incremental) == (2, 0)
+    assert_values_equal(result, IndicatorEngine().compute('AAPL:1d', window(bars, 1, 301), name, params))
+
+
+def test_changed_historical_close_forces_full_recompute():
+    name, params = parse_indicator_spec('ema:12')
+    bars = make_bars(300)
+    engine = IndicatorEngine()
+    engine.compute('AAPL:1d', window(bars, 0, 299), name, params)
+
+    # A split or dividend adjustment rewrites old closes
+    adjusted = dict(bars, close=bars['close'].copy())
+    adjusted['close'][:150] /= 2
+    result = engine.compute('AAPL:1d', adjusted, name, params)
+
+    assert (engine.full, engine.incremental) == (2, 0)
+    assert_values_equal(result, IndicatorEngine().compute('AAPL:1d', adjusted, name, params))
+
+
+def test_unchanged_series_is_a_hit():
+    name, params = parse_indicator_spec('macd:12:26:9')
+    bars = make_bars(100)
+    engine = IndicatorEngine()
+    first = engine.compute('AAPL:1d', bars, name, params)
+    second = engine.compute('AAPL:1d', bars, name, params)
+
+    assert (engine.full, engine.incremental, engine.hits) == (1, 0, 1)
+    assert second.keys() == set(INDICATORS['macd'][2])
+    assert all(second[output] is first[output] for output in second)
+
+
+def test_rolling_mean_is_nan_until_the_window_fills():
+    values = rolling_mean(np.arange(5, dtype=float), 3)
+    np.testing.assert_array_equal(values, [np.nan, np.nan, 1.0, 2.0, 3.0])
+
+
+@pytest.mark.parametrize('spec', ['sma:0', 'ema:x', 'bollinger:1001', 'unknown'])
+def test_invalid_specs_are_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_indicator_spec(spec)
@@ -0,0 +1,86 @@
+# test_json_provider.py
+import json
+import math
+import datetime
+import decimal
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from json_provider import OrjsonProvider, StdlibJSONProvider, json_provider_class, orjson
+
+pytestmark = pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+
+PAYLOAD = {
+    'ticker': 'AAPL',
+    'closes': [189.84, 190.0, 0.1 + 0.2, 1e-07, 12345678901234],
+    'volume': 53665700,
+    'missing': None,
+    'ok': True,
+    'nested': {'b': [1, {'d': 2, 'c': 3}], 'a': []}
+}
+
+
+app = Flask(__name__)
+
+
+@pytest.fixture
+def providers():
+    return StdlibJSONProvider(app), OrjsonProvider(app)
+
+
+def test_output_decodes_like_the_standard_library(providers):
+    stdlib, fast = providers
+    assert json.loads(fast.dumps_bytes(PAYLOAD)) == json.loads(stdlib.dumps_bytes(PAYLOAD))
+    # Only float exponents are spelled differently ('1e-07' vs '1e-7')
+    without_exponents = dict(PAYLOAD, closes=PAYLOAD['closes'][:3])
+    assert fast.dumps_bytes(without_exponents) == stdlib.dumps_bytes(without_exponents)
+
+
+def test_numpy_values_decode_like_their_python_equivalents(providers):
+    stdlib, fast = providers
+    values = np.array([[1.5, 2.25], [3.0, -4.125]])
+    payload = {'array': values, 'ints': np.arange(3), 'float': np.float64(0.3), 'int': np.int64(7)}
+    plain = {'array': values.tolist(), 'ints': [0, 1, 2], 'float': 0.3, 'int': 7}
+    assert json.loads(fast.dumps_bytes(payload)) == json.loads(stdlib.dumps_bytes(plain))
+
+
+def test_nan_and_none_are_null(providers):
+    stdlib, fast = providers
+    decoded = json.loads(fast.dumps_bytes({'nan': float('nan'), 'np_nan': np.float64('nan'), 'none': None}))
+    assert decoded == {'nan': None, 'np_nan': None, 'none': None}
+    # The standard library writes NaN, which isn't valid JSON
+    assert math.isnan(json.loads(stdlib.dumps_bytes({'nan': float('nan')}))['nan'])
+
+
+def test_dates_and_decimals_go_through_the_default_provider(providers):
+    stdlib, fast = providers
+    payload = {
+        'date': datetime.date(2024, 5, 2),
+        'datetime': datetime.datetime(2024, 5, 2, 20, 30, tzinfo=datetime.timezone.utc),
+        'price': decimal.Decimal('189.84')
+    }
+    assert fast.dumps_bytes(payload) == stdlib.dumps_bytes(payload)
+    assert json.loads(fast.dumps_bytes(payload))['date'] == 'Thu, 02 May 2024 00:00:00 GMT'
+
+
+def test_non_ascii_text_is_utf8_rather_than_escaped(providers):
+    stdlib, fast = providers
+    payload = {'name': 'Société Générale'}
+    assert fast.dumps_bytes(payload) == '{"name":"Société Générale"}'.encode()
+    assert json.loads(fast.dumps_bytes(payload)) == json.loads(stdlib.dumps_bytes(payload))
+
+
+def test_responses_round_trip(providers):
+    _, fast = providers
+    with app.app_context():
+        response = fast.response(PAYLOAD)
+    assert response.mimetype == 'application/json'
+    assert fast.loads(response.get_data()) == json.loads(json.dumps(PAYLOAD))
+
+
+def test_provider_class_follows_the_setting(monkeypatch):
+    monkeypatch.setenv('JSON_PROVIDER', 'stdlib')
+    assert json_provider_class() is StdlibJSONProvider
+    assert json_provider_class('orjson') is OrjsonProvider
@@ -0,0 +1,60 @@
+# test_metrics.py
+from metrics import Registry
+
+
+def test_counter_renders_one_series_per_label_set():
+    registry = Registry()
+    errors = registry.counter('app_errors_total', 'Failed calls', ('provider', 'operation'))
+    errors.inc('yahoo', 'history')
+    errors.inc('yahoo', 'history', amount=2)
+    errors.inc('newsapi', 'everything')
+
+    assert registry.render().splitlines() == [
+        '# HELP app_errors_total Failed calls',
+        '# TYPE app_errors_total counter',
+        'app_errors_total{provider="newsapi",operation="everything"} 1',
+        'app_errors_total{provider="yahoo",operation="history"} 3'
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram('app_seconds', 'Latency', ('route',), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, '/api/stock_data')
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'app_seconds_bucket{route="/api/stock_data",le="0.1"} 2',
+        'app_seconds_bucket{route="/api/stock_data",le="1"} 3',
+        'app_seconds_bucket{route="/api/stock_data",le="+Inf"} 4',
+        'app_seconds_sum{route="/api/stock_data"} 3.65',
+        'app_seconds_count{route="/api/stock_data"} 4'
+    ]
+
+
+def test_histogram_times_a_block():
+    registry = Registry()
+    latency = registry.histogram('app_seconds', 'Latency')
+    with latency.time():
+        pass
+    assert 'app_seconds_count 1' in registry.render().splitlines()
+
+
+def test_collected_metrics_are_read_at_render_time():
+    registry = Registry()
+    sizes = {'AAPL': 1}
+    registry.collected('app_entries', 'Entries', ('ticker',), lambda: {(key,): value for key, value in sizes.items()})
+    sizes['MSFT'] = 2
+
+    assert registry.render().splitlines()[1:] == [
+        '# TYPE app_entries gauge',
+        'app_entries{ticker="AAPL"} 1',
+        'app_entries{ticker="MSFT"} 2'
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    registry.counter('app_total', 'Total', ('route',)).inc('/a"b\\c\nd')
+    assert registry.render().splitlines()[-1] == 'app_total{route="/a\\"b\\\\c\\nd"} 1'
@@ -0,0 +1,80 @@
+# test_mock_data.py
+import numpy as np
+import pytest
+
+from mock_data import MockMarket, bar_times
+
+# A Monday, so the week before it is Monday 1 to Sunday 7 January
+END = np.datetime64('2024-01-08')
+
+
+def test_same_ticker_and_seed_give_the_same_bars():
+    first = MockMarket(seed=7).generate('AAPL', 365, end=END)
+    assert np.array_equal(first, MockMarket(seed=7).generate('AAPL', 365, end=END))
+    assert not np.array_equal(first['close'], MockMarket(seed=8).generate('AAPL', 365, end=END)['close'])
+    assert not np.array_equal(first['close'], MockMarket(seed=7).generate('MSFT', 365, end=END)['close'])
+
+
+def test_longer_history_keeps_the_same_generator_per_interval():
+    market = MockMarket(seed=7)
+    daily = market.generate('AAPL', 30, '1d', end=END)
+    assert not np.array_equal(daily['close'][:5], market.generate('AAPL', 30, '1wk', end=END)['close'][:5])
+    assert market.base_price('AAPL') == MockMarket(seed=7).base_price('AAPL')
+
+
+@pytest.mark.parametrize('interval, bars', [('1d', 5), ('1wk', 1), ('1h', 35), ('5m', 390), ('1m', 1950)])
+def test_bar_count_per_interval(interval, bars):
+    assert len(MockMarket().generate('AAPL', 7, interval, end=END)) == bars
+
+
+def test_daily_bars_cover_weekdays_only():
+    times = bar_times(END, 365)
+    assert len(times) == np.busday_count(END - 365, END)
+    assert np.is_busday(times.astype('M8[D]')).all()
+    assert times[-1] == np.datetime64('2024-01-05T00:00')
+
+
+def test_intraday_bars_stay_within_the_session():
+    times = bar_times(END, 7, '1h')
+    minutes = (times - times.astype('M8[D]')).astype(int)
+    assert minutes.min() == 9 * 60 + 30
+    assert minutes.max() < 16 * 60
+
+
+@pytest.mark.parametrize('market', [MockMarket(), MockMarket(volatility=1.5, base_prices={'AAPL': 0.5})])
+def test_prices_are_positive_and_consistent(market):
+    bars = market.generate('AAPL', 3650, end=END)
+    assert (bars['low'] >= 0.01).all()
+    assert (bars['low'] <= np.minimum(bars['open'], bars['close'])).all()
+    assert (bars['high'] >= np.maximum(bars['open'], bars['close'])).all()
+    assert (bars['volume'] > 0).all()
+
+
+def test_base_prices_are_configurable_or_in_range():
+    market = MockMarket(base_prices={'AAPL': 190.0})
+    assert market.base_price('AAPL') == 190.0
+    assert all(20 <= market.base_price(f"T{i}") <= 500 for i in range(50))
+
+
+def test_series_are_memoized_read_only():
+    market = MockMarket(max_entries=1)
+    series = market.series('AAPL', 30)
+    assert market.series('AAPL', 30) is series
+    assert not series.bars.flags.writeable
+    market.series('MSFT', 30)
+    assert market.series('AAPL', 30) is not series
+    assert market.stats() == {'series': 1, 'max_entries': 1, 'hits': 1, 'generated': 3}
+
+
+def test_unknown_interval_is_rejected():
+    with pytest.raises(ValueError):
+        MockMarket().generate('AAPL', 30, '3mo')
+
+
+def test_news_is_seeded_by_ticker():
+    market = MockMarket(seed=7)
+    first = market.news('AAPL', 'Apple', count=5)
+    again = MockMarket(seed=7).news('AAPL', 'Apple', count=5)
+    assert [(a['title'], a['source'], a['sentiment']) for a in first] == \
+        [(a['title'], a['source'], a['sentiment']) for a in again]
+    assert first[0]['title'] == 'Apple Reports Quarterly Earnings Above Expectations'
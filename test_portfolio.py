@@ -0,0 +1,68 @@
+# test_portfolio.py
+import numpy as np
+
+from portfolio import PriceMatrix, betas, correlation_matrix, log_returns
+
+
+def series(start, closes):
+    """(dates, closes) of daily bars from ``start``"""
+    dates = np.datetime64(start, 'm') + np.arange(len(closes)) * np.timedelta64(1, 'D')
+    return dates, np.asarray(closes, dtype=float)
+
+
+def identity(source):
+    return source
+
+
+def test_select_aligns_tickers_on_the_union_of_dates():
+    matrix = PriceMatrix()
+    matrix.update('AAPL', series('2024-01-01', [1, 2, 3]), identity)
+    matrix.update('MSFT', series('2024-01-02', [10, 20, 30]), identity)
+
+    dates, closes, missing = matrix.select(['AAPL', 'MSFT'])
+    assert missing == []
+    assert len(dates) == 4
+    assert np.array_equal(closes[:, 0], [1, 2, 3, np.nan], equal_nan=True)
+    assert np.array_equal(closes[:, 1], [np.nan, 10, 20, 30], equal_nan=True)
+
+
+def test_same_source_is_not_rebuilt():
+    matrix = PriceMatrix()
+    source = series('2024-01-01', [1, 2, 3])
+    assert matrix.update('AAPL', source, identity)
+    assert not matrix.update('AAPL', source, identity)
+    assert matrix.stats()['column_updates'] == 1
+
+
+def test_rows_older_than_every_series_are_trimmed():
+    matrix = PriceMatrix()
+    matrix.update('AAPL', series('2024-01-01', [1, 2, 3]), identity)
+    matrix.update('MSFT', series('2024-01-01', [1, 2, 3]), identity)
+    # Both series roll forward by two days
+    matrix.update('AAPL', series('2024-01-03', [3, 4, 5]), identity)
+    assert len(matrix.dates) == 5
+    matrix.update('MSFT', series('2024-01-03', [3, 4, 5]), identity)
+
+    assert matrix.dates[0] == np.datetime64('2024-01-03', 'm')
+    assert len(matrix.dates) == 3
+    assert matrix.stats()['trims'] == 1
+
+
+def test_evicted_tickers_are_reported_missing():
+    matrix = PriceMatrix(max_tickers=2)
+    for ticker in ('AAPL', 'MSFT', 'GOOG'):
+        matrix.update(ticker, series('2024-01-01', [1, 2, 3]), identity)
+
+    dates, closes, missing = matrix.select(['AAPL', 'GOOG'])
+    assert missing == ['AAPL']
+    assert np.isnan(closes[:, 0]).all()
+    assert np.array_equal(closes[:, 1], [1, 2, 3])
+
+
+def test_correlation_and_beta_of_scaled_returns():
+    closes = np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, size=(50, 1)), axis=0))
+    prices = np.hstack([closes, closes ** 2])
+    returns = log_returns(prices)
+
+    assert np.allclose(correlation_matrix(returns), 1.0)
+    assert np.allclose(betas(returns, 0), [1.0, 2.0])
@@ -0,0 +1,108 @@
+# test_price_store.py
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import PriceStore
+from series import PriceSeries
+
+
+def history(start, days, close=100.0):
+    """yfinance-style daily history of ``days`` bars from ``start``"""
+    index = pd.date_range(start, periods=days, freq='D')
+    closes = close + np.arange(days, dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes + 1, 'Low': closes - 1, 'Close': closes,
+                         'Volume': np.full(days, 1000)}, index=index)
+
+
+class Upstream:
+    """Serves a fixed history, full or from a start date, and counts requests"""
+
+    def __init__(self, hist):
+        self.hist = hist
+        self.starts = []
+
+    def __call__(self, start):
+        self.starts.append(start)
+        return self.hist if start is None else self.hist[self.hist.index >= pd.Timestamp(start)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(str(tmp_path))
+
+
+def today():
+    return datetime.date.today()
+
+
+def test_first_update_fetches_full_period(store):
+    upstream = Upstream(history(today() - datetime.timedelta(days=9), 10))
+    bars = store.update('AAPL', '1d', upstream, max_gap_days=30)
+    assert len(bars) == 10
+    assert upstream.starts == [None]
+    assert store.stats()['full_fetches'] == 1
+
+
+def test_incremental_update_appends_new_bars(store):
+    start = today() - datetime.timedelta(days=9)
+    store.update('AAPL', '1d', Upstream(history(start, 8)), max_gap_days=30)
+
+    upstream = Upstream(history(start, 10))
+    bars = store.update('AAPL', '1d', upstream, max_gap_days=30)
+    assert upstream.starts == [(start + datetime.timedelta(days=6)).isoformat()]
+    assert len(bars) == 10
+    assert bars['close'][-1] == 109.0
+    assert store.stats()['incremental_fetches'] == 1
+
+
+def test_update_drops_bars_older_than_the_window(store):
+    start = today() - datetime.timedelta(days=19)
+    store.update('AAPL', '1d', Upstream(history(start, 18)), max_gap_days=30)
+
+    bars = store.update('AAPL', '1d', Upstream(history(start, 20)), max_gap_days=30, keep_days=5)
+    assert bars['date'][0] >= np.datetime64(today() - datetime.timedelta(days=5), 'm')
+    assert len(store.read('AAPL', '1d')) == len(bars) == 6
+
+
+def test_adjusted_history_is_refetched_in_full(store):
+    start = today() - datetime.timedelta(days=9)
+    store.update('AAPL', '1d', Upstream(history(start, 8)), max_gap_days=30)
+
+    # A split halves every price, so the overlapping bar no longer matches
+    upstream = Upstream(history(start, 10, close=50.0))
+    bars = store.update('AAPL', '1d', upstream, max_gap_days=30)
+    assert upstream.starts[-1] is None
+    assert bars['close'][0] == 50.0
+
+
+def test_existing_mappings_survive_updates(store):
+    start = today() - datetime.timedelta(days=9)
+    old = store.update('AAPL', '1d', Upstream(history(start, 8)), max_gap_days=30)
+    before = np.array(old)
+
+    # The last stored session closed higher than it was when stored
+    revised = history(start, 10)
+    revised.iloc[7, revised.columns.get_loc('Close')] += 0.5
+    bars = store.update('AAPL', '1d', Upstream(revised), max_gap_days=30)
+    assert bars['close'][7] == 107.5
+    # The update replaced the file instead of rewriting the mapped bars
+    assert np.array_equal(old, before)
+
+
+def test_series_reads_stored_bars_without_copying(store):
+    start = today() - datetime.timedelta(days=9)
+    mapped = store.update('AAPL', '1d', Upstream(history(start, 10)), max_gap_days=30)
+    assert isinstance(mapped, np.memmap)
+
+    series = PriceSeries(mapped)
+    assert series.bars.base is mapped
+    assert np.shares_memory(series.bars, mapped)
+    assert np.shares_memory(series.since(start.isoformat()).bars, mapped)
+    assert not series.bars.flags.writeable
+
+    # Updates replace the file, so the series keeps reading the bars it was built from
+    store.update('AAPL', '1d', Upstream(history(start, 10, close=50.0)), max_gap_days=30)
+    assert series.bars['close'][0] == 100.0
@@ -0,0 +1,34 @@
+# test_quotes.py
+from quotes import QuoteHub, quote_delta
+
+
+def test_quote_delta_only_carries_changed_fields():
+    previous = {'price': 10.0, 'change': 0.5, 'volume': 100}
+    assert quote_delta(None, previous) == previous
+    assert quote_delta(previous, {'price': 10.5, 'change': 0.5, 'volume': 120}) == {'price': 10.5, 'volume': 120}
+    assert quote_delta(previous, dict(previous)) == {}
+
+
+def test_subscriptions_are_capped_until_one_closes():
+    hub = QuoteHub(lambda ticker: None, poll_interval=3600, max_subscriptions=2)
+    first = hub.subscribe(['AAPL'])
+    second = hub.subscribe(['MSFT'])
+    assert first is not None and second is not None
+    assert hub.subscribe(['AAPL']) is None
+    assert hub.stats()['rejected'] == 1
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(first)
+    assert hub.subscribe(['AAPL']) is not None
+    assert hub.stats()['subscriptions'] == 2
+
+
+def test_new_subscriber_gets_latest_quote_then_deltas():
+    hub = QuoteHub(lambda ticker: None, poll_interval=3600)
+    hub.subscribe(['AAPL'])
+    hub._publish('AAPL', {'price': 10.0, 'volume': 100})
+
+    late = hub.subscribe(['AAPL'])
+    assert late.get(timeout=0) == {'ticker': 'AAPL', 'price': 10.0, 'volume': 100}
+    hub._publish('AAPL', {'price': 10.5, 'volume': 100})
+    assert late.get(timeout=0) == {'ticker': 'AAPL', 'price': 10.5}
@@ -0,0 +1,101 @@
+# test_refresher.py
+import time
+
+import pytest
+
+from cache import TTLCache
+from refresher import BackgroundRefresher
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"value-{self.calls}"
+
+
+@pytest.fixture
+def cache():
+    return TTLCache(ttls={'stock_data_': 1}, stale_ttl=60)
+
+
+@pytest.fixture
+def refresher(cache):
+    # A long interval keeps the pre-warm thread out of the way; tests call prewarm() themselves
+    return BackgroundRefresher(cache, workers=1, prewarm_margin=0, prewarm_interval=3600)
+
+
+def make_stale(cache, key):
+    value, _ = cache.lookup(key)
+    cache.set(key, value, timestamp=time.time() - 5, share=False)
+
+
+def test_get_loads_miss_then_serves_fresh(cache, refresher):
+    loader = CountingLoader()
+    assert refresher.get('stock_data_AAPL', loader) == 'value-1'
+    assert refresher.get('stock_data_AAPL', loader) == 'value-1'
+    assert loader.calls == 1
+    assert refresher.stats()['misses'] == 1
+    assert refresher.stats()['hits'] == 1
+
+
+def test_stale_get_serves_old_value_and_refreshes(cache, refresher):
+    loader = CountingLoader()
+    refresher.get('stock_data_AAPL', loader)
+    make_stale(cache, 'stock_data_AAPL')
+
+    assert refresher.get('stock_data_AAPL', loader) == 'value-1'
+    refresher._queue.join()
+    assert loader.calls == 2
+    assert cache.lookup('stock_data_AAPL') == ('value-2', 'fresh')
+    assert refresher.stats()['refreshed'] == 1
+
+
+def test_stale_note_after_decay_still_refreshes(cache, refresher):
+    loader = CountingLoader()
+    refresher.get('stock_data_AAPL', loader)
+    # Idle pre-warm passes decay the request count to zero and forget the key
+    for _ in range(3):
+        refresher.prewarm()
+    assert 'stock_data_AAPL' not in refresher.hot_keys()
+    make_stale(cache, 'stock_data_AAPL')
+
+    # A stale hit answered from a pre-encoded view only notes the request
+    refresher.note('stock_data_AAPL', 'stale')
+    refresher._queue.join()
+    assert loader.calls == 2
+    assert cache.lookup('stock_data_AAPL') == ('value-2', 'fresh')
+
+
+def test_prewarm_forgets_loaders_of_expired_entries(cache, refresher):
+    refresher.get('stock_data_AAPL', CountingLoader())
+    cache.delete('stock_data_AAPL')
+    for _ in range(3):
+        refresher.prewarm()
+    assert not refresher.schedule('stock_data_AAPL')
+
+
+def test_prewarm_refreshes_hot_keys_about_to_expire(cache, refresher):
+    loader = CountingLoader()
+    refresher.get('stock_data_AAPL', loader)
+    make_stale(cache, 'stock_data_AAPL')
+
+    assert refresher.prewarm() == 1
+    refresher._queue.join()
+    assert loader.calls == 2
+    assert refresher.stats()['prewarmed'] == 1
+
+
+def test_failed_refresh_keeps_stale_value(cache, refresher):
+    refresher.get('stock_data_AAPL', CountingLoader())
+    make_stale(cache, 'stock_data_AAPL')
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    refresher.peek('stock_data_AAPL', failing)
+    refresher._queue.join()
+    assert cache.lookup('stock_data_AAPL') == ('value-1', 'stale')
+    assert refresher.stats()['refresh_errors'] == 1
@@ -0,0 +1,88 @@
+# test_sentiment.py
+import json
+
+import pytest
+
+from sentiment import SentimentEngine, content_hash, main, score_bulk, sentiment_label
+
+HEADLINES = [
+    "Apple posts a great quarter with excellent iPhone sales",
+    "Stocks fall sharply amid terrible losses",
+    "The shareholder meeting is on Tuesday",
+    "Analysts call the merger a bad deal",
+    "Apple posts a great quarter with excellent iPhone sales"
+]
+
+
+@pytest.fixture
+def engine():
+    return SentimentEngine(max_entries=100)
+
+
+def test_batch_scores_match_single_scores(engine):
+    batch = engine.score_many(HEADLINES)
+    assert batch == [SentimentEngine().score(text) for text in HEADLINES]
+    assert [result['label'] for result in batch] == ['positive', 'negative', 'neutral', 'negative', 'positive']
+    assert all(-1 <= result['polarity'] <= 1 for result in batch)
+
+
+def test_duplicate_texts_are_parsed_once(engine):
+    engine.score_many(HEADLINES)
+    assert engine.stats()['misses'] == 4
+
+    engine.score_many(HEADLINES[:2])
+    assert engine.stats()['misses'] == 4
+    assert engine.stats()['hits'] == 2
+
+
+def test_memo_evicts_least_recently_used():
+    engine = SentimentEngine(max_entries=2)
+    engine.score_many(HEADLINES[:2])
+    engine.score(HEADLINES[0])
+    engine.score(HEADLINES[2])
+
+    assert engine.stats()['entries'] == 2
+    misses = engine.stats()['misses']
+    engine.score(HEADLINES[0])
+    assert engine.stats()['misses'] == misses
+    engine.score(HEADLINES[1])
+    assert engine.stats()['misses'] == misses + 1
+
+
+def test_results_are_copies_of_the_memo(engine):
+    engine.score(HEADLINES[0])['label'] = 'tampered'
+    assert engine.score(HEADLINES[0])['label'] == 'positive'
+
+
+def test_content_hash_identifies_the_text():
+    assert content_hash(HEADLINES[0]) == content_hash(HEADLINES[4])
+    assert content_hash(HEADLINES[0]) != content_hash(HEADLINES[0].lower())
+
+
+@pytest.mark.parametrize('polarity, label', [(0.5, 'positive'), (0.1, 'neutral'), (0.0, 'neutral'),
+                                             (-0.1, 'neutral'), (-0.2, 'negative')])
+def test_sentiment_label_thresholds(polarity, label):
+    assert sentiment_label(polarity) == label
+
+
+def test_pooled_scores_match_serial_scores_in_order():
+    texts = HEADLINES * 7
+    pooled = list(score_bulk(iter(texts), workers=2, chunk_size=3, niceness=0))
+    assert pooled == SentimentEngine().score_many(texts)
+
+
+def test_bulk_scoring_of_nothing_yields_nothing():
+    assert list(score_bulk([], workers=1)) == []
+
+
+def test_cli_writes_one_json_line_per_headline(tmp_path):
+    source = tmp_path / "headlines.txt"
+    source.write_text("\n".join(HEADLINES[:3]) + "\n\n", encoding='utf-8')
+    output = tmp_path / "scores.jsonl"
+
+    main([str(source), '-o', str(output), '-w', '1', '-c', '2'])
+
+    lines = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+    assert [line['text'] for line in lines] == HEADLINES[:3]
+    assert [{'polarity': line['polarity'], 'label': line['label']} for line in lines] == \
+        SentimentEngine().score_many(HEADLINES[:3])
@@ -0,0 +1,123 @@
+# test_series.py
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from series import BAR_DTYPE, PriceSeries, columns_to_bars, downsample_lttb, downsample_ohlc, history_to_bars
+
+
+def make_columns(n, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    return {
+        'date': [str(np.datetime64('2020-01-01') + i) for i in range(n)],
+        'open': open_.tolist(),
+        'high': (np.maximum(open_, close) + rng.uniform(0, 1, n)).tolist(),
+        'low': (np.minimum(open_, close) - rng.uniform(0, 1, n)).tolist(),
+        'close': close.tolist(),
+        'volume': rng.integers(1000, 5000, n).tolist()
+    }
+
+
+@pytest.mark.parametrize('n, max_points', [(1000, 100), (1000, 7), (101, 100), (500, 1)])
+def test_ohlc_stays_within_bounds_and_keeps_the_range(n, max_points):
+    columns = make_columns(n)
+    result = downsample_ohlc(columns, max_points)
+
+    assert len(result['date']) == max_points
+    assert all(len(result[field]) == max_points for field in result)
+    assert result['date'][0] == columns['date'][0]
+    assert result['open'][0] == columns['open'][0]
+    assert result['close'][-1] == columns['close'][-1]
+    assert max(result['high']) == max(columns['high'])
+    assert min(result['low']) == min(columns['low'])
+    assert sum(result['volume']) == sum(columns['volume'])
+    assert result['date'] == sorted(result['date'])
+
+
+def test_ohlc_buckets_aggregate_their_bars():
+    columns = make_columns(10)
+    result = downsample_ohlc(columns, 2)
+
+    assert result['open'] == [columns['open'][0], columns['open'][5]]
+    assert result['close'] == [columns['close'][4], columns['close'][9]]
+    assert result['high'] == [max(columns['high'][:5]), max(columns['high'][5:])]
+    assert result['low'] == [min(columns['low'][:5]), min(columns['low'][5:])]
+
+
+@pytest.mark.parametrize('max_points', [0, -1, 50, 60])
+def test_ohlc_leaves_short_or_unbounded_series_alone(max_points):
+    columns = make_columns(50)
+    assert downsample_ohlc(columns, max_points) is columns
+
+
+@pytest.mark.parametrize('n, max_points', [(1000, 100), (1000, 3), (101, 100), (10, 4)])
+def test_lttb_picks_exactly_max_points_original_bars(n, max_points):
+    columns = make_columns(n)
+    result = downsample_lttb(columns, max_points)
+
+    assert all(len(result[field]) == max_points for field in result)
+    assert result['date'][0] == columns['date'][0]
+    assert result['date'][-1] == columns['date'][-1]
+    indexes = [columns['date'].index(date) for date in result['date']]
+    assert indexes == sorted(set(indexes))
+    for field in columns:
+        assert result[field] == [columns[field][i] for i in indexes]
+
+
+def test_lttb_keeps_a_spike():
+    columns = make_columns(1000)
+    columns['close'][437] = 1000.0
+    assert 1000.0 in downsample_lttb(columns, 50)['close']
+
+
+@pytest.mark.parametrize('max_points', [0, -1, 50, 60])
+def test_lttb_leaves_short_or_unbounded_series_alone(max_points):
+    columns = make_columns(50)
+    assert downsample_lttb(columns, max_points) is columns
+
+
+@pytest.mark.parametrize('max_points', [1, 2])
+def test_lttb_below_three_points_still_honours_the_bound(max_points):
+    columns = make_columns(260)
+    assert downsample_lttb(columns, max_points) == downsample_ohlc(columns, max_points)
+
+
+def test_price_series_round_trips_through_json():
+    columns = make_columns(30)
+    series = PriceSeries(columns_to_bars(columns))
+    decoded = PriceSeries.from_json(json.loads(json.dumps(series.to_json())))
+
+    assert decoded.columns() == series.columns()
+    assert decoded.columns()['date'] == columns['date']
+    assert not decoded.intraday
+
+
+def test_price_series_since_shares_read_only_bars():
+    series = PriceSeries(columns_to_bars(make_columns(30)))
+    recent = series.since('2020-01-21')
+
+    assert len(recent) == 10
+    assert recent.columns()['date'][0] == '2020-01-21'
+    assert np.shares_memory(recent.bars, series.bars)
+    with pytest.raises(ValueError):
+        recent.bars['close'][0] = 0.0
+
+
+def test_price_series_size_counts_its_bars():
+    series = PriceSeries(columns_to_bars(make_columns(1000)))
+    assert sys.getsizeof(series) >= 1000 * BAR_DTYPE.itemsize
+    assert sys.getsizeof(series.since('2020-01-01')) >= 1000 * BAR_DTYPE.itemsize
+
+
+def test_empty_history_gives_no_bars():
+    # yfinance's frame for unknown tickers has a plain Index, not a DatetimeIndex
+    empty = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'],
+                         index=pd.Index([], name='Date'))
+    bars = history_to_bars(empty)
+    assert bars.dtype == BAR_DTYPE
+    assert len(bars) == 0
@@ -0,0 +1,68 @@
+# test_shared_cache.py
+import os
+import time
+
+import numpy as np
+
+import shared_cache
+from series import BAR_DTYPE, PriceSeries
+from shared_cache import SQLiteCache
+
+
+def test_connects_on_first_use(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    shared = SQLiteCache(str(path))
+    assert not path.exists()
+    assert shared.get('news_AAPL') is None
+    assert path.exists()
+
+
+def test_get_honours_expiry_and_newer_than(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    now = time.time()
+    shared.set('news_AAPL', ['headline'], ttl=60, timestamp=now)
+    shared.set('news_MSFT', ['headline'], ttl=1, timestamp=now - 5)
+
+    assert shared.get('news_AAPL') == (now, ['headline'])
+    assert shared.get('news_AAPL', newer_than=now) is None
+    assert shared.get('news_MSFT') is None
+
+
+def test_leases_are_exclusive_until_released(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    assert shared.acquire_lease('news_AAPL', 10)
+    assert not shared.acquire_lease('news_AAPL', 10)
+    shared.release_lease('news_AAPL')
+    assert shared.acquire_lease('news_AAPL', 10)
+
+
+def test_price_series_round_trip(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    bars = np.zeros(3, dtype=BAR_DTYPE)
+    bars['date'] = np.array(['2024-01-02T09:30', '2024-01-02T09:35', '2024-01-02T09:40'], dtype='M8[m]')
+    bars['close'] = [10.0, 10.5, 10.25]
+    bars['volume'] = [100, 200, 300]
+    shared.set('stock_data_5m_AAPL', PriceSeries(bars, intraday=True), ttl=60)
+
+    _, series = shared.get('stock_data_5m_AAPL')
+    assert isinstance(series, PriceSeries)
+    assert series.intraday
+    assert np.array_equal(series.bars, bars)
+
+
+def test_forked_child_opens_its_own_connection(tmp_path):
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    shared.set('news_AAPL', ['headline'], ttl=60)
+    parent_conn = shared._local.conn
+
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = shared.get('news_AAPL') is not None and shared._local.conn is not parent_conn \
+            and shared_cache._inherited_connections == [parent_conn]
+        os.write(write, b'1' if ok else b'0')
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(read, 1) == b'1'
+    # The parent's connection still works after the child exited
+    assert shared.get('news_AAPL')[1] == ['headline']
@@ -0,0 +1,133 @@
+# test_symbols.py
+import pytest
+
+import symbols
+from symbols import NegativeCache, SymbolIndex, common_name
+
+LISTING = """symbol,name
+AAPL,Apple Inc.
+A,Agilent Technologies Inc.
+AA,Alcoa Corporation
+AAL,American Airlines Group Inc.
+MSFT,Microsoft Corporation
+AMD,Advanced Micro Devices Inc.
+MU,Micron Technology Inc.
+BAC,Bank of America Corporation
+,Unlisted Placeholder
+ gm ,General Motors Company
+"""
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "symbols.csv"
+    path.write_text(LISTING, encoding='utf-8')
+    return SymbolIndex.from_file(str(path), negative_ttl=60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(symbols.time, 'monotonic', clock)
+    return clock
+
+
+def found(results):
+    return [result['symbol'] for result in results]
+
+
+def test_listing_is_loaded_and_normalized(index):
+    assert len(index) == 9
+    assert index.lookup('GM') == 'General Motors Company'
+    assert 'AAPL' in index
+    assert 'ZZZZ' not in index
+
+
+def test_missing_listing_gives_an_empty_index(tmp_path):
+    index = SymbolIndex.from_file(str(tmp_path / "missing.csv"))
+    assert len(index) == 0
+    assert index.search('a') == []
+
+
+def test_symbol_prefix_ranks_shortest_symbol_first(index):
+    assert found(index.search('aa')) == ['AA', 'AAL', 'AAPL']
+    assert found(index.search('a'))[:4] == ['A', 'AA', 'AAL', 'AMD']
+    assert index.search('AAPL')[0] == {'symbol': 'AAPL', 'name': 'Apple Inc.'}
+
+
+def test_name_words_match_by_prefix(index):
+    assert found(index.search('apple')) == ['AAPL']
+    assert found(index.search('bank of')) == ['BAC']
+    assert found(index.search('motors')) == ['GM']
+
+
+def test_names_starting_with_the_query_rank_above_mid_name_matches(index):
+    # Microsoft and Micron start with 'micro', shorter name first; Advanced Micro Devices doesn't
+    assert found(index.search('micro')) == ['MSFT', 'MU', 'AMD']
+
+
+def test_every_word_of_the_query_must_match(index):
+    assert found(index.search('micro dev')) == ['AMD']
+    assert found(index.search('american gro')) == ['AAL']
+    assert index.search('apple airlines') == []
+
+
+def test_results_are_limited(index):
+    assert len(index.search('a', limit=3)) == 3
+    assert found(index.search('a', limit=2)) == ['A', 'AA']
+
+
+def test_empty_prefixes_answer_longer_queries_from_the_negative_cache(index):
+    assert index.search('zq') == []
+    hits = index.stats()['negative_hits']
+    assert index.search('zqx') == []
+    assert index.search('ZQXY') == []
+    assert index.stats()['negative_hits'] == hits + 2
+
+
+def test_adding_a_listing_clears_empty_queries(index):
+    assert index.search('zq') == []
+    index.mark_missing('ZQ')
+    assert index.is_known_missing('ZQ')
+
+    index.add('ZQ', 'Zq Holdings Ltd')
+    assert found(index.search('zq')) == ['ZQ']
+    assert not index.is_known_missing('ZQ')
+
+
+def test_missing_symbols_expire(clock):
+    index = SymbolIndex(negative_ttl=60)
+    index.mark_missing('ZZZZA')
+    clock.now += 59
+    assert index.is_known_missing('ZZZZA')
+    clock.now += 1
+    assert not index.is_known_missing('ZZZZA')
+
+
+def test_negative_cache_drops_least_recently_seen_keys(clock):
+    missing = NegativeCache(max_entries=2, ttl=60)
+    missing.add('a')
+    missing.add('b')
+    assert 'a' in missing
+    missing.add('c')
+    assert len(missing) == 2
+    assert 'b' not in missing
+    assert 'a' in missing and 'c' in missing
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Apple Inc.', 'Apple'),
+    ('Alcoa Corporation', 'Alcoa'),
+    ('Bank of America Corp., Inc.', 'Bank of America'),
+    ('Co-Diagnostics', 'Co-Diagnostics')
+])
+def test_common_name_strips_legal_suffixes(name, expected):
+    assert common_name(name) == expected
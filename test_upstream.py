@@ -0,0 +1,77 @@
+# test_upstream.py
+import os
+import time
+
+import pytest
+import requests
+
+from upstream import UpstreamClient, UpstreamError
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """Answers with the queued outcomes in order: a status code or an exception"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.timeouts = []
+
+    def get(self, url, params=None, timeout=None):
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def client_with(session, **kwargs):
+    client = UpstreamClient(backoff=0.001, **kwargs)
+    client._session = session
+    client._pid = os.getpid()
+    return client
+
+
+def test_retries_retryable_statuses():
+    session = FakeSession(503, 429, 200)
+    assert client_with(session).get('https://example.com/api').status_code == 200
+    assert len(session.timeouts) == 3
+
+
+def test_returns_client_errors_without_retrying():
+    session = FakeSession(404)
+    assert client_with(session).get('https://example.com/api').status_code == 404
+    assert len(session.timeouts) == 1
+
+
+def test_timeouts_are_not_retried():
+    session = FakeSession(requests.ReadTimeout("slow"), 200)
+    with pytest.raises(UpstreamError):
+        client_with(session).get('https://example.com/api')
+    assert len(session.timeouts) == 1
+
+
+def test_refused_connections_are_retried():
+    session = FakeSession(requests.ConnectionError("refused"), 200)
+    assert client_with(session).get('https://example.com/api').status_code == 200
+
+
+def test_backoff_past_the_deadline_is_not_slept():
+    session = FakeSession(503, 200)
+    client = client_with(session, deadline=0.5)
+    client._delay = lambda attempt, response=None: 10
+    start = time.monotonic()
+    with pytest.raises(UpstreamError):
+        client.get('https://example.com/api')
+    assert time.monotonic() - start < 0.5
+    assert len(session.timeouts) == 1
+
+
+def test_attempt_timeouts_are_cut_to_the_deadline():
+    session = FakeSession(200)
+    client_with(session, timeout=5, deadline=1).get('https://example.com/api')
+    assert session.timeouts[0] <= 1
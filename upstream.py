@@ -0,0 +1,164 @@
+# upstream.py
+import os
+import time
+import random
+import threading
+import logging
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+# An IOError like the requests exceptions it wraps, as it always means the
+# provider is unreachable, throttling or erroring
+class UpstreamError(IOError):
+    """Raised when an upstream request still fails after all retries"""
+
+
+class UpstreamClient:
+    """
+    Pooled HTTP client for the JSON APIs behind the dashboard
+
+    All calls share one ``requests.Session`` per process, so connections to
+    Alpha Vantage and News API are kept alive and reused instead of paying
+    a TCP and TLS handshake on every fetch. A semaphore per host caps how
+    many requests a process sends to one provider at once, and failed
+    requests are retried with exponential backoff and full jitter so
+    workers that failed together don't retry in lockstep.
+
+    Only failures that are cheap to find out about are retried: 429 and
+    5xx responses and refused or reset connections. A timeout already used
+    up the time a retry would need, so it fails the call at once. Every
+    call, retries and backoff included, ends within ``deadline`` seconds,
+    so an unreachable provider holds a request no longer than one attempt.
+
+    The session is created lazily and recreated after a fork, so pooled
+    sockets are never shared between gunicorn workers.
+    """
+
+    def __init__(self, pool_size=10, per_host_limit=4, retries=2, backoff=0.25, max_backoff=4, timeout=5,
+                 deadline=None):
+        self.pool_size = pool_size
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.deadline = deadline or timeout
+        self._session = None
+        self._pid = None
+        self._limits = {}
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'requests': 0, 'retries': 0, 'errors': 0})
+
+    @property
+    def session(self):
+        """Return this process's pooled session, creating it on first use"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+                    self._limits = {}
+                    self._pid = os.getpid()
+        return self._session
+
+    def _limit_for(self, host):
+        with self._lock:
+            limit = self._limits.get(host)
+            if limit is None:
+                limit = self._limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return limit
+
+    def _delay(self, attempt, response=None):
+        """Return how long to sleep before retry number ``attempt``"""
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.max_backoff)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, params=None, timeout=None):
+        """
+        Send a GET request, retrying connection errors and retryable statuses
+
+        Args:
+            url (str): Request URL
+            params (dict): Query parameters
+            timeout (float): Per-attempt timeout, defaults to the client's;
+                             attempts are also cut short by the deadline
+
+        Returns:
+            requests.Response: The first non-retryable response
+
+        Raises:
+            UpstreamError: If every attempt failed
+        """
+        host = urlsplit(url).netloc
+        session = self.session
+        limit = self._limit_for(host)
+        stats = self._stats[host]
+
+        deadline = time.monotonic() + self.deadline
+        for attempt in range(self.retries + 1):
+            response = None
+            error = None
+            stats['requests'] += 1
+            try:
+                with limit:
+                    remaining = max(deadline - time.monotonic(), 0.001)
+                    response = session.get(url, params=params, timeout=min(timeout or self.timeout, remaining))
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                error = f"HTTP {response.status_code}"
+            except requests.Timeout as e:
+                error = e
+                break
+            except requests.ConnectionError as e:
+                error = e
+
+            delay = self._delay(attempt, response)
+            if attempt == self.retries or time.monotonic() + delay >= deadline:
+                break
+            stats['retries'] += 1
+            logger.info(f"Retrying {host} in {delay:.2f}s after: {error}")
+            time.sleep(delay)
+
+        stats['errors'] += 1
+        raise UpstreamError(f"{host} failed after {attempt + 1} attempts: {error}")
+
+    def get_json(self, url, params=None, timeout=None):
+        """
+        Send a GET request and decode the JSON body
+
+        Args:
+            url (str): Request URL
+            params (dict): Query parameters
+            timeout (float): Per-attempt timeout, defaults to the client's
+
+        Returns:
+            The decoded JSON response
+        """
+        return self.get(url, params=params, timeout=timeout).json()
+
+    def stats(self):
+        """
+        Return a snapshot of per-host request counters
+
+        Returns:
+            dict: Pool settings and request, retry and error counts per host
+        """
+        return {
+            'pool_size': self.pool_size,
+            'per_host_limit': self.per_host_limit,
+            'hosts': {host: dict(counts) for host, counts in self._stats.items()}
+        }